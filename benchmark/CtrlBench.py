@@ -0,0 +1,676 @@
+#!/usr/bin/env python
+'''
+drives controllers of this repository through the Pool call sequence
+against simulated devices (SimDeviceLib) and reports latency
+histograms and Tango call counts per phase:
+
+    python benchmark/CtrlBench.py                      # all controllers
+    python benchmark/CtrlBench.py -c HasyMotorCtrl -l 0.002 -n 50
+    python benchmark/CtrlBench.py --json new.json --baseline old.json
+
+the phases are
+    Init      creating the controller and AddDevice() of all axes
+    Load      LoadOne() of the timer, of all axes for 1D/2D
+    PreStart  PreStartAll(), PreStartOne()
+    Start     StartOne(), StartAll()
+    State     one state query of all axes, PreStateAll() ... StateOne()
+    Read      one value read of all axes, PreReadAll() ... ReadOne()
+State is repeated until no axis is MOVING, every --states-per-read
+state queries the values are read, as the Pool acquisition loop does.
+
+--stats prints the CallStatsLib statistics of the controllers.
+
+--baseline compares the median phase latencies and the call counts
+with a previous --json output, the exit status is 1, if a phase got
+slower by more than --tolerance or makes more Tango calls.
+
+The controllers are imported from this checkout as
+sardana.PoolController.<dir>.<module>, sardana and PyTango have to
+be installed.
+'''
+import PyTango
+
+import argparse
+import collections
+import importlib
+import json
+import os
+import sys
+import tempfile
+import time
+import types
+
+import numpy
+
+from SimDeviceLib import SimDevice, SimFarm
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PHASES = ("Init", "Load", "PreStart", "Start", "State", "Read")
+#
+# histogram bucket limits in seconds
+#
+BUCKETS = (0.0001, 0.0002, 0.0005, 0.001, 0.002, 0.005,
+           0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.)
+
+
+def importCtrlModule(modName):
+    '''
+    modName, e.g. 'motor.HasyMotorCtrl', is imported from the checkout,
+    an installed sardana.PoolController comes second
+    '''
+    import sardana
+    try:
+        pkg = importlib.import_module("sardana.PoolController")
+    except ImportError:
+        pkg = types.ModuleType("sardana.PoolController")
+        pkg.__path__ = []
+        sys.modules["sardana.PoolController"] = pkg
+        sardana.PoolController = pkg
+    src = os.path.join(REPO, "python")
+    if src not in list(pkg.__path__):
+        pkg.__path__ = [src] + list(pkg.__path__)
+    return importlib.import_module("sardana.PoolController." + modName)
+
+
+def isMoving(tup):
+    if tup is None:
+        return False
+    sta = tup[0] if isinstance(tup, (tuple, list)) else tup
+    return int(sta) == int(PyTango.DevState.MOVING)
+
+
+class PhaseStats(object):
+    '''
+    the durations and the Tango call counts of one phase
+    '''
+
+    def __init__(self):
+        self.times = []
+        self.calls = []
+
+    def add(self, duration, calls):
+        self.times.append(duration)
+        self.calls.append(calls)
+
+    def histogram(self):
+        counts = [0] * (len(BUCKETS) + 1)
+        for duration in self.times:
+            for i, limit in enumerate(BUCKETS):
+                if duration < limit:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+        return counts
+
+    def summary(self):
+        times = numpy.array(self.times)
+        return {
+            "n": len(self.times),
+            "min": float(times.min()),
+            "p50": float(numpy.percentile(times, 50)),
+            "p90": float(numpy.percentile(times, 90)),
+            "max": float(times.max()),
+            "mean": float(times.mean()),
+            "calls": float(numpy.mean(self.calls)),
+            "histogram": self.histogram(),
+        }
+
+
+class Bench(object):
+    '''
+    a controller under test: the simulated devices, the controller
+    properties and the arguments of the Pool calls
+
+      nAxes: number of axes, None: the default of the bench
+      busyTime: seconds a device is busy after a start,
+        also the integration time
+    '''
+    module = None
+    className = None
+    kind = "CT"
+    defaultAxes = 1
+
+    def __init__(self, nAxes=None, busyTime=0.05):
+        self.nAxes = nAxes or self.defaultAxes
+        self.busyTime = busyTime
+        self.integTime = busyTime
+
+    def createDevices(self, farm):
+        raise NotImplementedError
+
+    def props(self):
+        return {}
+
+    def patches(self, module, farm):
+        '''
+        [(object, name, value)] set while the bench runs
+        '''
+        return []
+
+    def axes(self):
+        return list(range(1, self.nAxes + 1))
+
+    def loadAxes(self):
+        if self.kind == "CT":
+            return [1]
+        return self.axes()
+
+    def setup(self, ctrl):
+        '''
+        the axis parameters, called after AddDevice()
+        '''
+        pass
+
+    def value(self, ind, cycle):
+        return self.integTime
+
+
+class HasyMotorBench(Bench):
+    module = "motor.HasyMotorCtrl"
+    className = "HasyMotorCtrl"
+    kind = "Motor"
+    defaultAxes = 8
+
+    def createDevices(self, farm):
+        for i in range(self.nAxes):
+            farm.add(SimDevice(
+                "sim/motor/exp.%02d" % (i + 1), devClass="OmsVme58",
+                attrs={"Position": 0., "UnitLimitMax": 100.,
+                       "UnitLimitMin": -100., "CwLimit": 0, "CcwLimit": 0,
+                       "SlewRate": 1000, "Acceleration": 100,
+                       "Conversion": 1.},
+                commands={"StopMove": None}, idleCmds=("StopMove", ),
+                busyWrites=("Position", ), busyTime=self.busyTime))
+
+    def props(self):
+        return {"RootDeviceName": "sim/motor/exp"}
+
+    def value(self, ind, cycle):
+        return float(cycle % 2)
+
+
+class HKLMotorBench(Bench):
+    '''
+    an E6C diffractometer, axes 1 - 3 are h, k and l
+    '''
+    module = "motor.HKLMotorCtrl"
+    className = "HKLMotorCtrl"
+    kind = "Motor"
+    defaultAxes = 3
+    angles = ("mu", "omega", "chi", "phi", "gamma", "delta")
+
+    def __init__(self, nAxes=None, busyTime=0.05):
+        Bench.__init__(self, nAxes, busyTime)
+        self.nAxes = min(self.nAxes, 3)
+
+    def createDevices(self, farm):
+        name = "sim/diffrac/e6c"
+        farm.add(SimDevice(
+            name, devClass="Diffrac6C",
+            attrs=dict([("Simulated", 0), ("Crystal", "default"),
+                        ("Wavelength", 1.54), ("UB", numpy.eye(3))] + [
+                ("axis" + angle.capitalize(), 10. * i)
+                for i, angle in enumerate(self.angles)])),
+            properties={
+                "DiffractometerType": ["E6C"],
+                "RealAxisProxies": [
+                    "%s:sim/motor/hkl.%02d" % (angle, i + 1)
+                    for i, angle in enumerate(self.angles)]})
+        for axis in "hkl":
+            farm.add(SimDevice(
+                "%s-%s" % (name, axis), devClass="PseudoAxis",
+                attrs={"position": 0.}))
+        farm.add(SimDevice(
+            name + "-sim-hkl", devClass="PseudoAxes",
+            attrs={"h": 0., "k": 0., "l": 0., "Mode": "bissector"}))
+        for i, angle in enumerate(self.angles):
+            farm.add(SimDevice(
+                "sim/motor/hkl.%02d" % (i + 1), devClass="OmsVme58",
+                attrs={"Position": 0.}, busyWrites=("Position", ),
+                busyTime=self.busyTime))
+
+    def props(self):
+        return {"DiffracDevName": "sim/diffrac/e6c"}
+
+    def value(self, ind, cycle):
+        return float(cycle % 2)
+
+
+class SIS3820Bench(Bench):
+    module = "countertimer.SIS3820Ctrl"
+    className = "SIS3820Ctrl"
+    defaultAxes = 8
+
+    def createDevices(self, farm):
+        for i in range(self.nAxes):
+            farm.add(SimDevice(
+                "sim/sis3820/exp.%02d" % (i + 1), devClass="SIS3820",
+                attrs={"Counts": 1000. * i, "Offset": 0.},
+                commands={"Reset": None}))
+
+    def props(self):
+        return {"RootDeviceName": "sim/sis3820/exp", "MCSDevice": ""}
+
+
+def _createMCA(name, busyTime, length=2048):
+    return SimDevice(
+        name, devClass="MCA_8701",
+        attrs={"Data": numpy.arange(length, dtype=numpy.int32),
+               "DataLength": length},
+        commands={"Stop": None, "Read": None, "Clear": None, "Start": None},
+        busyCmds=("Start", ), idleCmds=("Stop", ), busyTime=busyTime)
+
+
+class HasyRoIsBench(Bench):
+    module = "countertimer.HasyRoIsCtrl"
+    className = "HasyRoIsCtrl"
+    defaultAxes = 8
+
+    def createDevices(self, farm):
+        farm.add(_createMCA("sim/mca/exp.01", self.busyTime))
+
+    def props(self):
+        return {"RootDeviceName": "sim/mca/exp.01"}
+
+    def setup(self, ctrl):
+        for ind in self.axes():
+            ctrl.SetAxisExtraPar(ind, "RoIStart", 100 * ind)
+            ctrl.SetAxisExtraPar(ind, "RoIEnd", 100 * ind + 49)
+
+
+class HasyOneDBench(Bench):
+    module = "oned.HasyOneDCtrl"
+    className = "HasyOneDCtrl"
+    kind = "OneD"
+    defaultAxes = 2
+
+    def createDevices(self, farm):
+        for i in range(self.nAxes):
+            farm.add(_createMCA("sim/mca/oned.%02d" % (i + 1), self.busyTime))
+
+    def props(self):
+        return {"RootDeviceName": "sim/mca/oned"}
+
+
+class EigerDectrisBench(Bench):
+    module = "twod.EigerDectris"
+    className = "EigerDectrisCtrl"
+    kind = "TwoD"
+
+    def createDevices(self, farm):
+        for i in range(self.nAxes):
+            name = "sim/eigerdectris/exp.%02d" % (i + 1)
+            fw = farm.add(SimDevice(
+                "sim/eigerfilewriter/exp.%02d" % (i + 1),
+                devClass="EigerFilewriter", attrs={"Status": "ready"},
+                busyTime=None), properties={"EigerDevice": [name]})
+
+            def arm(dev, argin, fw=fw):
+                dev.setValue("Status", "ready")
+                fw.startBusy()
+
+            def trigger(dev, argin):
+                dev.setValue("Status", "idle")
+
+            def disarm(dev, argin, fw=fw):
+                fw.stopBusy()
+
+            farm.add(SimDevice(
+                name, devClass="EigerDectris",
+                attrs={"CountTime": 1., "CountTimeInte": 1.,
+                       "NbTriggers": 1, "TriggerMode": "ints",
+                       "Status": "idle"},
+                commands={"Arm": arm, "Trigger": trigger, "Disarm": disarm},
+                busyCmds=("Trigger", ), busyAttrs={"Status": "acquire"},
+                busyTime=self.busyTime),
+                properties={"APIVersion": ["1.8.0"]})
+
+    def props(self):
+        return {"RootDeviceName": "sim/eigerdectris/exp"}
+
+
+class LimaCCDBench(Bench):
+    module = "twod.LimaCCD"
+    className = "LimaCCDCtrl"
+    kind = "TwoD"
+
+    def createDevices(self, farm):
+        for i in range(self.nAxes):
+            farm.add(SimDevice(
+                "sim/limaccd/exp.%02d" % (i + 1), devClass="LimaCCDs",
+                attrs={"acq_expo_time": 1., "acq_nb_frames": 1,
+                       "acq_status": "Ready", "last_image_ready": -1},
+                commands={"prepareAcq": None, "startAcq": None,
+                          "stopAcq": None},
+                busyCmds=("startAcq", ), idleCmds=("stopAcq", ),
+                busyAttrs={"acq_status": "Running"},
+                busyTime=self.busyTime))
+
+    def props(self):
+        return {"RootDeviceName": "sim/limaccd/exp"}
+
+
+class AmptekPX5Bench(Bench):
+    '''
+    axis 1 is the timer, 2 and 3 are ICR and TCR, the others are SCAs
+    '''
+    module = "countertimer.AmptekPX5CoTiCtrl"
+    className = "AmptekPX5SoftCounterTimerController"
+    defaultAxes = 8
+
+    def __init__(self, nAxes=None, busyTime=0.05):
+        Bench.__init__(self, nAxes, busyTime)
+        self.nAxes = max(self.nAxes, 3)
+        # the PX5 does not support less than 0.1s
+        self.integTime = max(busyTime, 0.1)
+
+    def createDevices(self, farm):
+        config = {"PRET": "1.000000"}
+
+        def setConf(dev, argin):
+            for item in argin:
+                key, value = item.split('=')
+                config[key] = value
+
+        def getConf(dev, argin):
+            return ["%s=%s" % (key, config.get(key, "0")) for key in argin]
+
+        farm.add(SimDevice(
+            "sim/amptekpx5/exp.01", devClass="AmptekPX5",
+            attrs={"Spectrum": numpy.arange(4096, dtype=numpy.int32),
+                   "FastCount": 1000., "SlowCount": 900.},
+            commands={"SetTextConfiguration": setConf,
+                      "GetTextConfiguration": getConf,
+                      "ClearSpectrum": None, "ClearInputBuffer": None,
+                      "LatchGetClearSCA": None,
+                      "Enable": None, "Disable": None},
+            busyCmds=("Enable", ), idleCmds=("Disable", ),
+            busyTime=self.integTime))
+
+    def props(self):
+        return {"deviceName": "sim/amptekpx5/exp.01"}
+
+    def setup(self, ctrl):
+        for ind in self.axes()[3:]:
+            ctrl.SetAxisExtraPar(ind, "lowThreshold", 100 * ind)
+            ctrl.SetAxisExtraPar(ind, "highThreshold", 100 * ind + 50)
+
+
+BENCHES = collections.OrderedDict(
+    (bench.className, bench) for bench in (
+        HasyMotorBench, HKLMotorBench, SIS3820Bench, HasyRoIsBench,
+        HasyOneDBench, EigerDectrisBench, LimaCCDBench, AmptekPX5Bench))
+
+
+def ctrlProps(cls, props):
+    '''
+    the DefaultValue of the ctrl_properties updated by props,
+    the Pool does the same
+    '''
+    from sardana.pool.controller import DefaultValue
+    result = {}
+    for name, info in getattr(cls, "ctrl_properties", {}).items():
+        if DefaultValue in info:
+            result[name] = info[DefaultValue]
+    result.update(props)
+    return result
+
+
+class Runner(object):
+    '''
+    runs one bench and collects the PhaseStats
+    '''
+
+    def __init__(self, bench, farm, cycles, pollPeriod, statesPerRead,
+                 timeout, callStats=False):
+        self.bench = bench
+        self.farm = farm
+        self.cycles = cycles
+        self.pollPeriod = pollPeriod
+        self.statesPerRead = statesPerRead
+        self.timeout = timeout
+        self.callStats = callStats
+        self.stats = collections.OrderedDict(
+            (phase, PhaseStats()) for phase in PHASES)
+
+    def timed(self, phase, func):
+        calls = self.farm.totalCalls()
+        start = time.perf_counter()
+        result = func()
+        self.stats[phase].add(time.perf_counter() - start,
+                              self.farm.totalCalls() - calls)
+        return result
+
+    def create(self, cls):
+        ctrl = cls(self.bench.className + "_bench",
+                   ctrlProps(cls, self.bench.props()))
+        for ind in self.bench.axes():
+            ctrl.AddDevice(ind)
+        return ctrl
+
+    def load(self, ctrl):
+        for ind in self.bench.loadAxes():
+            ctrl.LoadOne(ind, self.bench.integTime, 1, 0.)
+
+    def preStart(self, ctrl, cycle):
+        ctrl.PreStartAll()
+        for ind in self.bench.axes():
+            ctrl.PreStartOne(ind, self.bench.value(ind, cycle))
+
+    def start(self, ctrl, cycle):
+        for ind in self.bench.axes():
+            ctrl.StartOne(ind, self.bench.value(ind, cycle))
+        ctrl.StartAll()
+
+    def state(self, ctrl):
+        ctrl.PreStateAll()
+        for ind in self.bench.axes():
+            ctrl.PreStateOne(ind)
+        ctrl.StateAll()
+        return [ctrl.StateOne(ind) for ind in self.bench.axes()]
+
+    def read(self, ctrl):
+        ctrl.PreReadAll()
+        for ind in self.bench.axes():
+            ctrl.PreReadOne(ind)
+        ctrl.ReadAll()
+        return [ctrl.ReadOne(ind) for ind in self.bench.axes()]
+
+    def cycle(self, ctrl, cycle):
+        if self.bench.kind != "Motor":
+            self.timed("Load", lambda: self.load(ctrl))
+        self.timed("PreStart", lambda: self.preStart(ctrl, cycle))
+        self.timed("Start", lambda: self.start(ctrl, cycle))
+        deadline = time.monotonic() + self.timeout
+        count = 0
+        while True:
+            states = self.timed("State", lambda: self.state(ctrl))
+            count += 1
+            if not any(isMoving(tup) for tup in states):
+                break
+            if time.monotonic() > deadline:
+                raise RuntimeError(
+                    "%s: still MOVING after %gs, cycle %d" %
+                    (self.bench.className, self.timeout, cycle))
+            if count % self.statesPerRead == 0:
+                self.timed("Read", lambda: self.read(ctrl))
+            time.sleep(self.pollPeriod)
+        self.timed("Read", lambda: self.read(ctrl))
+
+    def run(self):
+        module = importCtrlModule(self.bench.module)
+        cls = getattr(module, self.bench.className)
+        from sardana.PoolController.common import CallStatsLib
+        CallStatsLib.enable(self.callStats)
+        CallStatsLib.reset()
+        self.bench.createDevices(self.farm)
+        patches = self.bench.patches(module, self.farm)
+        saved = [(obj, name, getattr(obj, name)) for obj, name, value
+                 in patches]
+        try:
+            for obj, name, value in patches:
+                setattr(obj, name, value)
+            with self.farm.installed():
+                resetCaches()
+                ctrl = self.timed("Init", lambda: self.create(cls))
+                try:
+                    self.bench.setup(ctrl)
+                    for cycle in range(self.cycles):
+                        self.cycle(ctrl, cycle)
+                    if self.callStats:
+                        sys.stdout.write("%s\n" % CallStatsLib.report(
+                            CallStatsLib.ctrlName(ctrl)))
+                finally:
+                    for ind in self.bench.axes():
+                        ctrl.DeleteDevice(ind)
+                    resetCaches()
+        finally:
+            for obj, name, value in saved:
+                setattr(obj, name, value)
+        return self.stats
+
+
+def resetCaches():
+    '''
+    the shared caches must not leak from one bench into the next
+    '''
+    from sardana.PoolController.common import CapabilityProbeLib
+    from sardana.PoolController.common import DeviceDiscoveryLib
+    from sardana.PoolController.common import ProxyPoolLib
+    from sardana.PoolController.common import SpectrumExchangeLib
+    DeviceDiscoveryLib.invalidateDeviceCache()
+    # the Database objects belong to the farm of the former bench
+    DeviceDiscoveryLib._dbs.clear()
+    ProxyPoolLib.resetDevice()
+    CapabilityProbeLib.invalidateCapabilities()
+    SpectrumExchangeLib.reset()
+
+
+def formatTime(seconds):
+    return "%.3f" % (seconds * 1000.)
+
+
+def report(name, summaries, calls, fp=sys.stdout):
+    fp.write("\n%s\n" % name)
+    fp.write("  %-9s %6s %9s %9s %9s %9s %7s\n" % (
+        "phase", "n", "min/ms", "p50/ms", "p90/ms", "max/ms", "calls"))
+    for phase, summary in summaries.items():
+        fp.write("  %-9s %6d %9s %9s %9s %9s %7.1f\n" % (
+            phase, summary["n"], formatTime(summary["min"]),
+            formatTime(summary["p50"]), formatTime(summary["p90"]),
+            formatTime(summary["max"]), summary["calls"]))
+    limits = ["<%gms" % (limit * 1000.) for limit in BUCKETS] + [
+        ">=%gms" % (BUCKETS[-1] * 1000.)]
+    fp.write("  histograms\n")
+    for phase, summary in summaries.items():
+        fp.write("  %-9s %s\n" % (phase, " ".join(
+            "%s:%d" % (limit, count) for limit, count in
+            zip(limits, summary["histogram"]) if count)))
+    fp.write("  Tango calls\n")
+    for call, count in sorted(calls.items(), key=lambda item: -item[1]):
+        fp.write("  %7d %s\n" % (count, call))
+
+
+def compare(results, baseline, tolerance, fp=sys.stdout):
+    '''
+    returns the number of regressions, a phase is slower if its
+    median grew by more than tolerance and more than 0.1 ms
+    '''
+    regressions = 0
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for phase, summary in result["phases"].items():
+            base = baseline[name]["phases"].get(phase)
+            if base is None:
+                continue
+            if summary["p50"] > base["p50"] * (1. + tolerance) and \
+               summary["p50"] - base["p50"] > 0.0001:
+                fp.write("REGRESSION %s %s: p50 %sms, baseline %sms\n" % (
+                    name, phase, formatTime(summary["p50"]),
+                    formatTime(base["p50"])))
+                regressions += 1
+            if summary["calls"] > base["calls"]:
+                fp.write("REGRESSION %s %s: %.1f calls, baseline %.1f\n" % (
+                    name, phase, summary["calls"], base["calls"]))
+                regressions += 1
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="benchmark the controllers against simulated devices")
+    parser.add_argument(
+        "-c", "--ctrl", action="append", choices=list(BENCHES.keys()),
+        help="controller class, may be repeated, default: all")
+    parser.add_argument(
+        "-n", "--cycles", type=int, default=20,
+        help="acquisitions/moves per controller, default: 20")
+    parser.add_argument(
+        "-a", "--axes", type=int, default=None,
+        help="number of axes, default: depends on the controller")
+    parser.add_argument(
+        "-l", "--latency", type=float, default=0.001,
+        help="seconds per Tango call, default: 0.001")
+    parser.add_argument(
+        "-j", "--jitter", type=float, default=0.,
+        help="standard deviation of the latency, default: 0")
+    parser.add_argument(
+        "-b", "--busy", type=float, default=0.05,
+        help="integration/move time in seconds, default: 0.05")
+    parser.add_argument(
+        "--poll", type=float, default=0.01,
+        help="seconds between state queries, default: 0.01")
+    parser.add_argument(
+        "--states-per-read", type=int, default=5,
+        help="state queries per value read, default: 5")
+    parser.add_argument(
+        "-t", "--timeout", type=float, default=10.,
+        help="seconds an acquisition may take, default: 10")
+    parser.add_argument(
+        "--json", help="write the results to this file")
+    parser.add_argument(
+        "--baseline", help="compare with the --json output of a former run")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2,
+        help="allowed relative increase of the median, default: 0.2")
+    parser.add_argument(
+        "--stats", action="store_true",
+        help="print the CallStatsLib report of each controller, "
+        "the statistics add to the latencies")
+    args = parser.parse_args()
+
+    # keep the capability cache of the user out of the benchmark
+    os.environ["SARDANA_CTRL_CACHE_DIR"] = tempfile.mkdtemp(
+        prefix="ctrlbench")
+
+    results = collections.OrderedDict()
+    for name in args.ctrl or BENCHES.keys():
+        farm = SimFarm(latency=args.latency, jitter=args.jitter)
+        bench = BENCHES[name](nAxes=args.axes, busyTime=args.busy)
+        stats = Runner(bench, farm, args.cycles, args.poll,
+                       args.states_per_read, args.timeout,
+                       callStats=args.stats).run()
+        summaries = collections.OrderedDict(
+            (phase, phaseStats.summary())
+            for phase, phaseStats in stats.items() if phaseStats.times)
+        calls = dict(farm.callsByName())
+        report(name, summaries, calls)
+        results[name] = {"axes": bench.nAxes, "latency": args.latency,
+                         "phases": summaries, "calls": calls}
+
+    if args.json:
+        with open(args.json, "w") as fp:
+            json.dump(results, fp, indent=1)
+    if args.baseline:
+        with open(args.baseline) as fp:
+            baseline = json.load(fp)
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
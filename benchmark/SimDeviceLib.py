@@ -0,0 +1,473 @@
+#!/usr/bin/env python
+'''
+simulated Tango devices for benchmarking the controllers without
+hardware. A SimFarm holds the devices of a benchmark run and stands
+in for PyTango.DeviceProxy and PyTango.Database while installed:
+
+    farm = SimFarm(latency=0.001)
+    farm.add(SimDevice("p09/motor/exp.01",
+                       attrs={"Position": 0., "CwLimit": 0},
+                       commands={"StopMove": SimDevice.stopBusy}))
+    with farm.installed():
+        ctrl = HasyMotorCtrl("bench", {"RootDeviceName": "p09/motor/exp"})
+
+Every call which talks to a device on a real system sleeps for the
+latency of the farm and is counted per device and per call, e.g.
+'read_attribute(Position)'. Asynchronous requests return at once,
+their replies become available one latency after the request, so
+concurrent requests overlap like they do on the network.
+
+A device is busy (State MOVING) after startBusy() until busyTime has
+elapsed or stopBusy() has been called. busyAttrs maps attributes to
+the value they have while the device is busy, e.g.
+{"acq_status": "Running"}, otherwise the stored value is read.
+'''
+import PyTango
+
+import collections
+import contextlib
+import fnmatch
+import random
+import threading
+import time
+
+
+class SimAttribute(object):
+    '''
+    what read_attribute() returns, DeviceAttribute-like
+    '''
+
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+        self.w_value = value
+        self.quality = PyTango.AttrQuality.ATTR_VALID
+        self.time = time.time()
+        shape = getattr(value, "shape", ())
+        self.dim_x = shape[-1] if len(shape) > 0 else 1
+        self.dim_y = shape[0] if len(shape) > 1 else 0
+
+
+class SimDeviceInfo(object):
+    def __init__(self, devClass, server):
+        self.dev_class = devClass
+        # Database.get_device_info() and DeviceProxy.info() flavours
+        self.ds_full_name = server
+        self.server_id = server
+
+
+class SimCommandInfo(object):
+    def __init__(self, name):
+        self.cmd_name = name
+
+
+class SimDevice(object):
+    '''
+    stands in for a PyTango.DeviceProxy
+
+      attrs: {attrName: value}, State and Status are built in
+      commands: {cmdName: func(device, argin) or None}
+      busyCmds: commands starting an acquisition/move
+      idleCmds: commands ending it
+      busyAttrs: {attrName: value while busy}
+      busyWrites: attributes starting a move when written, e.g. Position
+      busyTime: seconds a device is busy, None: until stopBusy()
+    '''
+
+    def __init__(self, name, attrs=None, commands=None, devClass="SimDevice",
+                 server=None, busyCmds=(), idleCmds=(), busyAttrs=None,
+                 busyWrites=(), busyTime=0.):
+        self.name_ = name
+        self.devClass = devClass
+        self.server = server or "SimServer/%s" % devClass
+        self.attrs = collections.OrderedDict()
+        for attrName, value in (attrs or {}).items():
+            self.attrs[attrName.lower()] = (attrName, value)
+        self.commands = collections.OrderedDict()
+        for cmdName in ("State", "Status"):
+            self.commands[cmdName.lower()] = (cmdName, None)
+        for cmdName, func in (commands or {}).items():
+            self.commands[cmdName.lower()] = (cmdName, func)
+        self.busyCmds = set(cmd.lower() for cmd in busyCmds)
+        self.idleCmds = set(cmd.lower() for cmd in idleCmds)
+        self.busyAttrs = dict(
+            (attrName.lower(), values)
+            for attrName, values in (busyAttrs or {}).items())
+        self.busyWrites = set(attrName.lower() for attrName in busyWrites)
+        self.busyTime = busyTime
+        self.busyUntil = None
+        self.idleState = PyTango.DevState.ON
+        self.farm = None
+        self.timeout = 3000
+
+    #
+    # simulation
+    #
+    def isBusy(self):
+        if self.busyUntil is None:
+            return False
+        if self.busyUntil > time.monotonic():
+            return True
+        self.busyUntil = None
+        return False
+
+    def startBusy(self, argin=None):
+        if self.busyTime is None:
+            self.busyUntil = float("inf")
+        else:
+            self.busyUntil = time.monotonic() + self.busyTime
+
+    def stopBusy(self, argin=None):
+        self.busyUntil = None
+
+    def setValue(self, attrName, value):
+        key = attrName.lower()
+        name = self.attrs[key][0] if key in self.attrs else attrName
+        self.attrs[key] = (name, value)
+
+    def getValue(self, attrName):
+        key = attrName.lower()
+        if key in self.busyAttrs and self.isBusy():
+            return self.busyAttrs[key]
+        if key == "state":
+            return self._state()
+        if key in self.attrs:
+            return self.attrs[key][1]
+        if key == "status":
+            return "The device is in %s state." % self._state()
+        PyTango.Except.throw_exception(
+            "API_AttrNotFound",
+            "%s has no attribute %s" % (self.name_, attrName),
+            "SimDevice.getValue")
+
+    def _state(self):
+        if self.isBusy():
+            return PyTango.DevState.MOVING
+        return self.idleState
+
+    def _status(self):
+        return self.getValue("Status")
+
+    def _count(self, call):
+        if self.farm is not None:
+            self.farm.count(self.name_, call)
+
+    def _wait(self):
+        if self.farm is not None:
+            self.farm.wait()
+
+    def _write(self, attrName, value):
+        key = attrName.lower()
+        if key not in self.attrs:
+            PyTango.Except.throw_exception(
+                "API_AttrNotFound",
+                "%s has no attribute %s" % (self.name_, attrName),
+                "SimDevice._write")
+        self.setValue(attrName, value)
+        if key in self.busyWrites:
+            self.startBusy()
+
+    def _execute(self, cmdName, argin=None):
+        key = cmdName.lower()
+        if key not in self.commands:
+            PyTango.Except.throw_exception(
+                "API_CommandNotFound",
+                "%s has no command %s" % (self.name_, cmdName),
+                "SimDevice._execute")
+        if key == "state":
+            return self._state()
+        if key == "status":
+            return self._status()
+        if key in self.idleCmds:
+            self.stopBusy()
+        if key in self.busyCmds:
+            self.startBusy()
+        func = self.commands[key][1]
+        if func is not None:
+            return func(self, argin)
+        return None
+
+    #
+    # DeviceProxy interface, calls talking to the device are counted
+    #
+    def name(self):
+        return self.name_
+
+    def dev_name(self):
+        return self.name_
+
+    def info(self):
+        self._count("info")
+        self._wait()
+        return SimDeviceInfo(self.devClass, self.server)
+
+    def ping(self):
+        self._count("ping")
+        self._wait()
+        return 1
+
+    def set_timeout_millis(self, timeout):
+        self.timeout = timeout
+
+    def get_timeout_millis(self):
+        return self.timeout
+
+    def state(self):
+        self._count("state")
+        self._wait()
+        return self._state()
+
+    def status(self):
+        self._count("status")
+        self._wait()
+        return self._status()
+
+    def get_attribute_list(self):
+        self._count("get_attribute_list")
+        self._wait()
+        return ["State", "Status"] + [
+            name for name, value in self.attrs.values()]
+
+    def command_list_query(self):
+        self._count("command_list_query")
+        self._wait()
+        return [SimCommandInfo(name) for name, func in self.commands.values()]
+
+    def read_attribute(self, attrName):
+        self._count("read_attribute(%s)" % attrName)
+        self._wait()
+        return SimAttribute(attrName, self.getValue(attrName))
+
+    def read_attributes(self, attrNames):
+        self._count("read_attributes(%s)" % ",".join(attrNames))
+        self._wait()
+        return [SimAttribute(name, self.getValue(name)) for name in attrNames]
+
+    def write_attribute(self, attrName, value):
+        self._count("write_attribute(%s)" % attrName)
+        self._wait()
+        self._write(attrName, value)
+
+    def write_attributes(self, nameValues):
+        self._count("write_attributes(%s)" % ",".join(
+            name for name, value in nameValues))
+        self._wait()
+        for name, value in nameValues:
+            self._write(name, value)
+
+    def command_inout(self, cmdName, argin=None):
+        self._count("command_inout(%s)" % cmdName)
+        self._wait()
+        return self._execute(cmdName, argin)
+
+    def read_attributes_asynch(self, attrNames):
+        self._count("read_attributes_asynch(%s)" % ",".join(attrNames))
+        return self.farm.request(
+            lambda: [SimAttribute(name, self.getValue(name))
+                     for name in attrNames])
+
+    def read_attributes_reply(self, reqId, timeout=0):
+        return self.farm.reply(reqId)
+
+    def command_inout_asynch(self, cmdName, argin=None):
+        self._count("command_inout_asynch(%s)" % cmdName)
+        return self.farm.request(lambda: self._execute(cmdName, argin))
+
+    def command_inout_reply(self, reqId, timeout=0):
+        return self.farm.reply(reqId)
+
+    def write_attribute_asynch(self, attrName, value):
+        self._count("write_attribute_asynch(%s)" % attrName)
+        return self.farm.request(lambda: self._write(attrName, value))
+
+    def write_attribute_reply(self, reqId, timeout=0):
+        self.farm.reply(reqId)
+
+    def get_property(self, propNames):
+        self._count("get_property")
+        self._wait()
+        props = self.farm.properties.get(self.name_.lower(), {})
+        return dict((name, list(props.get(name, [])))
+                    for name in propNames)
+
+    def subscribe_event(self, attrName, eventType, callback, *args):
+        # no event system, the trackers fall back to polling
+        PyTango.Except.throw_exception(
+            "API_EventPropertiesNotSet",
+            "%s: events are not simulated" % self.name_,
+            "SimDevice.subscribe_event")
+
+    def unsubscribe_event(self, eventId):
+        pass
+
+    def __getattr__(self, name):
+        # commands as methods and attributes as members, like
+        # DeviceProxy and taurus devices do
+        if name.startswith("_") or name in ("attrs", "commands"):
+            raise AttributeError(name)
+        key = name.lower()
+        if key in self.commands:
+            def command(argin=None):
+                return self.command_inout(self.commands[key][0], argin)
+            return command
+        if key in self.attrs:
+            return self.read_attribute(self.attrs[key][0]).value
+        raise AttributeError(name)
+
+
+class _Datum(object):
+    def __init__(self, values):
+        self.value_string = list(values)
+
+
+class SimDatabase(object):
+    '''
+    stands in for PyTango.Database, answers from the devices of a farm
+    '''
+
+    def __init__(self, farm):
+        self.farm = farm
+
+    def get_device_exported(self, pattern):
+        self.farm.count("database", "get_device_exported")
+        self.farm.wait()
+        names = [name for name in self.farm.devices
+                 if fnmatch.fnmatch(name.lower(), pattern.lower())]
+        return _Datum(names)
+
+    def get_device_name(self, server, className):
+        self.farm.count("database", "get_device_name")
+        self.farm.wait()
+        return _Datum([
+            dev.name_ for dev in self.farm.devices.values()
+            if dev.devClass == className and
+            fnmatch.fnmatch(dev.server, server)])
+
+    def get_device_info(self, devName):
+        self.farm.count("database", "get_device_info")
+        self.farm.wait()
+        dev = self.farm.device(devName)
+        return SimDeviceInfo(dev.devClass, dev.server)
+
+    def get_device_property(self, devName, propNames):
+        self.farm.count("database", "get_device_property")
+        self.farm.wait()
+        props = self.farm.properties.get(devName.lower(), {})
+        return dict((name, list(props.get(name, []))) for name in propNames)
+
+
+class SimFarm(object):
+    '''
+    the simulated devices, DB properties and call statistics of
+    a benchmark run, latency and jitter are seconds
+    '''
+
+    def __init__(self, latency=0., jitter=0.):
+        self.latency = latency
+        self.jitter = jitter
+        self.devices = collections.OrderedDict()
+        self.properties = {}
+        self.calls = collections.Counter()
+        self.lock = threading.Lock()
+        self.requests = {}
+        self.nextReqId = 1
+
+    def add(self, device, properties=None):
+        device.farm = self
+        self.devices[device.name_.lower()] = device
+        if properties:
+            self.properties[device.name_.lower()] = properties
+        return device
+
+    def device(self, name):
+        '''
+        name may carry a 'host:port/' prefix
+        '''
+        key = name.lower()
+        if key.startswith("tango://"):
+            key = key[len("tango://"):]
+        if key not in self.devices and key.count('/') == 3:
+            key = key.split('/', 1)[1]
+        if key not in self.devices:
+            PyTango.Except.throw_exception(
+                "API_DeviceNotExported",
+                "%s is not simulated" % name, "SimFarm.device")
+        return self.devices[key]
+
+    def DeviceProxy(self, name, *args, **kwargs):
+        return self.device(name)
+
+    def Database(self, *args, **kwargs):
+        return SimDatabase(self)
+
+    def delay(self):
+        if self.jitter:
+            return max(0., random.gauss(self.latency, self.jitter))
+        return self.latency
+
+    def wait(self):
+        delay = self.delay()
+        if delay > 0.:
+            time.sleep(delay)
+
+    def count(self, devName, call):
+        with self.lock:
+            self.calls[(devName, call)] += 1
+
+    def totalCalls(self):
+        with self.lock:
+            return sum(self.calls.values())
+
+    def callsByName(self):
+        '''
+        {call: count} summed over the devices
+        '''
+        result = collections.Counter()
+        with self.lock:
+            for (devName, call), count in self.calls.items():
+                result[call] += count
+        return result
+
+    def resetCalls(self):
+        with self.lock:
+            self.calls.clear()
+
+    def request(self, func):
+        '''
+        execute an asynchronous request, the reply is due
+        one latency from now
+        '''
+        due = time.monotonic() + self.delay()
+        try:
+            result = (func(), None)
+        except PyTango.DevFailed as exc:
+            result = (None, exc)
+        with self.lock:
+            reqId = self.nextReqId
+            self.nextReqId += 1
+            self.requests[reqId] = (due, result)
+        return reqId
+
+    def reply(self, reqId):
+        with self.lock:
+            due, (value, exc) = self.requests.pop(reqId)
+        delay = due - time.monotonic()
+        if delay > 0.:
+            time.sleep(delay)
+        if exc is not None:
+            raise exc
+        return value
+
+    @contextlib.contextmanager
+    def installed(self):
+        '''
+        PyTango.DeviceProxy and PyTango.Database refer to this
+        farm while the context is active
+        '''
+        saved = (PyTango.DeviceProxy, PyTango.Database)
+        PyTango.DeviceProxy = self.DeviceProxy
+        PyTango.Database = self.Database
+        try:
+            yield self
+        finally:
+            PyTango.DeviceProxy, PyTango.Database = saved
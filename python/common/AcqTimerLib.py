@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+'''
+software timer for controllers which decide from the elapsed time
+whether an acquisition can be finished, e.g. SIS3820Ctrl, DGG2Ctrl,
+HasyOneDCtrl:
+
+    self.timer = AcqTimer(margin=0.2)
+    LoadOne:   self.timer.load(value)
+    StartAll:  self.timer.start()
+    StateOne:  if not self.timer.mayBeDone():
+                   return (State.Moving, "%gs left" % self.timer.wakeupHint())
+               sta = self.proxy.State()
+
+time.monotonic() is used, so clock adjustments do not end or extend
+an acquisition. margin is the settle time a device needs after the
+integration time before its state is worth asking for, wakeupHint()
+tells how long it is until then. If that is no more than wakeupWait
+seconds, mayBeDone() sleeps it out instead of letting the Pool poll
+once more with the hardware still moving.
+'''
+import time
+
+#
+# seconds mayBeDone() rather sleeps than answering 'not yet'
+#
+WAKEUP_WAIT = 0.01
+
+
+class AcqTimer(object):
+    '''
+    the integration time and the start of the current acquisition
+    '''
+
+    def __init__(self, margin=0., wakeupWait=WAKEUP_WAIT):
+        self.margin = margin
+        self.wakeupWait = wakeupWait
+        self.integTime = None
+        self.startTime = None
+
+    def load(self, integTime):
+        self.integTime = integTime
+
+    def start(self):
+        self.startTime = time.monotonic()
+
+    def stop(self):
+        self.startTime = None
+
+    def isStarted(self):
+        return self.startTime is not None
+
+    def elapsed(self):
+        '''
+        seconds since start(), 0 if not started
+        '''
+        if self.startTime is None:
+            return 0.
+        return time.monotonic() - self.startTime
+
+    def wakeupHint(self):
+        '''
+        seconds until the device may have finished, 0 if this
+        is the case already or the timer is not running
+        '''
+        if self.startTime is None or self.integTime is None:
+            return 0.
+        return max(0., self.integTime + self.margin - self.elapsed())
+
+    def mayBeDone(self):
+        '''
+        True, if the integration time and the margin have elapsed
+        or the timer is not running, the hardware has to be asked then
+        '''
+        hint = self.wakeupHint()
+        if 0. < hint <= self.wakeupWait:
+            time.sleep(hint)
+            return True
+        return hint <= 0.
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+'''
+configuration snapshot of a device for controllers which map their
+extra parameters to Tango attributes, e.g. LimaCCDCtrl, PilatusCtrl:
+
+    self.snapshot[ind - 1] = AttrSnapshot(
+        self.proxy[ind - 1], {"ExposureTime": "acq_expo_time", ...})
+    GetAxisExtraPar:  if self.snapshot[ind - 1].has(name):
+                          return self.snapshot[ind - 1].get(name)
+    SetAxisExtraPar:  if self.snapshot[ind - 1].isWritable(name):
+                          self.snapshot[ind - 1].set(name, value)
+
+the first get() reads all mapped attributes with one read_attributes()
+call, the following ones are served from the snapshot until it is
+older than ttl seconds. Clients asking for all parameters at scan start
+cause one round trip instead of one per parameter.
+
+set() writes the attribute and drops the snapshot, so does
+invalidate(), to be called when the device changes its configuration
+by itself, e.g. after LoadOne, a start or a Reset. Attributes which
+change during an acquisition (last image, next file number) are not
+meant to be mapped. Read-only parameters, e.g. the camera type, are
+mapped with readOnly, they are read with the others but never written.
+'''
+import time
+
+DEFAULT_TTL = 0.5
+
+
+class AttrSnapshot(object):
+    '''
+    the mapped attributes of a device, read together
+    '''
+
+    def __init__(self, proxy, attrMap, ttl=DEFAULT_TTL, readOnly=()):
+        '''
+        attrMap: extra parameter name -> Tango attribute name
+        readOnly: the extra parameters of attrMap which set() refuses
+        '''
+        self.proxy = proxy
+        self.attrMap = dict(attrMap)
+        self.readOnly = set(readOnly)
+        self.attrNames = list(self.attrMap.values())
+        self.ttl = ttl
+        self.values = None
+        self.stamp = 0.
+
+    def has(self, name):
+        return name in self.attrMap
+
+    def isWritable(self, name):
+        return name in self.attrMap and name not in self.readOnly
+
+    def invalidate(self):
+        self.values = None
+
+    def isValid(self):
+        return self.values is not None and \
+            (time.monotonic() - self.stamp) <= self.ttl
+
+    def refresh(self):
+        '''
+        reads all mapped attributes, failed ones are left out
+        and read alone by get(), which raises their error. If the
+        whole call fails, e.g. because a device lacks one of the
+        attributes, all are read alone until the next refresh.
+        '''
+        values = {}
+        try:
+            attrs = self.proxy.read_attributes(self.attrNames)
+            for attrName, attr in zip(self.attrNames, attrs):
+                if not getattr(attr, "has_failed", False):
+                    values[attrName] = attr.value
+        except Exception:
+            values = {}
+        self.values = values
+        self.stamp = time.monotonic()
+
+    def get(self, name):
+        attrName = self.attrMap[name]
+        if not self.isValid():
+            self.refresh()
+        if attrName not in self.values:
+            return self.proxy.read_attribute(attrName).value
+        return self.values[attrName]
+
+    def set(self, name, value):
+        if name in self.readOnly:
+            raise ValueError("AttrSnapshot.set: %s is read-only" % name)
+        self.proxy.write_attribute(self.attrMap[name], value)
+        # writing one attribute may change others, e.g. times
+        self.invalidate()
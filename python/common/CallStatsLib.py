@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+'''
+opt-in statistics of the Tango calls made through ProxyPoolLib:
+count, time and latency histogram per controller, axis, Pool call
+(ReadOne, StateOne, ...), device and device call, e.g.
+
+    HasyMotorCtrl_exp 3 StateOne p09/motor/exp.03 read_attribute(CwLimit)
+
+The statistics are off by default, they are switched on by the
+environment variable SARDANA_CTRL_STATS=1 or by enable(). Then each
+call costs a clock reading and a short walk up the stack to find the
+Pool call which issued it.
+
+Calls are booked to the controller which owns the proxy:
+
+    self.proxy[ind - 1] = getProxy(proxy_name, owner=self)
+
+the Pool call and the axis are taken from the innermost method of
+the owner on the stack which is a Pool call, so calls made by helpers
+(trackers, snapshots, ...) are booked to the controller and the Pool
+call which uses them. Calls through proxies without an owner are
+booked as '-'.
+
+Controllers expose them through SendToCtrl(), the decorator handles
+the statistics commands and passes other input to the controller:
+
+    @CallStatsLib.statsCommands
+    def SendToCtrl(self, in_data):
+        return "Nothing sent"
+
+understood are 'stats' (report of this controller), 'stats all',
+'stats on', 'stats off', 'stats reset' and 'stats dump <file>'
+(JSON, all controllers).
+'''
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+#
+# histogram bucket limits in seconds, the last bucket is >= 1s
+#
+BUCKETS = (0.0001, 0.0002, 0.0005, 0.001, 0.002, 0.005,
+           0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.)
+#
+# the Pool calls which are attributed, calls outside of them
+# are booked as '-', __init__ is the one of the controller
+#
+POOL_METHODS = set((
+    "__init__", "AddDevice", "DeleteDevice",
+    "PreStateAll", "PreStateOne", "StateAll", "StateOne",
+    "PreReadAll", "PreReadOne", "ReadAll", "ReadOne",
+    "PreLoadAll", "PreLoadOne", "LoadAll", "LoadOne",
+    "PreStartAll", "PreStartOne", "StartAll", "StartOne",
+    "AbortAll", "AbortOne", "StopAll", "StopOne",
+    "GetAxisPar", "SetAxisPar", "GetAxisExtraPar", "SetAxisExtraPar",
+    "GetCtrlPar", "SetCtrlPar", "DefinePosition", "SendToCtrl",
+    "Calc", "CalcPseudo", "CalcPhysical", "CalcAllPseudo",
+    "CalcAllPhysical"))
+#
+# Pool calls without an axis argument
+#
+CTRL_METHODS = set((
+    "__init__", "PreStateAll", "StateAll", "PreReadAll", "ReadAll",
+    "PreLoadAll", "LoadAll", "PreStartAll", "StartAll", "AbortAll",
+    "StopAll", "GetCtrlPar", "SetCtrlPar", "SendToCtrl"))
+#
+# stack frames searched for the Pool call of the owner
+#
+MAX_DEPTH = 20
+
+_lock = threading.Lock()
+_enabled = os.environ.get("SARDANA_CTRL_STATS", "0") not in ("", "0")
+#
+# (ctrlName, axis, poolCall, device, call) -> _Entry
+#
+_entries = {}
+
+
+class _Entry(object):
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.
+        self.max = 0.
+        self.histogram = [0] * (len(BUCKETS) + 1)
+
+    def add(self, duration, ok):
+        self.count += 1
+        if not ok:
+            self.errors += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+        for i, limit in enumerate(BUCKETS):
+            if duration < limit:
+                self.histogram[i] += 1
+                break
+        else:
+            self.histogram[-1] += 1
+
+
+def isEnabled():
+    return _enabled
+
+
+def enable(flag=True):
+    global _enabled
+    _enabled = bool(flag)
+
+
+def reset(ctrlName=None):
+    '''
+    drop the statistics of a controller, all if ctrlName is None
+    '''
+    with _lock:
+        if ctrlName is None:
+            _entries.clear()
+            return
+        for key in list(_entries.keys()):
+            if key[0] == ctrlName:
+                del _entries[key]
+
+
+def ctrlName(ctrl):
+    '''
+    the instance name of the controller as known to the Pool
+    '''
+    try:
+        return ctrl.GetName()
+    except Exception:
+        return type(ctrl).__name__
+
+
+def _caller(owner):
+    '''
+    (ctrlName, axis, poolCall) of the Pool call of owner
+    which issued the current device call
+    '''
+    if owner is None:
+        return "-", 0, "-"
+    frame = sys._getframe(1)
+    depth = 0
+    while frame is not None and depth < MAX_DEPTH:
+        code = frame.f_code
+        if code.co_name in POOL_METHODS and code.co_argcount > 0 and \
+           frame.f_locals.get(code.co_varnames[0]) is owner:
+            axis = 0
+            if code.co_name not in CTRL_METHODS and code.co_argcount > 1:
+                axis = frame.f_locals.get(code.co_varnames[1], 0)
+            return ctrlName(owner), axis, code.co_name
+        frame = frame.f_back
+        depth += 1
+    return ctrlName(owner), 0, "-"
+
+
+def _callName(method, args):
+    name = getattr(method, "__name__", str(method))
+    if name in ("getattr", "setattr"):
+        # Tango attributes accessed as Python attributes
+        return "%s(%s)" % (name, args[1])
+    if args:
+        target = args[0]
+        if isinstance(target, (list, tuple)):
+            # write_attributes() gets (name, value) pairs
+            target = ",".join(
+                str(item[0]) if isinstance(item, (list, tuple)) else
+                str(item) for item in target)
+        if isinstance(target, str):
+            return "%s(%s)" % (name, target)
+    return name
+
+
+def record(device, method, args, duration, ok=True, owner=None):
+    '''
+    called by ProxyPoolLib for every device call while enabled
+    '''
+    ctrl, axis, poolCall = _caller(owner)
+    key = (ctrl, axis, poolCall, device, _callName(method, args))
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            entry = _Entry()
+            _entries[key] = entry
+        entry.add(duration, ok)
+
+
+def timed(device, method, args, kwargs, owner=None):
+    '''
+    method(*args, **kwargs), recorded if the statistics are enabled
+    '''
+    if not _enabled:
+        return method(*args, **kwargs)
+    start = time.perf_counter()
+    result = None
+    ok = False
+    try:
+        result = method(*args, **kwargs)
+        ok = True
+        return result
+    finally:
+        # looking up a DeviceProxy method is no device call
+        if not (ok and method is getattr and callable(result)):
+            record(device, method, args, time.perf_counter() - start, ok,
+                   owner)
+
+
+def snapshot(ctrlName=None):
+    '''
+    the statistics as a list of dicts, sorted by the total time
+    '''
+    with _lock:
+        items = [(key, entry) for key, entry in _entries.items()
+                 if ctrlName is None or key[0] == ctrlName]
+        result = [{
+            "controller": key[0], "axis": key[1], "poolCall": key[2],
+            "device": key[3], "call": key[4], "count": entry.count,
+            "errors": entry.errors, "total": entry.total,
+            "mean": entry.total / entry.count, "max": entry.max,
+            "histogram": list(entry.histogram)} for key, entry in items]
+    result.sort(key=lambda item: -item["total"])
+    return result
+
+
+def report(ctrlName=None):
+    '''
+    the statistics as text, times in ms
+    '''
+    stats = snapshot(ctrlName)
+    if not stats:
+        if not _enabled:
+            return "statistics are disabled, 'stats on' enables them"
+        return "no calls recorded"
+    limits = ["<%g" % (limit * 1000.) for limit in BUCKETS] + [
+        ">=%g" % (BUCKETS[-1] * 1000.)]
+    lines = ["%-20s %4s %-15s %-30s %-40s %7s %5s %9s %8s %8s  %s" % (
+        "controller", "axis", "call", "device", "device call", "count",
+        "err", "total/ms", "mean/ms", "max/ms", "histogram/ms")]
+    for item in stats:
+        lines.append(
+            "%-20s %4s %-15s %-30s %-40s %7d %5d %9.3f %8.3f %8.3f  %s" % (
+                item["controller"], item["axis"], item["poolCall"],
+                item["device"], item["call"], item["count"], item["errors"],
+                item["total"] * 1000., item["mean"] * 1000.,
+                item["max"] * 1000., " ".join(
+                    "%s:%d" % (limit, count) for limit, count in
+                    zip(limits, item["histogram"]) if count)))
+    return "\n".join(lines)
+
+
+def dump(path, ctrlName=None):
+    '''
+    write the statistics to path as JSON
+    '''
+    with open(path, "w") as fp:
+        json.dump({"buckets": BUCKETS, "stats": snapshot(ctrlName)},
+                  fp, indent=1)
+    return path
+
+
+def sendToCtrl(ctrl, in_data):
+    '''
+    handles the 'stats ...' commands of SendToCtrl(),
+    returns None for other input
+    '''
+    words = str(in_data).split()
+    if not words or words[0].lower() != "stats":
+        return None
+    name = ctrlName(ctrl)
+    if len(words) == 1:
+        return report(name)
+    cmd = words[1].lower()
+    if cmd == "all":
+        return report()
+    if cmd == "on":
+        enable(True)
+        return "statistics enabled"
+    if cmd == "off":
+        enable(False)
+        return "statistics disabled"
+    if cmd == "reset":
+        reset(name)
+        return "statistics of %s reset" % name
+    if cmd == "dump" and len(words) == 3:
+        try:
+            return "statistics written to %s" % dump(words[2])
+        except (IOError, OSError) as exc:
+            return "failed to write %s: %s" % (words[2], exc)
+    return "usage: stats [all|on|off|reset|dump <file>]"
+
+
+def statsCommands(method):
+    '''
+    decorator of SendToCtrl(), the 'stats ...' commands are handled
+    by sendToCtrl(), other input by the decorated method
+    '''
+    @functools.wraps(method)
+    def SendToCtrl(self, in_data, *args, **kwargs):
+        reply = sendToCtrl(self, in_data)
+        if reply is not None:
+            return reply
+        return method(self, in_data, *args, **kwargs)
+    return SendToCtrl
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+'''
+hardware flavour detection for the MCA-like devices used by
+HasyOneDCtrl and HasyRoIsCtrl (MCA8715, XIA, SIS3302, Kromo, Avantes).
+
+Instead of a chain of hasattr(proxy, ...) calls, each of them
+querying the attribute list of the device, the list is fetched once
+and classified. The result is kept in memory and in a JSON file,
+so later Pool starts and controller re-inits skip the probe:
+
+    caps = probeDevice(proxy, proxy_name)
+    if caps["flavour"] == "XIA": ...
+
+The file is CACHE_FILE in $SARDANA_CTRL_CACHE_DIR, default
+~/.cache/sardana-controllers. Each entry carries the class and the
+server of the device (proxy.info(), a single small call), an entry
+that does not match the device any more, e.g. because the name has
+been moved to other hardware, is probed again.
+
+invalidateCapabilities() drops entries, the controllers using the
+cache call it on SendToCtrl("capabilities reset").
+'''
+import json
+import os
+import threading
+
+CACHE_FILE = "capabilities.json"
+
+_lock = threading.Lock()
+#
+# lower case device name -> {"devClass": ..., "server": ..., "caps": ...}
+#
+_capabilities = None
+
+
+def _cachePath():
+    cacheDir = os.environ.get(
+        "SARDANA_CTRL_CACHE_DIR",
+        os.path.join(os.path.expanduser("~"), ".cache",
+                     "sardana-controllers"))
+    return os.path.join(cacheDir, CACHE_FILE)
+
+
+def _load():
+    global _capabilities
+    if _capabilities is None:
+        try:
+            with open(_cachePath()) as fp:
+                _capabilities = json.load(fp)
+        except (IOError, OSError, ValueError):
+            _capabilities = {}
+    return _capabilities
+
+
+def _save():
+    path = _cachePath()
+    try:
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        tmpPath = "%s.%d" % (path, os.getpid())
+        with open(tmpPath, "w") as fp:
+            json.dump(_capabilities, fp, indent=1, sort_keys=True)
+        os.rename(tmpPath, path)
+    except (IOError, OSError):
+        # the cache is an optimization only
+        pass
+
+
+def classify(attrs):
+    '''
+    attrs: the attribute names of a device,
+    returns the flags and the flavour of the device
+    '''
+    # like hasattr(proxy, ...) the names are not case sensitive
+    attrs = set([attr.lower() for attr in attrs])
+    caps = {
+        "isMCA8715": 'bankid' in attrs,
+        "isXIA": 'spectrum' in attrs and 'mcalength' in attrs,
+        "isSIS3302": 'adcxinputinvert' in attrs,
+        "isSIS3320": 'adcxinputinvert' in attrs or
+        'triggerpeakingtime' in attrs,
+        "isKromo": 'highspeedmode' in attrs,
+        "isAvantes": 'inttime' in attrs,
+    }
+    for flavour in ("Kromo", "Avantes", "XIA", "MCA8715", "SIS3302"):
+        if caps["is" + flavour]:
+            break
+    else:
+        flavour = "Generic"
+    caps["flavour"] = flavour
+    return caps
+
+
+def _identity(proxy):
+    '''
+    the class and the server of the device behind proxy
+    '''
+    info = proxy.info()
+    return info.dev_class, info.server_id
+
+
+def probeDevice(proxy, name=None):
+    '''
+    the capabilities of proxy, from the cache if the cached entry
+    belongs to the same device class and server,
+    name defaults to proxy.name()
+    '''
+    if name is None:
+        name = proxy.name()
+    key = name.lower()
+    devClass, server = _identity(proxy)
+    with _lock:
+        entry = _load().get(key)
+        # entries of former versions have no "caps" and are replaced
+        if entry is not None and \
+           entry.get("devClass") == devClass and \
+           entry.get("server") == server and "caps" in entry:
+            return dict(entry["caps"])
+    caps = classify(proxy.get_attribute_list())
+    with _lock:
+        _load()[key] = {"devClass": devClass, "server": server,
+                        "caps": caps}
+        _save()
+    return dict(caps)
+
+
+def invalidateCapabilities(name=None):
+    '''
+    drop the entry of a device, all entries if name is None
+    '''
+    global _capabilities
+    with _lock:
+        if name is None:
+            _capabilities = {}
+        else:
+            _load().pop(name.lower(), None)
+        _save()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+'''
+process-wide cache for the Tango device discovery done by the
+controllers using the RootDeviceName property, e.g.:
+
+    self.devices = getDeviceExported(self.RootDeviceName + "*",
+                                     tangoHost=self.TangoHost)
+
+the exported devices of a Tango host are fetched with a single
+get_device_exported("*") call and the RootDeviceName patterns
+are resolved locally, so a Pool with many controllers talks
+once to each DB instead of once per controller.
+
+getDeviceNamesByClass(), getServerNamesByClass() and
+getDeviceProperty() memoize the class -> devices, class -> servers
+and device -> property lookups the same way.
+
+The entries expire after CACHE_TTL seconds, invalidateDeviceCache()
+drops them explicitly, e.g. after new servers have been started.
+'''
+import PyTango
+
+import re
+import threading
+import time
+
+CACHE_TTL = 60.
+
+_lock = threading.RLock()
+#
+# tangoHost -> PyTango.Database
+#
+_dbs = {}
+#
+# tangoHost -> (timestamp, [exported device names])
+#
+_exported = {}
+#
+# (tangoHost, pattern) -> (timestamp, [matching device names])
+#
+_matches = {}
+#
+# (tangoHost, kind, args) -> (timestamp, value), class and property lookups
+#
+_lookups = {}
+
+
+def _normalizeHost(tangoHost):
+    '''
+    None and '' refer to TANGO_HOST, 'haspp99' to 'haspp99:10000'
+    '''
+    if not tangoHost:
+        return None
+    if tangoHost.find(':') == -1:
+        return "%s:10000" % tangoHost
+    return tangoHost
+
+
+def findDB(tangoHost=None):
+    '''
+    return the (shared) Database object of tangoHost,
+      - tangoHost == None: use TANGO_HOST DB
+      - tangoHost == "haspp99:10000" or "haspp99"
+    '''
+    host = _normalizeHost(tangoHost)
+    with _lock:
+        db = _dbs.get(host)
+        if db is None:
+            if host is None:
+                db = PyTango.Database()
+            else:
+                node, port = host.split(':')
+                db = PyTango.Database(node, int(port))
+            _dbs[host] = db
+        return db
+
+
+def _patternToRegex(pattern):
+    '''
+    Tango wildcards are '*' only and matching ignores the case
+    '''
+    parts = [re.escape(part) for part in pattern.split('*')]
+    return re.compile("^%s$" % ".*".join(parts), re.IGNORECASE)
+
+
+def _exportedDevices(host, ttl):
+    now = time.monotonic()
+    entry = _exported.get(host)
+    if entry is None or (now - entry[0]) > ttl:
+        db = findDB(host)
+        names = list(db.get_device_exported("*").value_string)
+        entry = (now, names)
+        _exported[host] = entry
+    return entry
+
+
+def getDeviceExported(pattern, tangoHost=None, ttl=None):
+    '''
+    return the list of exported devices matching pattern,
+    same as Database.get_device_exported(pattern).value_string
+
+      pattern: e.g. 'p09/motor/exp.*'
+      tangoHost: None (TANGO_HOST), 'haspp99:10000' or 'haspp99'
+      ttl: seconds, default CACHE_TTL
+    '''
+    if ttl is None:
+        ttl = CACHE_TTL
+    host = _normalizeHost(tangoHost)
+    key = (host, pattern.lower())
+    with _lock:
+        stamp, names = _exportedDevices(host, ttl)
+        entry = _matches.get(key)
+        if entry is None or entry[0] != stamp:
+            regex = _patternToRegex(pattern)
+            entry = (stamp, [name for name in names if regex.match(name)])
+            _matches[key] = entry
+        return list(entry[1])
+
+
+def _lookup(tangoHost, kind, args, func, ttl):
+    '''
+    memoize func(db, *args) for ttl seconds
+    '''
+    if ttl is None:
+        ttl = CACHE_TTL
+    host = _normalizeHost(tangoHost)
+    key = (host, kind, args)
+    with _lock:
+        now = time.monotonic()
+        entry = _lookups.get(key)
+        if entry is None or (now - entry[0]) > ttl:
+            entry = (now, func(findDB(host), *args))
+            _lookups[key] = entry
+        return list(entry[1])
+
+
+def _devicesOfClass(db, className):
+    # the server name accepts wildcards, one DB call for all servers
+    return list(db.get_device_name("*", className).value_string)
+
+
+def getDeviceNamesByClass(className, tangoHost=None, ttl=None):
+    '''
+    return a list of all devices of a specified class,
+        'DGG2' -> ['p09/dgg2/exp.01', 'p09/dgg2/exp.02']
+    '''
+    return _lookup(tangoHost, "class", (className, ),
+                   _devicesOfClass, ttl)
+
+
+def _serversOfClass(db, className):
+    argout = []
+    for devName in _devicesOfClass(db, className):
+        srv = db.get_device_info(devName).ds_full_name
+        if srv not in argout:
+            argout.append(srv)
+    return argout
+
+
+def getServerNamesByClass(className, tangoHost=None, ttl=None):
+    '''
+    return a list of the servers containing the specified class,
+    the servers are found through the devices of the class, so the
+    costs do not depend on the number of servers in the DB
+    '''
+    return _lookup(tangoHost, "server", (className, ),
+                   _serversOfClass, ttl)
+
+
+def _deviceProperty(db, devName, propName):
+    return list(db.get_device_property(devName, [propName])[propName])
+
+
+def getDeviceProperty(devName, propName, tangoHost=None, ttl=None):
+    '''
+    devName: p10/eigerfilewriter/lab.01, propName: EigerDevice
+    return: ['p10/eigerdectris/lab.01']
+    '''
+    return _lookup(tangoHost, "property", (devName.lower(), propName),
+                   _deviceProperty, ttl)
+
+
+def invalidateDeviceCache(tangoHost=None, pattern=None):
+    '''
+    drop cached discovery results,
+      - no arguments: everything
+      - tangoHost: the entries of this host
+      - pattern: the entries of this pattern only, the exported
+        devices list of the host is fetched again
+    '''
+    with _lock:
+        if tangoHost is None and pattern is None:
+            _exported.clear()
+            _matches.clear()
+            _lookups.clear()
+            return
+        host = _normalizeHost(tangoHost)
+        _exported.pop(host, None)
+        for key in list(_matches.keys()):
+            if key[0] != host:
+                continue
+            if pattern is None or key[1] == pattern.lower():
+                del _matches[key]
+        if pattern is None:
+            for key in list(_lookups.keys()):
+                if key[0] == host:
+                    del _lookups[key]
@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+'''
+process-wide pool of Tango device proxies, shared by all controllers
+and axes:
+
+    self.proxy[ind - 1] = getProxy(proxy_name, owner=self)
+
+getProxy() returns a PooledProxy which forwards everything to one
+PyTango.DeviceProxy per device name. Connection failures (device
+not exported, server not running, timeouts) are counted, after
+FAIL_LIMIT consecutive failures the device is considered dead: calls
+fail immediately for RETRY_INTERVAL seconds instead of stalling for
+the full Tango timeout, then the next call tries the device again.
+A proxy which could not be created is created again on the next use.
+The calls are counted and timed by CallStatsLib, if enabled, and
+booked to the owner, the controller which asked for the proxy.
+'''
+import PyTango
+
+import threading
+import time
+
+from sardana.PoolController.common import CallStatsLib
+
+FAIL_LIMIT = 3
+RETRY_INTERVAL = 10.
+
+CONNECTION_REASONS = (
+    "API_CantConnectToDevice",
+    "API_CommunicationFailed",
+    "API_CorbaException",
+    "API_DeviceNotExported",
+    "API_DeviceTimedOut",
+    "API_ServerNotRunning",
+    "TRANSIENT_CallTimedout",
+    "TRANSIENT_ConnectFailed",
+)
+
+_lock = threading.RLock()
+#
+# lower case device name -> _ProxyEntry
+#
+_entries = {}
+
+
+def _isConnectionError(exc):
+    if isinstance(exc, (PyTango.ConnectionFailed,
+                        PyTango.CommunicationFailed)):
+        return True
+    if isinstance(exc, PyTango.DevFailed):
+        for err in exc.args:
+            if getattr(err, "reason", None) in CONNECTION_REASONS:
+                return True
+    return False
+
+
+class _ProxyEntry(object):
+    '''
+    the proxy of a device and its health
+    '''
+
+    def __init__(self, name):
+        self.name = name
+        self.proxy = None
+        self.timeout = None
+        self.failures = 0
+        self.lastFailure = 0.
+        self.lock = threading.Lock()
+
+    def isDead(self):
+        return self.failures >= FAIL_LIMIT and \
+            (time.monotonic() - self.lastFailure) < RETRY_INTERVAL
+
+    def checkAlive(self):
+        if self.isDead():
+            PyTango.Except.throw_exception(
+                "ProxyPool_DeviceDead",
+                "%s failed %d times, next try in %gs" % (
+                    self.name, self.failures, RETRY_INTERVAL -
+                    (time.monotonic() - self.lastFailure)),
+                "ProxyPoolLib.checkAlive")
+
+    def getProxy(self):
+        self.checkAlive()
+        with self.lock:
+            if self.proxy is None:
+                try:
+                    proxy = PyTango.DeviceProxy(self.name)
+                    if self.timeout is not None:
+                        proxy.set_timeout_millis(int(self.timeout * 1000))
+                except PyTango.DevFailed as exc:
+                    self.failed(exc)
+                    raise
+                self.proxy = proxy
+            return self.proxy
+
+    def setTimeout(self, timeout):
+        self.timeout = timeout
+        with self.lock:
+            if self.proxy is not None and timeout is not None:
+                self.proxy.set_timeout_millis(int(timeout * 1000))
+
+    def failed(self, exc=None):
+        if exc is not None and not _isConnectionError(exc):
+            return
+        self.failures += 1
+        self.lastFailure = time.monotonic()
+
+    def succeeded(self):
+        self.failures = 0
+
+
+class PooledProxy(object):
+    '''
+    forwards attribute access and method calls to the shared
+    DeviceProxy and keeps track of connection failures
+    '''
+
+    def __init__(self, entry, owner=None):
+        object.__setattr__(self, "_entry", entry)
+        object.__setattr__(self, "_owner", owner)
+
+    def _call(self, method, *args, **kwargs):
+        entry = self._entry
+        try:
+            result = CallStatsLib.timed(
+                entry.name, method, args, kwargs, self._owner)
+        except PyTango.DevFailed as exc:
+            entry.failed(exc)
+            raise
+        entry.succeeded()
+        return result
+
+    def __getattr__(self, name):
+        proxy = self._entry.getProxy()
+        # reading a Tango attribute as a Python attribute talks
+        # to the device already
+        value = self._call(getattr, proxy, name)
+        if callable(value):
+            def method(*args, **kwargs):
+                self._entry.checkAlive()
+                return self._call(value, *args, **kwargs)
+            return method
+        return value
+
+    def __setattr__(self, name, value):
+        proxy = self._entry.getProxy()
+        self._call(setattr, proxy, name, value)
+
+    def __repr__(self):
+        return "PooledProxy(%s)" % self._entry.name
+
+
+def _getEntry(name):
+    key = name.lower()
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            entry = _ProxyEntry(name)
+            _entries[key] = entry
+        return entry
+
+
+def getProxy(name, timeout=None, owner=None):
+    '''
+    return the shared proxy of the device name, e.g.
+    'p09/motor/exp.01' or 'haspp09:10000/p09/motor/exp.01',
+    timeout in seconds is applied to the device, if given,
+    the call statistics are booked to the controller owner
+    '''
+    entry = _getEntry(name)
+    if timeout is not None:
+        entry.setTimeout(timeout)
+    entry.getProxy()
+    return PooledProxy(entry, owner)
+
+
+def setDeviceTimeout(name, timeout):
+    '''
+    timeout in seconds for all users of the device
+    '''
+    _getEntry(name).setTimeout(timeout)
+
+
+def isDeviceDead(name):
+    return _getEntry(name).isDead()
+
+
+def resetDevice(name=None):
+    '''
+    forget the health record and the proxy of a device,
+    of all devices, if name is None
+    '''
+    with _lock:
+        if name is None:
+            _entries.clear()
+        else:
+            _entries.pop(name.lower(), None)
+
+
+def commandInoutAll(calls, timeout=0):
+    '''
+    execute commands on several devices concurrently:
+    command_inout_asynch() is sent to all devices before the
+    replies are collected, so the start skew between the devices
+    is the time to send the requests, not the sum of the replies.
+
+      calls: [(proxy, cmdName), ...] or [(proxy, cmdName, argin), ...]
+      timeout: ms to wait for each reply, 0: wait until it arrives
+
+    returns the replies in the order of calls, the first error is
+    raised after all replies have been collected
+    '''
+    requests = []
+    for call in calls:
+        proxy, cmdName = call[0], call[1]
+        try:
+            if len(call) > 2:
+                reqId = proxy.command_inout_asynch(cmdName, call[2])
+            else:
+                reqId = proxy.command_inout_asynch(cmdName)
+            requests.append((proxy, reqId, None))
+        except PyTango.DevFailed as exc:
+            requests.append((proxy, None, exc))
+    replies = []
+    error = None
+    for proxy, reqId, exc in requests:
+        if reqId is not None:
+            try:
+                replies.append(proxy.command_inout_reply(reqId, timeout))
+                continue
+            except PyTango.DevFailed as replyExc:
+                exc = replyExc
+        replies.append(None)
+        if error is None:
+            error = exc
+    if error is not None:
+        raise error
+    return replies
+
+
+def writeAttributeAll(calls, timeout=0):
+    '''
+    write attributes of several devices concurrently, like
+    commandInoutAll(): write_attribute_asynch() is sent to all
+    devices before the replies are collected.
+
+      calls: [(proxy, attrName, value), ...]
+      timeout: ms to wait for each reply, 0: wait until it arrives
+
+    the first error is raised after all replies have been collected
+    '''
+    requests = []
+    for proxy, attrName, value in calls:
+        try:
+            reqId = proxy.write_attribute_asynch(attrName, value)
+            requests.append((proxy, reqId, None))
+        except PyTango.DevFailed as exc:
+            requests.append((proxy, None, exc))
+    error = None
+    for proxy, reqId, exc in requests:
+        if reqId is not None:
+            try:
+                proxy.write_attribute_reply(reqId, timeout)
+                continue
+            except PyTango.DevFailed as replyExc:
+                exc = replyExc
+        if error is None:
+            error = exc
+    if error is not None:
+        raise error
@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+'''
+RoI integration for the controllers summing regions of a spectrum,
+e.g. HasyRoIsCtrl, Xspress3RoIsCtrl, HasyScaCtrl, MCA2SCACtrl.
+
+The prefix sums of a spectrum are computed once per readout, each
+RoI is then the difference of two entries:
+
+    engine = RoIEngine(data)
+    counts = engine.roiSums(starts, ends)
+
+RoIs are half-open, [start, end), like Python slices. Controllers
+using inclusive RoI ends pass end + 1. The prefix sums are accumulated
+in int64 or float64, so neither small integer types overflow nor do
+float32 spectra lose counts at high channels.
+
+RoITable keeps the RoIs of a channel in a structured array and
+serves the RoI axis attributes of the 1D controllers: RoIs
+([start1, end1, start2, end2, ...]), CountsRoIs and the numbered
+RoI<n>Start, RoI<n>End, CountsRoI<n>.
+'''
+import numpy
+
+ROI_DTYPE = numpy.dtype([
+    ("start", numpy.intp), ("end", numpy.intp), ("counts", numpy.float64)])
+
+
+def _sumDtype(dtype):
+    '''
+    the type the prefix sums of a spectrum of dtype are kept in
+    '''
+    if numpy.issubdtype(dtype, numpy.integer) or dtype == numpy.bool_:
+        return numpy.int64
+    if numpy.issubdtype(dtype, numpy.complexfloating):
+        return numpy.complex128
+    return numpy.float64
+
+
+class RoIEngine(object):
+    '''
+    holds the prefix sums of the last spectrum passed to setSpectrum()
+    '''
+
+    def __init__(self, spectrum=None):
+        self.spectrum = None
+        self.cumsum = None
+        self.length = 0
+        if spectrum is not None:
+            self.setSpectrum(spectrum)
+
+    def setSpectrum(self, spectrum):
+        # the reference keeps id(spectrum) from being reused
+        self.spectrum = spectrum
+        data = numpy.asarray(spectrum).ravel()
+        self.length = len(data)
+        sumDtype = _sumDtype(data.dtype)
+        self.cumsum = numpy.concatenate(
+            (numpy.zeros(1, dtype=sumDtype),
+             numpy.cumsum(data, dtype=sumDtype)))
+
+    def useSpectrum(self, spectrum):
+        '''
+        setSpectrum() unless spectrum is the object passed last time,
+        e.g. for pseudo counters whose Calc() is called once per
+        pseudo axis with the same values
+        '''
+        if spectrum is not self.spectrum:
+            self.setSpectrum(spectrum)
+
+    def _limits(self, start, end):
+        start = numpy.clip(start, 0, self.length)
+        end = numpy.clip(end, start, self.length)
+        return start, end
+
+    def roiSum(self, start, end):
+        '''
+        the counts in [start, end), limits outside the spectrum
+        are clipped, an empty RoI returns 0
+        '''
+        start, end = self._limits(int(start), int(end))
+        return self.cumsum[end] - self.cumsum[start]
+
+    def roiSums(self, starts, ends):
+        '''
+        the counts of all RoIs [starts[i], ends[i]) in one pass
+        '''
+        starts, ends = self._limits(
+            numpy.asarray(starts, dtype=numpy.intp),
+            numpy.asarray(ends, dtype=numpy.intp))
+        return self.cumsum[ends] - self.cumsum[starts]
+
+
+def roiSum(spectrum, start, end):
+    '''
+    the counts in [start, end) of spectrum, for a single RoI
+    no prefix sums are needed
+    '''
+    data = numpy.asarray(spectrum).ravel()
+    start = min(max(int(start), 0), len(data))
+    end = min(max(int(end), start), len(data))
+    return data[start:end].sum()
+
+
+class RoITable(object):
+    '''
+    the RoIs of a channel, rois['start'], rois['end'] and the
+    rois['counts'] of the last spectrum passed to update()
+    '''
+
+    def __init__(self, nbRoIs=0):
+        self.rois = numpy.zeros(nbRoIs, dtype=ROI_DTYPE)
+        self.engine = RoIEngine()
+
+    def __len__(self):
+        return len(self.rois)
+
+    def resize(self, nbRoIs):
+        '''
+        RoIs added are empty, [0, 0)
+        '''
+        rois = numpy.zeros(nbRoIs, dtype=ROI_DTYPE)
+        nb = min(nbRoIs, len(self.rois))
+        rois[:nb] = self.rois[:nb]
+        self.rois = rois
+
+    def setLimits(self, limits):
+        '''
+        limits: [start1, end1, start2, end2, ...]
+        '''
+        limits = numpy.asarray(limits, dtype=numpy.intp).ravel()
+        if len(limits) % 2:
+            raise ValueError("RoITable: RoIs needs (start, end) pairs")
+        self.rois = numpy.zeros(len(limits) // 2, dtype=ROI_DTYPE)
+        self.rois["start"] = limits[0::2]
+        self.rois["end"] = limits[1::2]
+
+    def limits(self):
+        return numpy.column_stack(
+            (self.rois["start"], self.rois["end"])).ravel()
+
+    def counts(self):
+        return self.rois["counts"].copy()
+
+    def update(self, spectrum):
+        '''
+        the counts of all RoIs from one prefix sum of spectrum
+        '''
+        if len(self.rois) == 0:
+            return
+        self.engine.setSpectrum(spectrum)
+        self.rois["counts"] = self.engine.roiSums(
+            self.rois["start"], self.rois["end"])
+
+    @staticmethod
+    def parseName(name):
+        '''
+        'RoI3End' -> (2, 'end'), 'CountsRoI1' -> (0, 'counts'),
+        'RoIs' -> (None, 'limits'), 'CountsRoIs' -> (None, 'counts'),
+        None for other names
+        '''
+        if name == "RoIs":
+            return None, "limits"
+        if name == "CountsRoIs":
+            return None, "counts"
+        if name.startswith("CountsRoI") and name[9:].isdigit():
+            return int(name[9:]) - 1, "counts"
+        for what in ("Start", "End"):
+            if name.startswith("RoI") and name.endswith(what) and \
+               name[3:-len(what)].isdigit():
+                return int(name[3:-len(what)]) - 1, what.lower()
+        return None
+
+    def isPar(self, name):
+        return self.parseName(name) is not None
+
+    def getPar(self, name):
+        '''
+        the value of a RoI axis attribute, RoIs which
+        do not exist read as empty
+        '''
+        i, what = self.parseName(name)
+        if i is None:
+            if what == "limits":
+                return self.limits()
+            return self.counts()
+        if i >= len(self.rois):
+            return 0
+        if what == "counts":
+            return float(self.rois[i]["counts"])
+        return int(self.rois[i][what])
+
+    def setPar(self, name, value):
+        '''
+        writing RoI<n>Start/End beyond the current RoIs
+        adds empty RoIs, counts are read-only
+        '''
+        i, what = self.parseName(name)
+        if what == "counts":
+            return
+        if i is None:
+            self.setLimits(value)
+            return
+        if i >= len(self.rois):
+            self.resize(i + 1)
+        self.rois[i][what] = value
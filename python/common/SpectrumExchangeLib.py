@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+'''
+process-wide exchange of MCA spectra between controllers reading the
+same device, e.g. HasyOneDCtrl, HasyRoIsCtrl and HasyScaCtrl in one
+measurement group:
+
+    StartOne:  ... "Start" ...
+               acquisitionStarted(name)
+    StateOne:  if not isStopped(name):
+                   ... "Stop", "Read" ...
+                   acquisitionStopped(name)
+    ReadOne:   data = lookup(name)
+               if data is None:
+                   data = publish(name, proxy.read_attribute(..).value)
+
+each start opens a new acquisition of the device, its ID is counted
+here. A spectrum read after the acquisition has been stopped is final,
+publish() keeps it for the other controllers which get the same,
+read-only array from lookup(), so the MCA is stopped and read once per
+point. Spectra read while the device is still acquiring are not kept,
+neither is anything before the first acquisitionStarted(): devices
+started by other means are read by each controller as before.
+
+the device names are compared without host and 'tango://' prefix.
+'''
+import numpy
+
+import threading
+
+_lock = threading.Lock()
+#
+# device name -> _Entry
+#
+_entries = {}
+
+
+class _Entry(object):
+    def __init__(self):
+        self.acqId = 0
+        self.stopped = False
+        self.spectrum = None
+
+
+def _key(name):
+    key = str(name).lower()
+    if key.startswith("tango://"):
+        key = key[len("tango://"):]
+    if key.count('/') == 3:
+        # host:port/domain/family/member
+        key = key.split('/', 1)[1]
+    return key
+
+
+def _entry(name):
+    key = _key(name)
+    entry = _entries.get(key)
+    if entry is None:
+        entry = _Entry()
+        _entries[key] = entry
+    return entry
+
+
+def acquisitionStarted(name):
+    '''
+    a new acquisition of the device, returns its ID
+    '''
+    with _lock:
+        entry = _entry(name)
+        entry.acqId += 1
+        entry.stopped = False
+        entry.spectrum = None
+        return entry.acqId
+
+
+def acquisitionId(name):
+    with _lock:
+        return _entry(name).acqId
+
+
+def acquisitionStopped(name):
+    '''
+    the acquisition of the device has ended, spectra read
+    from now on are final
+    '''
+    with _lock:
+        entry = _entry(name)
+        if entry.acqId > 0:
+            entry.stopped = True
+
+
+def isStopped(name):
+    with _lock:
+        return _entry(name).stopped
+
+
+def publish(name, spectrum):
+    '''
+    offer spectrum to the other controllers, if the acquisition
+    has been stopped, returns spectrum as a read-only array
+    '''
+    spectrum = numpy.asarray(spectrum)
+    spectrum.flags.writeable = False
+    with _lock:
+        entry = _entry(name)
+        if entry.stopped:
+            entry.spectrum = spectrum
+    return spectrum
+
+
+def lookup(name):
+    '''
+    the final spectrum of the current acquisition, None
+    if it has not been read yet
+    '''
+    with _lock:
+        return _entry(name).spectrum
+
+
+def reset(name=None):
+    '''
+    forget a device, all devices if name is None
+    '''
+    with _lock:
+        if name is None:
+            _entries.clear()
+        else:
+            _entries.pop(_key(name), None)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+'''
+follow attributes like State, Status or acq_status of a device
+without busy-waiting on it.
+
+    tracker = AttributeTracker(proxy_fw, "State")
+    ...
+    if not tracker.waitFor(lambda sta: sta == PyTango.DevState.ON, 2.):
+        print("filewriter does not become ON")
+
+The tracker subscribes to the change events of the attribute and
+keeps the last value, waitFor() sleeps on a condition variable until
+an event satisfies the predicate or the deadline expires. If the
+device does not push events (no polling configured, old server, ...)
+the attribute is read on demand, waitFor() then polls with an
+exponentially growing interval.
+
+After a command which changes the attribute, e.g. a start, the cached
+value is the one before the command until the next polled event
+arrives. Callers mark the tracker stale then:
+
+    proxy.command_inout("StartAcq")
+    tracker.markStale()
+
+read() and waitFor() read the device until an event has been received
+which is not older than the first of these reads. Both timestamps are
+taken by the device server.
+'''
+import PyTango
+
+import threading
+import time
+
+POLL_MIN = 0.001
+POLL_MAX = 0.1
+
+
+class AttributeTracker(object):
+    '''
+    the last known value of proxy.attrName
+    '''
+
+    def __init__(self, proxy, attrName, useEvents=True):
+        self.proxy = proxy
+        self.attrName = attrName
+        self.condition = threading.Condition()
+        self.value = None
+        self.valid = False
+        self.stale = False
+        self.staleSince = None
+        self.eventId = None
+        if useEvents:
+            self.subscribe()
+
+    def subscribe(self):
+        '''
+        returns True, if change events are received
+        '''
+        if self.eventId is not None:
+            return True
+        try:
+            self.eventId = self.proxy.subscribe_event(
+                self.attrName, PyTango.EventType.CHANGE_EVENT,
+                self._pushEvent)
+        except Exception:
+            self.eventId = None
+        return self.eventId is not None
+
+    def unsubscribe(self):
+        if self.eventId is None:
+            return
+        try:
+            self.proxy.unsubscribe_event(self.eventId)
+        except Exception:
+            pass
+        with self.condition:
+            self.eventId = None
+            self.valid = False
+
+    def _pushEvent(self, event):
+        with self.condition:
+            if event.err or event.attr_value is None:
+                # fall back to reading until the next good event
+                self.valid = False
+            else:
+                self.value = event.attr_value.value
+                self.valid = True
+                if self.stale and self.staleSince is not None:
+                    stamp = _timestamp(event.attr_value)
+                    if stamp is not None and stamp >= self.staleSince:
+                        self.stale = False
+            self.condition.notify_all()
+
+    def markStale(self):
+        '''
+        the cached value is outdated, the device is read
+        until a newer event has been received
+        '''
+        with self.condition:
+            self.stale = True
+            self.staleSince = None
+
+    def hasEvents(self):
+        return self.eventId is not None and self.valid and not self.stale
+
+    def _readDevice(self):
+        attr = self.proxy.read_attribute(self.attrName)
+        with self.condition:
+            if self.stale and self.staleSince is None:
+                self.staleSince = _timestamp(attr)
+        return attr.value
+
+    def read(self):
+        '''
+        the cached value, if events are received, the value
+        read from the device otherwise
+        '''
+        with self.condition:
+            if self.hasEvents():
+                return self.value
+        return self._readDevice()
+
+    def waitFor(self, predicate, timeout, pollMin=POLL_MIN, pollMax=POLL_MAX):
+        '''
+        wait until predicate(value) is true, returns False,
+        if this did not happen within timeout seconds
+        '''
+        deadline = time.monotonic() + timeout
+        interval = pollMin
+        while True:
+            with self.condition:
+                if self.hasEvents():
+                    while not predicate(self.value):
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            return False
+                        self.condition.wait(remaining)
+                        if not self.hasEvents():
+                            break
+                    else:
+                        return True
+            if predicate(self._readDevice()):
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, pollMax)
+
+
+def _timestamp(attr):
+    '''
+    the server time of a DeviceAttribute in seconds, None if unknown
+    '''
+    stamp = getattr(attr, "time", None)
+    if stamp is None:
+        return None
+    if hasattr(stamp, "totime"):
+        return stamp.totime()
+    return float(stamp)
+
+
+def waitForState(tracker, states, timeout, origin="waitForState",
+                 pollMin=POLL_MIN, pollMax=POLL_MAX):
+    '''
+    wait until the value of tracker is one of states, throws
+    a DevFailed, if this did not happen within timeout seconds,
+    so a stuck device does not block the caller forever
+    '''
+    if tracker.waitFor(lambda value: value in states, timeout,
+                       pollMin=pollMin, pollMax=pollMax):
+        return
+    try:
+        last = tracker.read()
+    except Exception:
+        last = None
+    PyTango.Except.throw_exception(
+        "StateTracker_Timeout",
+        "%s/%s is %s, did not become %s within %gs" % (
+            tracker.proxy.name(), tracker.attrName, last,
+            " or ".join([str(state) for state in states]), timeout),
+        origin)
@@ -29,8 +29,16 @@ import taurus
 from sardana import State
 from sardana.pool.controller import CounterTimerController, \
     Memorized, Description, Type, DefaultValue
+from sardana.PoolController.common.ProxyPoolLib import getProxy
+from sardana.PoolController.common.AcqTimerLib import AcqTimer
+from sardana.PoolController.common import CallStatsLib
 # from sardana.pool import AcqTriggerType
 
+#
+# seconds, the pool keeps it for all users of the device
+#
+AMPTEK_TIMEOUT = 7.
+
 
 class AmptekPX5CounterTimerController(CounterTimerController):
     "This class is the AmptekPX5 Sardana CounterTimerController"
@@ -53,9 +61,10 @@ class AmptekPX5CounterTimerController(CounterTimerController):
         try:
             # taurus complains if not tango://
             self.amptekPX5 = taurus.Device(self.deviceName)
+            self.amptekPX5.set_timeout_millis(int(AMPTEK_TIMEOUT * 1000))
         except Exception:
-            self.amptekPX5 = PyTango.DeviceProxy(self.deviceName)
-        self.amptekPX5.set_timeout_millis(7000)
+            self.amptekPX5 = getProxy(
+                self.deviceName, timeout=AMPTEK_TIMEOUT, owner=self)
         self.acqTime = 0
         self.sta = State.On
         self.acq = False
@@ -191,6 +200,10 @@ class AmptekPX5CounterTimerController(CounterTimerController):
     def AbortOne(self, ind):
         self.amptekPX5.Disable()
 
+    @CallStatsLib.statsCommands
+    def SendToCtrl(self, in_data):
+        return "Nothing sent"
+
 
 class AmptekPX5SoftCounterTimerController(CounterTimerController):
     """This class is the AmptekPX5 Sardana CounterTimerController.
@@ -221,12 +234,12 @@ class AmptekPX5SoftCounterTimerController(CounterTimerController):
 
     def __init__(self, inst, props, *args, **kwargs):
         CounterTimerController.__init__(self, inst, props, *args, **kwargs)
-        self.amptekPX5 = taurus.Device(self.deviceName)
+        self.amptekPX5 = getProxy(
+            self.deviceName, timeout=AMPTEK_TIMEOUT, owner=self)
         self.amptekPX5.SetTextConfiguration(['MCAC=%d' % 4096])
-        self.amptekPX5.set_timeout_millis(7000)
         self.acqTime = 0
         self.sta = State.On
-        self.acqStartTime = None
+        self.timer = AcqTimer()
         self.spectrum = None
         self.icr = None
         self.tcr = None
@@ -256,7 +269,9 @@ class AmptekPX5SoftCounterTimerController(CounterTimerController):
         self._log.debug("AddDevice() leaving...")
 
     def DeleteDevice(self, ind):
-        self.scas.pop(ind)
+        # like in AddDevice, the timer, ICR and TCR have no SCA entry
+        if not (ind in [1, 2, 3]):
+            del self.scas[ind]
 
     def PreStateAll(self):
         pass
@@ -266,16 +281,15 @@ class AmptekPX5SoftCounterTimerController(CounterTimerController):
 
     def StateAll(self):
         self._log.debug("StateAll(): entering...")
-        if self.acqStartTime is not None:  # acquisition was started
-            now = time.time()
-            elapsedTime = now - self.acqStartTime
+        if self.timer.isStarted():  # acquisition was started
             # acquisition has probably not finished yet
-            if elapsedTime < self.acqTime:
+            if not self.timer.mayBeDone():
                 self.sta = State.Moving
-                self.status = "Acqusition time has not elapsed yet."
+                self.status = "Acqusition time has not elapsed yet, " \
+                    "%.3fs left." % self.timer.wakeupHint()
                 return
             else:
-                self.acqStartTime = None
+                self.timer.stop()
         try:
             self.sta = self.amptekPX5.State()
         except PyTango.DevFailed:
@@ -331,7 +345,7 @@ class AmptekPX5SoftCounterTimerController(CounterTimerController):
         self.icr = None
         self.tcr = None
         self.amptekPX5.Enable()
-        self.acqStartTime = time.time()
+        self.timer.start()
         self.sta = State.Moving
         self.status = "Acquisition was started"
         self._log.debug("StartAllCT(): leaving...")
@@ -345,7 +359,12 @@ class AmptekPX5SoftCounterTimerController(CounterTimerController):
         self.amptekPX5.SetTextConfiguration(['PRET=%f' % value])
         self.acqTime = float(
             self.amptekPX5.GetTextConfiguration(['PRET'])[0].split('=')[1])
+        self.timer.load(self.acqTime)
         self._log.debug("LoadOne(): leaving...")
 
     def AbortOne(self, ind):
         self.amptekPX5.Disable()
+
+    @CallStatsLib.statsCommands
+    def SendToCtrl(self, in_data):
+        return "Nothing sent"
@@ -1,13 +1,17 @@
 #
 # 4.9.2019 TN modified ReadOne() to use the elapsed time trick
 #
-import PyTango
 from sardana.pool.controller import CounterTimerController
-import time
 
 from sardana import State, DataAccess
 # from sardana.pool.controller import MotorController
 from sardana.pool.controller import Type, Access, Description
+from sardana.PoolController.common.DeviceDiscoveryLib import \
+    getDeviceExported
+from sardana.PoolController.common.ProxyPoolLib import getProxy, \
+    commandInoutAll
+from sardana.PoolController.common.AcqTimerLib import AcqTimer
+from sardana.PoolController.common import CallStatsLib
 # from sardana.pool.controller import DefaultValue
 # from sardana.pool import PoolUtil
 
@@ -41,24 +45,22 @@ class DGG2Ctrl(CounterTimerController):
     def __init__(self, inst, props, *args, **kwargs):
         self.TangoHost = None
         CounterTimerController.__init__(self, inst, props, *args, **kwargs)
-        if self.TangoHost is None:
-            self.db = PyTango.Database()
-        else:
+        if self.TangoHost is not None:
             self.node = self.TangoHost
             self.port = 10000
             if self.TangoHost.find(':'):
                 lst = self.TangoHost.split(':')
                 self.node = lst[0]
                 self.port = int(lst[1])
-        self.db = PyTango.Database(self.node, self.port)
         name_dev_ask = self.RootDeviceName + "*"
-        self.devices = self.db.get_device_exported(name_dev_ask)
+        self.devices = getDeviceExported(
+            name_dev_ask, tangoHost=self.TangoHost)
         self.max_device = 0
         self.tango_device = []
         self.proxy = []
         self.device_available = []
         self.intern_sta = []
-        for name in self.devices.value_string:
+        for name in self.devices:
             self.tango_device.append(name)
             self.proxy.append(None)
             self.device_available.append(0)
@@ -66,8 +68,7 @@ class DGG2Ctrl(CounterTimerController):
             self.intern_sta.append(State.On)
         self.started = False
         self.preset_mode = 0  # Trigger with counts
-        self._integ_time = None
-        self._start_time = None
+        self.timer = AcqTimer()
 
     def AddDevice(self, ind):
         CounterTimerController.AddDevice(self, ind)
@@ -80,7 +81,7 @@ class DGG2Ctrl(CounterTimerController):
         else:
             proxy_name = str(self.node) + (":%s/" % self.port) + \
                 str(self.tango_device[ind - 1])
-        self.proxy[ind - 1] = PyTango.DeviceProxy(proxy_name)
+        self.proxy[ind - 1] = getProxy(proxy_name, owner=self)
         self.device_available[ind - 1] = 1
 
     def DeleteDevice(self, ind):
@@ -114,12 +115,7 @@ class DGG2Ctrl(CounterTimerController):
             except Exception:
                 self.intern_sta[ind - 1] = State.Fault
                 return v
-            now = time.time()
-            if self._start_time is not None:
-                elapsed_time = now - self._start_time
-            else:
-                elapsed_time = 9999999999.
-            if elapsed_time < self._integ_time:
+            if not self.timer.mayBeDone():
                 self.intern_sta[ind - 1] = State.Moving
             else:
                 self.intern_sta[ind - 1] = \
@@ -144,13 +140,16 @@ class DGG2Ctrl(CounterTimerController):
             self.wantedCT.append(ind)
 
     def StartAll(self):
+        if self.preset_mode:
+            cmd = "StartPreset"
+        else:
+            cmd = "Start"
+        # all timers are started concurrently
+        commandInoutAll(
+            [(self.proxy[index - 1], cmd) for index in self.wantedCT])
+        self.timer.start()
         for index in self.wantedCT:
-            if self.preset_mode:
-                self.proxy[index-1].command_inout("StartPreset")
-            else:
-                self.proxy[index-1].command_inout("Start")
-            self._start_time = time.time()
-            self.intern_sta[index-1] = State.Moving
+            self.intern_sta[index - 1] = State.Moving
 
     def LoadOne(self, ind, value, repetitions, latency_time):
         if self.device_available[ind - 1] == 1:
@@ -159,7 +158,7 @@ class DGG2Ctrl(CounterTimerController):
                 value = -1. * value
             else:
                 self.preset_mode = 0
-            self._integ_time = value
+            self.timer.load(value)
             self.proxy[ind - 1].write_attribute("SampleTime", value)
 
     def GetAxisExtraPar(self, ind, name):
@@ -172,6 +171,7 @@ class DGG2Ctrl(CounterTimerController):
     def SetAxisExtraPar(self, ind, name, value):
         pass
 
+    @CallStatsLib.statsCommands
     def SendToCtrl(self, in_data):
         return "Nothing sent"
 
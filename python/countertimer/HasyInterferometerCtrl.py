@@ -7,6 +7,8 @@ from sardana import DataAccess
 # from sardana.pool.controller import MotorController
 # from sardana.pool.controller import Type, Access, Description, DefaultValue
 from sardana.pool.controller import Type, Access, Description
+from sardana.PoolController.common.ProxyPoolLib import getProxy
+from sardana.PoolController.common import CallStatsLib
 # from sardana.pool import PoolUtil
 
 ReadOnly = DataAccess.ReadOnly
@@ -52,7 +54,7 @@ class HasyInterferometerCtrl(CounterTimerController):
         if self.TangoHost is not None:
             proxy_name = str(self.node) + (":%s/" % self.port) + \
                 str(proxy_name)
-        self.proxy = PyTango.DeviceProxy(proxy_name)
+        self.proxy = getProxy(proxy_name, owner=self)
 
     def AddDevice(self, ind):
         CounterTimerController.AddDevice(self, ind)
@@ -108,6 +110,7 @@ class HasyInterferometerCtrl(CounterTimerController):
     def SetAxisExtraPar(self, ind, name, value):
         pass
 
+    @CallStatsLib.statsCommands
     def SendToCtrl(self, in_data):
         return "Nothing sent"
 
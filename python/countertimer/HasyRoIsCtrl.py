@@ -6,6 +6,12 @@ from sardana import DataAccess
 # from sardana import State, DataAccess
 from sardana.pool.controller import CounterTimerController
 from sardana.pool.controller import Type, Access, Description
+from sardana.PoolController.common.RoIEngineLib import RoIEngine
+from sardana.PoolController.common.ProxyPoolLib import getProxy
+from sardana.PoolController.common.CapabilityProbeLib import \
+    probeDevice, invalidateCapabilities
+from sardana.PoolController.common import CallStatsLib
+from sardana.PoolController.common import SpectrumExchangeLib
 # from sardana.pool.controller import Type, Access, Description, DefaultValue
 # from sardana.pool import PoolUtil
 
@@ -61,23 +67,27 @@ class HasyRoIsCtrl(CounterTimerController):
         self.RoIs_start = []
         self.RoIs_end = []
         self.value = []
+        self.engine = RoIEngine()
         proxy_name = self.RootDeviceName
         if self.TangoHost is not None:
             proxy_name = str(self.node) + \
                 (":%s/" % self.port) + str(proxy_name)
-        self.proxy = PyTango.DeviceProxy(proxy_name)
-        if hasattr(self.proxy, 'BankId'):
-            self.flagIsMCA8715 = True
-        if hasattr(self.proxy, 'Spectrum') and \
-           hasattr(self.proxy, 'McaLength'):
-            self.flagIsXIA = True
-        if hasattr(self.proxy, 'ADCxInputInvert') or \
-           hasattr(self.proxy, 'TriggerPeakingTime'):
-            self.flagIsSIS3320 = True
+        self.proxy = getProxy(proxy_name, owner=self)
+        self.exchange_name = proxy_name
+        self._probe()
 
         global last_sta
         last_sta = PyTango.DevState.ON
 
+    def _probe(self):
+        caps = probeDevice(self.proxy, self.exchange_name)
+        self.flagIsMCA8715 = caps["isMCA8715"]
+        self.flagIsXIA = caps["isXIA"]
+        self.flagIsSIS3320 = caps["isSIS3320"]
+        self.dataAttrName = "Data"
+        if self.flagIsXIA:
+            self.dataAttrName = "Spectrum"
+
     def AddDevice(self, ind):
         CounterTimerController.AddDevice(self, ind)
         self.RoIs_start.append(0)
@@ -114,25 +124,30 @@ class HasyRoIsCtrl(CounterTimerController):
             self.monitor_count = -value
 
     def PreReadAll(self):
+        # HasyOneDCtrl may have stopped the MCA already
+        if SpectrumExchangeLib.isStopped(self.exchange_name):
+            return
         if self.flagIsXIA == 0:
             self.proxy.command_inout("Stop")
             self.proxy.command_inout("Read")
         else:
             if self.proxy.command_inout("State") != PyTango.DevState.ON:
                 self.proxy.command_inout("Stop")
+        SpectrumExchangeLib.acquisitionStopped(self.exchange_name)
 
     def PreReadOne(self, ind):
         pass
 
     def ReadAll(self):
-        if self.flagIsXIA:
-            data = self.proxy.Spectrum
-        else:
-            data = self.proxy.Data
-        for i in range(0, len(self.value)):
-            self.value[i] = 0
-            for j in range(self.RoIs_start[i], self.RoIs_end[i] + 1):
-                self.value[i] = self.value[i] + data[j]
+        data = SpectrumExchangeLib.lookup(self.exchange_name)
+        if data is None:
+            data = SpectrumExchangeLib.publish(
+                self.exchange_name,
+                self.proxy.read_attribute(self.dataAttrName).value)
+        # RoIEnd is inclusive
+        self.engine.setSpectrum(data)
+        self.value = list(self.engine.roiSums(
+            self.RoIs_start, [end + 1 for end in self.RoIs_end]))
 
     def ReadOne(self, ind):
         return self.value[ind - 1]
@@ -147,6 +162,9 @@ class HasyRoIsCtrl(CounterTimerController):
             sta = PyTango.DevState.ON
         if self.flagIsMCA8715:
             self.proxy.BankId = 0
+        # a new point, also if the MCA is not started here: the
+        # spectrum of the previous point must not be served again
+        SpectrumExchangeLib.acquisitionStarted(self.exchange_name)
         # the state may be ON but one bank can be active
         if sta == PyTango.DevState.ON:
             self.proxy.command_inout("Stop")
@@ -191,7 +209,12 @@ class HasyRoIsCtrl(CounterTimerController):
         elif name == "RoIEnd":
             self.RoIs_end[ind - 1] = value
 
+    @CallStatsLib.statsCommands
     def SendToCtrl(self, in_data):
+        if in_data.strip().lower() == "capabilities reset":
+            invalidateCapabilities(self.exchange_name)
+            self._probe()
+            return "capabilities reset"
         return "Nothing sent"
 
     def __del__(self):
@@ -8,6 +8,10 @@ from sardana import DataAccess
 # from sardana import State, DataAccess
 # from sardana.pool.controller import MotorController
 from sardana.pool.controller import Type, Description
+from sardana.PoolController.common.RoIEngineLib import roiSum
+from sardana.PoolController.common.ProxyPoolLib import getProxy
+from sardana.PoolController.common import CallStatsLib
+from sardana.PoolController.common import SpectrumExchangeLib
 # from sardana.pool.controller import Type, Access, Description, DefaultValue
 # from sardana.pool import PoolUtil
 
@@ -44,7 +48,7 @@ class HasyScaCtrl(CounterTimerController):
         if ind > self.max_device:
             print("HasyScaCtrl wrong index")
             return
-        self.proxy[ind - 1] = PyTango.DeviceProxy(self.mca)
+        self.proxy[ind - 1] = getProxy(self.mca, owner=self)
         self.device_available[ind - 1] = 1
 
     def DeleteDevice(self, ind):
@@ -75,6 +79,10 @@ class HasyScaCtrl(CounterTimerController):
     def ReadOne(self, ind):
         if self.device_available[ind - 1] == 0:
             return False
+        # the spectrum read by HasyOneDCtrl or HasyRoIsCtrl
+        data = SpectrumExchangeLib.lookup(self.mca)
+        if data is not None:
+            return roiSum(data, self.roi1, self.roi2)
         if self.proxy[ind - 1].BankId != 0:
             self._log.error("HasyScaCtrl, BankId != 0 (%d) for %s"
                             % (self.proxy[ind - 1].BankId,
@@ -84,11 +92,10 @@ class HasyScaCtrl(CounterTimerController):
         if self.proxy[ind - 1].StateBank0 != 0:
             self.proxy[ind - 1].Stop()
             self.proxy[ind - 1].Read()
-        data = self.proxy[ind - 1].Data
-        sum = 0
-        for i in range(int(self.roi1), int(self.roi2)):
-            sum += data[i]
-        return sum
+        # the bank is idle now, the spectrum is final
+        SpectrumExchangeLib.acquisitionStopped(self.mca)
+        data = SpectrumExchangeLib.publish(self.mca, self.proxy[ind - 1].Data)
+        return roiSum(data, self.roi1, self.roi2)
 
     def AbortOne(self, ind):
         return True
@@ -105,6 +112,9 @@ class HasyScaCtrl(CounterTimerController):
     def StartAll(self):
         self.started = True
         self.start_time = time.time()
+        # a new point, the spectrum of the previous one is outdated
+        # even if no other controller starts the MCA
+        SpectrumExchangeLib.acquisitionStarted(self.mca)
         return True
 
     def LoadOne(self, ind, value, repetitions, latency_time):
@@ -121,6 +131,7 @@ class HasyScaCtrl(CounterTimerController):
             if self.device_available[ind - 1]:
                 self.proxy[ind - 1].write_attribute("Offset", value)
 
+    @CallStatsLib.statsCommands
     def SendToCtrl(self, in_data):
         return "Nothing sent"
 
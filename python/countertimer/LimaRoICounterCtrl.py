@@ -1,3 +1,10 @@
+#
+# ReadAll() asks readCounters() only for the frames which were not read
+# yet. Multi-point acquisitions (repetitions > 1, hardware triggered
+# Lima) get one value per frame: ReadOne() returns the sums of the
+# frames which arrived since the previous call.
+#
+import numpy
 import PyTango
 from sardana.pool.controller import CounterTimerController
 # import time
@@ -7,6 +14,8 @@ from sardana import DataAccess
 # from sardana import State, DataAccess
 # from sardana.pool.controller import MotorController
 from sardana.pool.controller import Type, Access, Description
+from sardana.PoolController.common.ProxyPoolLib import getProxy
+from sardana.PoolController.common import CallStatsLib
 # from sardana.pool.controller import Type, Access, Description, DefaultValue
 # from sardana.pool import PoolUtil
 
@@ -40,6 +49,11 @@ class LimaRoICounterCtrl(CounterTimerController):
     organization = "DESY"
     state = ""
     status = ""
+    #
+    # readCounters() returns a record per RoI and frame:
+    # roi id, frame number, sum, average, std, min, max
+    #
+    RecordLength = 7
 
     def __init__(self, inst, props, *args, **kwargs):
         CounterTimerController.__init__(self, inst, props, *args, **kwargs)
@@ -54,11 +68,20 @@ class LimaRoICounterCtrl(CounterTimerController):
         if self.TangoHost is not None:
             self.proxy_name = str(self.node) + (":%s/" % self.port) + \
                 str(self.proxy_name)
-        self.proxy = PyTango.DeviceProxy(self.proxy_name)
+        self.proxy = getProxy(self.proxy_name, owner=self)
         self.proxy.Stop()
         self.proxy.Start()
         self.roi_id = []
         self.roi_name = []
+        #
+        # the first frame not read yet and the sums of the
+        # last frame read, by roi id
+        #
+        self.next_frame = 0
+        self.roi_sums = {}
+        # multi-point: the per frame sums not delivered yet, by roi id
+        self.roi_pending = {}
+        self._repetitions = 1
 
     def AddDevice(self, ind):
         CounterTimerController.AddDevice(self, ind)
@@ -92,6 +115,9 @@ class LimaRoICounterCtrl(CounterTimerController):
         tup = (sta, status)
         return tup
 
+    def _isMultiPoint(self):
+        return self._repetitions > 1
+
     def PreReadAll(self):
         pass
 
@@ -99,17 +125,37 @@ class LimaRoICounterCtrl(CounterTimerController):
         pass
 
     def ReadAll(self):
-        pass
+        # one call for all RoIs, only frames which were not read yet
+        counts = numpy.asarray(
+            self.proxy.command_inout("readCounters", self.next_frame))
+        nb = counts.size // LimaRoICounterCtrl.RecordLength
+        if nb == 0:
+            return
+        records = counts[:nb * LimaRoICounterCtrl.RecordLength].reshape(
+            nb, LimaRoICounterCtrl.RecordLength)
+        ids = records[:, 0].astype(int)
+        if self._isMultiPoint():
+            for roi_id in self.roi_id:
+                self.roi_pending.setdefault(roi_id, []).extend(
+                    records[ids == roi_id, 2].tolist())
+        # records are sorted by frame, the last one of a roi wins
+        self.roi_sums.update(zip(ids, records[:, 2]))
+        self.next_frame = int(records[:, 1].max()) + 1
 
     def ReadOne(self, ind):
-        counts = self.proxy.command_inout("readCounters", 0)
-        return counts[7*(ind - 1) + 2]
+        if self._isMultiPoint():
+            return self.roi_pending.pop(self.roi_id[ind - 1], [])
+        return self.roi_sums.get(self.roi_id[ind - 1], 0)
 
     def AbortOne(self, ind):
         pass
 
     def PreStartAll(self):
         self.wantedCT = []
+        # Lima numbers the frames of each acquisition from 0
+        self.next_frame = 0
+        self.roi_sums = {}
+        self.roi_pending = {}
 
     def PreStartOne(self, ind, value):
         return True
@@ -121,7 +167,7 @@ class LimaRoICounterCtrl(CounterTimerController):
         pass
 
     def LoadOne(self, ind, value, repetitions, latency_time):
-        pass
+        self._repetitions = repetitions
 
     def GetAxisExtraPar(self, ind, name):
         if name == "TangoDevice":
@@ -154,6 +200,7 @@ class LimaRoICounterCtrl(CounterTimerController):
             roi[4] = value
             self.proxy.setRois(roi)
 
+    @CallStatsLib.statsCommands
     def SendToCtrl(self, in_data):
         return "Nothing sent"
 
@@ -7,6 +7,8 @@ from sardana import DataAccess
 # from sardana.pool.controller import MotorController
 # from sardana.pool.controller import Type, Access, Description, DefaultValue
 from sardana.pool.controller import Type, Access, Description
+from sardana.PoolController.common.ProxyPoolLib import getProxy
+from sardana.PoolController.common import CallStatsLib
 # from sardana.pool import PoolUtil
 
 ReadOnly = DataAccess.ReadOnly
@@ -54,7 +56,7 @@ class MCAroisCtrl(CounterTimerController):
         if self.TangoHost is not None:
             proxy_name = str(self.node) + (":%s/" % self.port) + \
                 str(proxy_name)
-        self.proxy = PyTango.DeviceProxy(proxy_name)
+        self.proxy = getProxy(proxy_name, owner=self)
         self.start_time = time.time()
         self.exp_time = 0
         self.scanning = 0
@@ -137,6 +139,7 @@ class MCAroisCtrl(CounterTimerController):
         if name == "FlagClear":
             self.flag_clear = value
 
+    @CallStatsLib.statsCommands
     def SendToCtrl(self, in_data):
         return "Nothing sent"
 
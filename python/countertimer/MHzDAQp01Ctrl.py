@@ -7,6 +7,8 @@ from sardana import DataAccess
 # from sardana.pool.controller import MotorController
 # from sardana.pool.controller import Type, Access, Description, DefaultValue
 from sardana.pool.controller import Type, Access, Description
+from sardana.PoolController.common.ProxyPoolLib import getProxy
+from sardana.PoolController.common import CallStatsLib
 # from sardana.pool import PoolUtil
 
 ReadOnly = DataAccess.ReadOnly
@@ -54,7 +56,7 @@ class MHzDAQp01Ctrl(CounterTimerController):
         if self.TangoHost is not None:
             proxy_name = str(self.node) + (":%s/" % self.port) + \
                 str(proxy_name)
-        self.proxy = PyTango.DeviceProxy(proxy_name)
+        self.proxy = getProxy(proxy_name, owner=self)
         global last_sta
         last_sta = PyTango.DevState.ON
 
@@ -141,6 +143,7 @@ class MHzDAQp01Ctrl(CounterTimerController):
         elif name == "FileNum":
             self.proxy.write_attribute("FileStartNum", value)
 
+    @CallStatsLib.statsCommands
     def SendToCtrl(self, in_data):
         return "Nothing sent"
 
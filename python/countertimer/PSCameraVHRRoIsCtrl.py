@@ -6,6 +6,8 @@ from sardana import DataAccess
 # from sardana import State
 # from sardana.pool.controller import MotorController
 from sardana.pool.controller import Type, Access, Description
+from sardana.PoolController.common.ProxyPoolLib import getProxy
+from sardana.PoolController.common import CallStatsLib
 #  from sardana.pool.controller import Type, Access, Description, DefaultValue
 # from sardana.pool import PoolUtil
 
@@ -57,7 +59,7 @@ class PSCameraVHRRoIsCtrl(CounterTimerController):
         if self.TangoHost is not None:
             proxy_name = str(self.node) + (":%s/" % self.port) + \
                 str(proxy_name)
-        self.proxy = PyTango.DeviceProxy(proxy_name)
+        self.proxy = getProxy(proxy_name, owner=self)
 
     def AddDevice(self, ind):
         CounterTimerController.AddDevice(self, ind)
@@ -123,6 +125,7 @@ class PSCameraVHRRoIsCtrl(CounterTimerController):
     def SetAxisExtraPar(self, ind, name, value):
         pass
 
+    @CallStatsLib.statsCommands
     def SendToCtrl(self, in_data):
         return "Nothing sent"
 
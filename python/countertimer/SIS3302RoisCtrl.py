@@ -6,6 +6,8 @@ import time
 from sardana import DataAccess
 # from sardana.pool.controller import MotorController
 from sardana.pool.controller import Type, Access, Description, DefaultValue
+from sardana.PoolController.common.ProxyPoolLib import getProxy
+from sardana.PoolController.common import CallStatsLib
 # from sardana.pool import PoolUtil
 
 ReadOnly = DataAccess.ReadOnly
@@ -62,7 +64,7 @@ class SIS3302RoisCtrl(CounterTimerController):
         if self.TangoHost is not None:
             proxy_name = str(self.node) + (":%s/" % self.port) \
                 + str(proxy_name)
-        self.proxy = PyTango.DeviceProxy(proxy_name)
+        self.proxy = getProxy(proxy_name, owner=self)
         self.acqStartTime = None
 
     def AddDevice(self, ind):
@@ -148,6 +150,7 @@ class SIS3302RoisCtrl(CounterTimerController):
         if name == "RoIIndex":
             self.RoIIndexes[ind - 1] = value
 
+    @CallStatsLib.statsCommands
     def SendToCtrl(self, in_data):
         return "Nothing sent"
 
@@ -1,14 +1,25 @@
 #
 # 4.9.2019 TN modified ReadOne() to use the elapsed time trick
 #
-import PyTango
+# multi-point acquisitions (repetitions > 1) use the SIS3820MCS device
+# given by the MCSDevice property: it is set up once for all triggers,
+# times each trigger by itself and ReadOne() returns the counts of the
+# triggers which arrived since the previous call. Without MCSDevice each
+# point is started by software.
+#
+import numpy
 from sardana.pool.controller import CounterTimerController
-import time
 
 
 from sardana import State, DataAccess
 # from sardana.pool.controller import MotorController
-from sardana.pool.controller import Type, Access, Description
+from sardana.pool.controller import Type, Access, Description, DefaultValue
+from sardana.PoolController.common.DeviceDiscoveryLib import \
+    getDeviceExported
+from sardana.PoolController.common.ProxyPoolLib import getProxy, \
+    commandInoutAll
+from sardana.PoolController.common.AcqTimerLib import AcqTimer
+from sardana.PoolController.common import CallStatsLib
 # from sardana.pool.controller import  DefaultValue
 # from sardana.pool import PoolUtil
 
@@ -21,6 +32,7 @@ class SIS3820Ctrl(CounterTimerController):
     axis_attributes = {
         'Offset': {Type: float, Access: ReadWrite},
         'TangoDevice': {Type: str, Access: ReadOnly},
+        'MCSChannel': {Type: int, Access: ReadWrite},
     }
 
     ctrl_properties = {
@@ -30,7 +42,19 @@ class SIS3820Ctrl(CounterTimerController):
         'TangoHost': {
             Type: str,
             Description: 'The tango host where searching the devices'},
+        'MCSDevice': {
+            Type: str,
+            Description: 'The SIS3820MCS device used for repetitions > 1',
+            DefaultValue: ""},
+        'MCSPresetUnit': {
+            Type: float,
+            Description: 'The unit of the MCSDevice Preset in seconds',
+            DefaultValue: 1e-6},
     }
+    #
+    # the number of triggers the MCS has counted since SetupMCS
+    #
+    mcsCounterAttr = "AcquisitionCounter"
 
     gender = "CounterTimer"
     model = "SIS3820"
@@ -42,32 +66,40 @@ class SIS3820Ctrl(CounterTimerController):
         self.TangoHost = None
         CounterTimerController.__init__(
             self, inst, props, *args, **kwargs)
-        if self.TangoHost is None:
-            self.db = PyTango.Database()
-        else:
+        if self.TangoHost is not None:
             self.node = self.TangoHost
             self.port = 10000
             if self.TangoHost.find(':'):
                 lst = self.TangoHost.split(':')
                 self.node = lst[0]
                 self.port = int(lst[1])
-            self.db = PyTango.Database(self.node, self.port)
         name_dev_ask = self.RootDeviceName + "*"
-        self.devices = self.db.get_device_exported(name_dev_ask)
+        self.devices = getDeviceExported(
+            name_dev_ask, tangoHost=self.TangoHost)
         self.max_device = 0
         self.tango_device = []
         self.proxy = []
         self.device_available = []
         self.intern_sta = []
-        for name in self.devices.value_string:
+        for name in self.devices:
             self.tango_device.append(name)
             self.proxy.append(None)
             self.device_available.append(0)
             self.max_device = self.max_device + 1
             self.intern_sta.append(State.On)
         self.started = False
-        self._integ_time = None
-        self._start_time = None
+        self.timer = AcqTimer()
+        #
+        # multi-point mode
+        #
+        self.mcs_channel = list(range(self.max_device))
+        self.mcs_proxy = None
+        if self.MCSDevice:
+            self.mcs_proxy = getProxy(self.MCSDevice, owner=self)
+        self._repetitions = 1
+        self._mcs_data = None
+        self._mcs_arrived = 0
+        self._mcs_delivered = {}
 
     def AddDevice(self, ind):
         CounterTimerController.AddDevice(self, ind)
@@ -80,7 +112,7 @@ class SIS3820Ctrl(CounterTimerController):
         else:
             proxy_name = str(self.node) + (":%s/" % self.port) + \
                 str(self.tango_device[ind - 1])
-        self.proxy[ind - 1] = PyTango.DeviceProxy(proxy_name)
+        self.proxy[ind - 1] = getProxy(proxy_name, owner=self)
         self.device_available[ind - 1] = 1
 
     def DeleteDevice(self, ind):
@@ -88,8 +120,14 @@ class SIS3820Ctrl(CounterTimerController):
         self.proxy[ind - 1] = None
         self.device_available[ind - 1] = 0
 
+    def _isMultiPoint(self):
+        return self.mcs_proxy is not None and self._repetitions > 1
+
     def StateOne(self, ind):
         if self.device_available[ind - 1] == 1:
+            if self._isMultiPoint():
+                sta = self.mcs_proxy.command_inout("State")
+                return (sta, "State of the MCS")
             tup = (self.intern_sta[ind - 1], "State from ReadOne")
             return tup
 
@@ -100,9 +138,28 @@ class SIS3820Ctrl(CounterTimerController):
         pass
 
     def ReadAll(self):
-        pass
+        if self._isMultiPoint():
+            # CountsArray has a row for each of the NbAcquisitions
+            # triggers, only the arrived ones hold counts
+            arrived = min(int(self.mcs_proxy.read_attribute(
+                self.mcsCounterAttr).value), self._repetitions)
+            if arrived <= self._mcs_arrived:
+                return
+            # one FIFO readout serves all channels
+            self.mcs_proxy.command_inout("ReadMCS")
+            self._mcs_data = numpy.atleast_2d(
+                self.mcs_proxy.read_attribute("CountsArray").value)
+            self._mcs_arrived = arrived
 
     def ReadOne(self, ind):
+        if self._isMultiPoint():
+            if self._mcs_data is None:
+                return []
+            done = self._mcs_delivered.get(ind, 0)
+            block = self._mcs_data[
+                done:self._mcs_arrived, self.mcs_channel[ind - 1]]
+            self._mcs_delivered[ind] = done + len(block)
+            return block.tolist()
         if self.device_available[ind - 1] == 1:
             value = None
             try:
@@ -110,12 +167,7 @@ class SIS3820Ctrl(CounterTimerController):
             except Exception:
                 self.intern_sta[ind - 1] = State.Fault
                 return value
-            now = time.time()
-            if self._start_time is not None:
-                elapsed_time = now - self._start_time
-            else:
-                elapsed_time = 9999999999.
-            if elapsed_time < self._integ_time:
+            if not self.timer.mayBeDone():
                 self.intern_sta[ind - 1] = State.Moving
             else:
                 self.intern_sta[ind - 1] = \
@@ -130,7 +182,10 @@ class SIS3820Ctrl(CounterTimerController):
 
     def PreStartOne(self, ind, value):
         if self.device_available[ind - 1] == 1:
-            self.proxy[ind - 1].command_inout("Reset")
+            if self._isMultiPoint():
+                # the MCS is armed once in StartAll
+                return True
+            # the counters are reset concurrently in StartAll
             self.intern_sta[ind - 1] = State.Moving
             return True
         else:
@@ -141,11 +196,27 @@ class SIS3820Ctrl(CounterTimerController):
         self.wantedCT.append(ind)
 
     def StartAll(self):
+        if not self._isMultiPoint():
+            commandInoutAll(
+                [(self.proxy[ind - 1], "Reset") for ind in self.wantedCT
+                 if self.device_available[ind - 1] == 1])
         self.started = True
-        self._start_time = time.time()
+        self.timer.start()
+        if self._isMultiPoint():
+            self._mcs_data = None
+            self._mcs_arrived = 0
+            self._mcs_delivered = {}
+            self.mcs_proxy.write_attribute(
+                "NbAcquisitions", self._repetitions)
+            self.mcs_proxy.command_inout("SetupMCS")
 
     def LoadOne(self, ind, value, repetitions, latency_time):
-        self._integ_time = value
+        self.timer.load(value)
+        self._repetitions = repetitions
+        if self._isMultiPoint() and value > 0:
+            # the MCS ends each point by itself
+            self.mcs_proxy.write_attribute(
+                "Preset", int(round(value / self.MCSPresetUnit)))
 
     def GetAxisExtraPar(self, ind, name):
         if self.device_available[ind - 1]:
@@ -156,12 +227,17 @@ class SIS3820Ctrl(CounterTimerController):
                 tango_device = self.node + ":" + str(self.port) + "/" \
                     + self.proxy[ind - 1].name()
                 return tango_device
+            elif name == "MCSChannel":
+                return self.mcs_channel[ind - 1]
 
     def SetAxisExtraPar(self, ind, name, value):
         if name == "Offset":
             if self.device_available[ind - 1]:
                 self.proxy[ind - 1].write_attribute("Offset", value)
+        elif name == "MCSChannel":
+            self.mcs_channel[ind - 1] = int(value)
 
+    @CallStatsLib.statsCommands
     def SendToCtrl(self, in_data):
         return "Nothing sent"
 
@@ -1,5 +1,4 @@
 
-import PyTango
 
 import time
 
@@ -7,6 +6,10 @@ import time
 from sardana import DataAccess
 from sardana.pool.controller import CounterTimerController
 from sardana.pool.controller import Type, Access, Description
+from sardana.PoolController.common.DeviceDiscoveryLib import \
+    getDeviceExported
+from sardana.PoolController.common.ProxyPoolLib import getProxy
+from sardana.PoolController.common import CallStatsLib
 # from sardana.pool.controller import Type, Access, Description, DefaultValue
 # from sardana.pool import PoolUtil
 
@@ -41,19 +44,17 @@ class VFCADCCtrl(CounterTimerController):
         CounterTimerController.__init__(self, inst, props, *args, **kwargs)
 #        print "PYTHON -> CounterTimerController ctor for instance", inst
 
-        if self.TangoHost is None:
-            self.db = PyTango.Database()
-        else:
+        if self.TangoHost is not None:
             self.node = self.TangoHost
             self.port = 10000
             if self.TangoHost.find(':'):
                 lst = self.TangoHost.split(':')
                 self.node = lst[0]
                 self.port = int(lst[1])
-            self.db = PyTango.Database(self.node, self.port)
 
         name_dev_ask = self.RootDeviceName + "*"
-        self.devices = self.db.get_device_exported(name_dev_ask)
+        self.devices = getDeviceExported(
+            name_dev_ask, tangoHost=self.TangoHost)
         self.max_device = 0
         self.tango_device = []
         self.proxy = []
@@ -67,7 +68,7 @@ class VFCADCCtrl(CounterTimerController):
         self.Polarity = []
         self.dft_FlagReadVoltage = 0
         self.FlagReadVoltage = []
-        for name in self.devices.value_string:
+        for name in self.devices:
             self.tango_device.append(name)
             self.proxy.append(None)
             self.device_available.append(0)
@@ -90,7 +91,7 @@ class VFCADCCtrl(CounterTimerController):
         else:
             proxy_name = str(self.node) + (":%s/" % self.port) + \
                 str(self.tango_device[ind - 1])
-        self.proxy[ind - 1] = PyTango.DeviceProxy(proxy_name)
+        self.proxy[ind - 1] = getProxy(proxy_name, owner=self)
         self.device_available[ind - 1] = 1
 
     def DeleteDevice(self, ind):
@@ -204,6 +205,7 @@ class VFCADCCtrl(CounterTimerController):
             if self.device_available[ind - 1]:
                 self.FlagReadVoltage[ind - 1] = value
 
+    @CallStatsLib.statsCommands
     def SendToCtrl(self, in_data):
         #        print "Received value =", in_data
         return "Nothing sent"
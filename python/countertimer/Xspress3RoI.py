@@ -6,6 +6,9 @@ from sardana import DataAccess
 # from sardana import State
 from sardana.pool.controller import CounterTimerController
 from sardana.pool.controller import Type, Access, Description
+from sardana.PoolController.common.RoIEngineLib import RoIEngine
+from sardana.PoolController.common.ProxyPoolLib import getProxy
+from sardana.PoolController.common import CallStatsLib
 # from sardana.pool.controller import DefaultValue
 # from sardana.pool import PoolUtil
 
@@ -58,11 +61,12 @@ class Xspress3RoIsCtrl(CounterTimerController):
         self.RoIs_end = []
         self.value = []
         self.channel = []
+        self.read_axes = []
         proxy_name = self.RootDeviceName
         if self.TangoHost is not None:
             proxy_name = str(self.node) + \
                 (":%s/" % self.port) + str(proxy_name)
-        self.proxy = PyTango.DeviceProxy(proxy_name)
+        self.proxy = getProxy(proxy_name, owner=self)
         global last_sta
         last_sta = PyTango.DevState.ON
 
@@ -97,20 +101,34 @@ class Xspress3RoIsCtrl(CounterTimerController):
         self.proxy.ExposureTime = value
 
     def PreReadAll(self):
-        pass
+        self.read_axes = []
 
     def PreReadOne(self, ind):
-        pass
+        self.read_axes.append(ind)
 
     def ReadAll(self):
-        pass
+        #
+        # each data channel is read once, also if several
+        # RoIs are defined on it
+        #
+        channels = sorted(set(
+            self.channel[ind - 1] for ind in self.read_axes))
+        attr_names = ["DataCh" + str(channel) for channel in channels]
+        if not attr_names:
+            return
+        attrs = self.proxy.read_attributes(attr_names)
+        for channel, attr in zip(channels, attrs):
+            engine = RoIEngine(attr.value)
+            axes = [ind for ind in self.read_axes
+                    if self.channel[ind - 1] == channel]
+            # RoIEnd is inclusive
+            counts = engine.roiSums(
+                [self.RoIs_start[ind - 1] for ind in axes],
+                [self.RoIs_end[ind - 1] + 1 for ind in axes])
+            for ind, value in zip(axes, counts):
+                self.value[ind - 1] = value
 
     def ReadOne(self, ind):
-        attr_name = "DataCh" + str(self.channel[ind - 1])
-        data = self.proxy.read_attribute(attr_name).value
-        self.value[ind - 1] = 0
-        for j in range(self.RoIs_start[ind - 1], self.RoIs_end[ind - 1] + 1):
-            self.value[ind - 1] = self.value[ind - 1] + data[j]
         return self.value[ind - 1]
 
     def PreStartAll(self):
@@ -164,6 +182,7 @@ class Xspress3RoIsCtrl(CounterTimerController):
         elif name == "DataChannel":
             self.channel[ind - 1] = value
 
+    @CallStatsLib.statsCommands
     def SendToCtrl(self, in_data):
         return "Nothing sent"
 
@@ -1,11 +1,15 @@
 import PyTango
 from sardana.pool.controller import CounterTimerController
-import time
 
 from sardana import DataAccess
 # from sardana import State, DataAccess
 # from sardana.pool.controller import MotorController
 from sardana.pool.controller import Type, Access, Description
+from sardana.PoolController.common.DeviceDiscoveryLib import \
+    getDeviceExported
+from sardana.PoolController.common.ProxyPoolLib import getProxy
+from sardana.PoolController.common.AcqTimerLib import AcqTimer
+from sardana.PoolController.common import CallStatsLib
 # from sardana.pool.controller import Type, Access, Description, DefaultValue
 # from sardana.pool import PoolUtil
 
@@ -52,23 +56,21 @@ class pilcTimerCtrl(CounterTimerController):
     def __init__(self, inst, props, *args, **kwargs):
         self.TangoHost = None
         CounterTimerController.__init__(self, inst, props, *args, **kwargs)
-        if self.TangoHost is None:
-            self.db = PyTango.Database()
-        else:
+        if self.TangoHost is not None:
             self.node = self.TangoHost
             self.port = 10000
             if self.TangoHost.find(':'):
                 lst = self.TangoHost.split(':')
                 self.node = lst[0]
                 self.port = int(lst[1])
-        self.db = PyTango.Database(self.node, self.port)
         name_dev_ask = self.RootDeviceName + "*"
-        self.devices = self.db.get_device_exported(name_dev_ask)
+        self.devices = getDeviceExported(
+            name_dev_ask, tangoHost=self.TangoHost)
         self.max_device = 0
         self.tango_device = []
         self.proxy = []
         self.device_available = []
-        for name in self.devices.value_string:
+        for name in self.devices:
             self.tango_device.append(name)
             self.proxy.append(None)
             self.device_available.append(0)
@@ -103,7 +105,7 @@ class pilcTimerCtrl(CounterTimerController):
                             + str(self.tango_device[ind - 1])
                             )
 
-        self.proxy[ind - 1] = PyTango.DeviceProxy(proxy_name)
+        self.proxy[ind - 1] = getProxy(proxy_name, owner=self)
         self.device_available[ind - 1] = 1
 
     #################
@@ -158,7 +160,7 @@ class pilcTimerCtrl(CounterTimerController):
 
     def PreStartAll(self):
         self.wantedCT = []
-        self.startTime = [0.0 for _ in range(len(self.proxy))]
+        self.timer = [AcqTimer() for _ in range(len(self.proxy))]
 
     ################
     # PreStartOne ##
@@ -195,12 +197,10 @@ class pilcTimerCtrl(CounterTimerController):
                         value
                         )
 
-            exposureTime = (
-                            time.time()
-                            - self.startTime[ind - 1]
-                            )
+            exposureTime = self.timer[ind - 1].elapsed()
 
-            if exposureTime > setTime:
+            if exposureTime > setTime or \
+               not self.timer[ind - 1].isStarted():
                 exposureTime = setTime
 
             return exposureTime
@@ -209,6 +209,7 @@ class pilcTimerCtrl(CounterTimerController):
     # SendToCtrl ##
     ###############
 
+    @CallStatsLib.statsCommands
     def SendToCtrl(self, in_data):
         return "Nothing sent"
 
@@ -226,7 +227,7 @@ class pilcTimerCtrl(CounterTimerController):
     def StartAll(self):
         for i in self.wantedCT:
             self.proxy[i].write_attribute('Arm', 1)
-            self.startTime[i] = time.time()
+            self.timer[i].start()
 
     #############
     # StartOne ##
@@ -39,6 +39,10 @@ from sardana import DataAccess
 from sardana.pool.controller import IORegisterController
 # from sardana.pool.controller import Type, Access, Description, DefaultValue
 from sardana.pool.controller import Type, Access, Description
+from sardana.PoolController.common.DeviceDiscoveryLib import \
+    getDeviceExported
+from sardana.PoolController.common.ProxyPoolLib import getProxy
+from sardana.PoolController.common import CallStatsLib
 # from sardana.pool import PoolUtil
 
 ReadOnly = DataAccess.ReadOnly
@@ -72,24 +76,22 @@ class SIS3610Ctrl(IORegisterController):
     def __init__(self, inst, props, *args, **kwargs):
         self.TangoHost = None
         IORegisterController.__init__(self, inst, props, *args, **kwargs)
-        if self.TangoHost is None:
-            self.db = PyTango.Database()
-        else:
+        if self.TangoHost is not None:
             self.node = self.TangoHost
             self.port = 10000
             if self.TangoHost.find(':'):
                 lst = self.TangoHost.split(':')
                 self.node = lst[0]
                 self.port = int(lst[1])
-            self.db = PyTango.Database(self.node, self.port)
 
         name_dev_ask = self.RootDeviceName + "*"
-        self.devices = self.db.get_device_exported(name_dev_ask)
+        self.devices = getDeviceExported(
+            name_dev_ask, tangoHost=self.TangoHost)
         self.max_device = 0
         self.tango_device = []
         self.proxy = []
         self.device_available = []
-        for name in self.devices.value_string:
+        for name in self.devices:
             self.tango_device.append(name)
             self.proxy.append(None)
             self.device_available.append(0)
@@ -106,7 +108,7 @@ class SIS3610Ctrl(IORegisterController):
         else:
             proxy_name = str(self.node) + (":%s/" % self.port) + \
                 str(self.tango_device[ind - 1])
-        self.proxy[ind - 1] = PyTango.DeviceProxy(proxy_name)
+        self.proxy[ind - 1] = getProxy(proxy_name, owner=self)
         self.device_available[ind - 1] = 1
 
     def DeleteDevice(self, ind):
@@ -139,5 +141,6 @@ class SIS3610Ctrl(IORegisterController):
                     self.proxy[ind - 1].name()
                 return tango_device
 
+    @CallStatsLib.statsCommands
     def SendToCtrl(self, in_data):
         return ""
@@ -1,6 +1,13 @@
+import collections
+import numpy
+
 # from sardana import pool
-import PyTango
-from sardana.pool.controller import MotorController, Description, Type
+from sardana import DataAccess
+from sardana.pool.controller import MotorController, Description, Type, \
+    Access
+from sardana.PoolController.common.ProxyPoolLib import getProxy, \
+    writeAttributeAll
+from sardana.PoolController.common import CallStatsLib
 
 
 class HKLMotorCtrl(MotorController):
@@ -15,6 +22,21 @@ class HKLMotorCtrl(MotorController):
             Description: 'The diffractometer device name'}
     }
 
+    # a trajectory of (h, k, l) points is resolved to real angles
+    # when written, moves to its points use the cached angles,
+    # other moves are calculated by the hkl simulator each time
+    ctrl_attributes = {
+        'Trajectory': {
+            Type: ((float,),), Access: DataAccess.ReadWrite,
+            Description: '(h, k, l) points of the next scan, the angle '
+            'cache is cleared if the diffractometer setup has changed '
+            'or the trajectory is empty'},
+        'TrajectoryAngles': {
+            Type: ((float,),), Access: DataAccess.ReadOnly,
+            Description: 'the real angles of the trajectory points, '
+            'one column per RealAxisProxies entry'},
+    }
+
     gender = "Motor"
     model = "HKLMotor"
     organization = "DESY"
@@ -26,6 +48,15 @@ class HKLMotorCtrl(MotorController):
 
     MaxDevice = 3
 
+    # (h, k, l) closer than this share the cached angles
+    TrajectoryResolution = 1e-6
+    # maximum number of cached solutions, the oldest are dropped
+    AngleCacheSize = 100000
+    # the diffractometer and hkl simulator attributes the cached
+    # solutions depend on
+    SetupAttrNames = ("Crystal", "Wavelength", "UB")
+    SimuSetupAttrNames = ("Mode", )
+
     def __init__(self, inst, props, *args, **kwargs):
         """ Do the default init plus the connection to the
         diffractometer device. And the readout of the properties
@@ -35,21 +66,21 @@ class HKLMotorCtrl(MotorController):
         """
         MotorController.__init__(self, inst, props, *args, **kwargs)
 
-        self.diffrac = PyTango.DeviceProxy(self.DiffracDevName)
+        self.diffrac = getProxy(self.DiffracDevName, owner=self)
 
         self.hkl_device = []
 
         h_dev_name = self.DiffracDevName + "-h"
-        self.hkl_device.append(PyTango.DeviceProxy(h_dev_name))
+        self.hkl_device.append(getProxy(h_dev_name, owner=self))
 
         k_dev_name = self.DiffracDevName + "-k"
-        self.hkl_device.append(PyTango.DeviceProxy(k_dev_name))
+        self.hkl_device.append(getProxy(k_dev_name, owner=self))
 
         l_dev_name = self.DiffracDevName + "-l"
-        self.hkl_device.append(PyTango.DeviceProxy(l_dev_name))
+        self.hkl_device.append(getProxy(l_dev_name, owner=self))
 
         hkl_simu_dev_name = self.DiffracDevName + "-sim-hkl"
-        self.hkl_simu_device = PyTango.DeviceProxy(hkl_simu_dev_name)
+        self.hkl_simu_device = getProxy(hkl_simu_dev_name, owner=self)
 
         prop = self.diffrac.get_property(['DiffractometerType'])
         for v in prop['DiffractometerType']:
@@ -62,6 +93,26 @@ class HKLMotorCtrl(MotorController):
             name_list = v.split(":")
             self.angle_names.append(name_list[0])
             self.angle_device_name[name_list[0]] = name_list[1]
+        #
+        # the real axes and the diffractometer attributes of their
+        # positions, e.g. omega -> axisOmega
+        #
+        self.angle_proxy = [getProxy(self.angle_device_name[angle], owner=self)
+                            for angle in self.angle_names]
+        self.angle_attr_names = ["axis" + angle.capitalize()
+                                 for angle in self.angle_names]
+        #
+        # index (0: h, 1: k, 2: l) -> target of the current move
+        #
+        self.hkl_target = {}
+        #
+        # rounded (h, k, l) -> angles, least recently used first
+        #
+        self.angle_cache = collections.OrderedDict()
+        self.setup_key = None
+        self.trajectory = numpy.zeros((0, 3))
+        self.trajectory_keys = set()
+        self.trajectory_angles = numpy.zeros((0, len(self.angle_names)))
 
     def StateOne(self, axis):
         """ Return the state from the h, k or l device.
@@ -92,8 +143,8 @@ class HKLMotorCtrl(MotorController):
         return self.hkl_device[axis-1].position
 
     def PreStartAll(self):
-        """ Nothing special to do"""
-        pass
+        """ Forget the targets of the previous move"""
+        self.hkl_target = {}
 
     def PreStartOne(self, axis, pos):
         """ Nothing special to do.
@@ -103,66 +154,132 @@ class HKLMotorCtrl(MotorController):
         return True
 
     def StartOne(self, axis, pos):
-        """ Move the axis separtely,
-        for multiple movements use the macro br """
-
-        if axis == 1:
-            self.hkl_simu_device.write_attribute("h", pos)
-            pos1 = self.hkl_device[1].position
-            self.hkl_simu_device.write_attribute("k", pos1)
-            pos1 = self.hkl_device[2].position
-            self.hkl_simu_device.write_attribute("l", pos1)
-        elif axis == 2:
-            pos1 = self.hkl_device[0].position
-            self.hkl_simu_device.write_attribute("h", pos1)
-            self.hkl_simu_device.write_attribute("k", pos)
-            pos1 = self.hkl_device[2].position
-            self.hkl_simu_device.write_attribute("l", pos1)
-        elif axis == 3:
-            pos1 = self.hkl_device[0].position
-            self.hkl_simu_device.write_attribute("h", pos1)
-            pos1 = self.hkl_device[1].position
-            self.hkl_simu_device.write_attribute("k", pos1)
-            self.hkl_simu_device.write_attribute("l", pos)
-
-        self.diffrac.write_attribute("Simulated", 1)
-
-        angles_to_set = {}
-
-        if self.type == 'E6C':
-            mu = self.diffrac.axisMu
-            omega = self.diffrac.axisOmega
-            chi = self.diffrac.axisChi
-            phi = self.diffrac.axisPhi
-            gamma = self.diffrac.axisGamma
-            delta = self.diffrac.axisDelta
-
-            angles_to_set["mu"] = mu
-            angles_to_set["omega"] = omega
-            angles_to_set["chi"] = chi
-            angles_to_set["phi"] = phi
-            angles_to_set["gamma"] = gamma
-            angles_to_set["delta"] = delta
-        elif self.type == 'E4CV':
-            omega = self.diffrac.axisOmega
-            chi = self.diffrac.axisChi
-            phi = self.diffrac.axisPhi
-            tth = self.diffrac.axisTth
-
-            angles_to_set["omega"] = omega
-            angles_to_set["chi"] = chi
-            angles_to_set["phi"] = phi
-            angles_to_set["tth"] = tth
-
-        for angle in self.angle_names:
-            angle_dev = PyTango.DeviceProxy(self.angle_device_name[angle])
-            angle_dev.write_attribute("Position", angles_to_set[angle])
-
-        self.diffrac.write_attribute("Simulated", 0)
+        """ Remember the target, the move is done by StartAll,
+        h, k and l moved together are calculated once
+        @param axis to start
+        @param pos to move to
+        """
+        self.hkl_target[axis - 1] = pos
 
     def StartAll(self):
-        """ Nothis special to do """
-        pass
+        """ Calculate the angles for the targets with the hkl
+        simulator and move the real axes concurrently
+        """
+        if not self.hkl_target:
+            return
+        hkl = []
+        for i in range(3):
+            if i in self.hkl_target:
+                hkl.append(self.hkl_target[i])
+            else:
+                hkl.append(self.hkl_device[i].position)
+        self.hkl_target = {}
+        if self._cacheKey(hkl) in self.trajectory_keys and \
+           not self._setupChanged():
+            angles = self._resolve([hkl])[0]
+        else:
+            angles = self._calculate([hkl])[0]
+        writeAttributeAll([
+            (proxy, "Position", angle)
+            for proxy, angle in zip(self.angle_proxy, angles)])
+
+    def _cacheKey(self, hkl):
+        return tuple(int(round(v / self.TrajectoryResolution)) for v in hkl)
+
+    def _calculate(self, points):
+        """ Calculate the real angles of (h, k, l) points with the
+        hkl simulator, each point is written before Simulated is set.
+        @param points sequence of (h, k, l)
+        @return array of the angles, one row per point
+        """
+        angles = numpy.empty((len(points), len(self.angle_names)))
+        for i, hkl in enumerate(points):
+            self.hkl_simu_device.write_attributes(
+                list(zip(("h", "k", "l"), hkl)))
+            self.diffrac.write_attribute("Simulated", 1)
+            try:
+                attrs = self.diffrac.read_attributes(self.angle_attr_names)
+                angles[i] = [attr.value for attr in attrs]
+            finally:
+                self.diffrac.write_attribute("Simulated", 0)
+        return angles
+
+    def _setupKey(self):
+        """ Return the diffractometer setup the angles depend on,
+        None if it cannot be read
+        """
+        key = []
+        try:
+            for proxy, attrNames in (
+                    (self.diffrac, self.SetupAttrNames),
+                    (self.hkl_simu_device, self.SimuSetupAttrNames)):
+                for attr in proxy.read_attributes(list(attrNames)):
+                    if getattr(attr, "has_failed", False):
+                        return None
+                    key.append(numpy.asarray(attr.value).tolist())
+        except Exception:
+            return None
+        return repr(key)
+
+    def _resolve(self, points):
+        """ Return the real angles of (h, k, l) points from the
+        cache, points which are not cached are calculated and added.
+        @param points sequence of (h, k, l)
+        @return array of the angles, one row per point
+        """
+        angles = numpy.empty((len(points), len(self.angle_names)))
+        missing = []
+        for i, hkl in enumerate(points):
+            key = self._cacheKey(hkl)
+            if key in self.angle_cache:
+                self.angle_cache.move_to_end(key)
+                angles[i] = self.angle_cache[key]
+            else:
+                missing.append(i)
+        if missing:
+            angles[missing] = self._calculate([points[i] for i in missing])
+            for i in missing:
+                self.angle_cache[self._cacheKey(points[i])] = angles[i].copy()
+            while len(self.angle_cache) > self.AngleCacheSize:
+                self.angle_cache.popitem(last=False)
+        return angles
+
+    def _setupChanged(self):
+        """ Check the diffractometer setup against the one the cached
+        angles were calculated for, the cache and the trajectory points
+        are dropped if it has changed or cannot be read.
+        @return True, if the cached angles must not be used
+        """
+        setup_key = self._setupKey()
+        if setup_key is not None and setup_key == self.setup_key:
+            return False
+        self.angle_cache.clear()
+        self.trajectory_keys = set()
+        self.setup_key = setup_key
+        return True
+
+    def getTrajectory(self):
+        return self.trajectory
+
+    def setTrajectory(self, value):
+        """ Resolve the (h, k, l) points of a trajectory to real
+        angles. The cached angles are dropped if the crystal, the
+        wavelength, the UB matrix or the mode have changed, if the
+        setup cannot be read or if the trajectory is empty.
+        @param value sequence of (h, k, l)
+        """
+        points = numpy.asarray(value, dtype=float).reshape(-1, 3)
+        setup_key = self._setupKey()
+        if len(points) == 0 or setup_key is None or \
+           setup_key != self.setup_key:
+            self.angle_cache.clear()
+        self.setup_key = setup_key
+        self.trajectory = points
+        self.trajectory_keys = set(self._cacheKey(hkl) for hkl in points)
+        self.trajectory_angles = self._resolve(points)
+
+    def getTrajectoryAngles(self):
+        return self.trajectory_angles
 
     def GetAxisExtraPar(self, axis, name):
         """ Get HKLMotor driver particular parameters.
@@ -192,6 +309,7 @@ class HKLMotorCtrl(MotorController):
     def GOAbsolute(self, axis, finalpos):
         pass
 
+    @CallStatsLib.statsCommands
     def SendToCtrl(self, cmd):
         pass
 
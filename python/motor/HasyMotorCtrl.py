@@ -1,5 +1,3 @@
-import PyTango
-
 import os
 
 from sardana import DataAccess
@@ -8,6 +6,10 @@ from sardana.pool.controller import Type, Access, Description
 # from sardana.pool.controller import (Memorize, Memorized,
 #                                      NotMemorized, DefaultValue)
 from sardana.pool.controller import Memorize, NotMemorized
+from sardana.PoolController.common.DeviceDiscoveryLib import \
+    getDeviceExported
+from sardana.PoolController.common.ProxyPoolLib import getProxy
+from sardana.PoolController.common import CallStatsLib
 
 
 class HasyMotorCtrl(MotorController):
@@ -69,13 +71,10 @@ class HasyMotorCtrl(MotorController):
         # the next line is because of haso228k (64bit)
         self.TangoHost = None
         MotorController.__init__(self, inst, props, *args, **kwargs)
-        self.db = PyTango.Database()
         self.debugFlag = False
         if os.isatty(1):
             self.debugFlag = True
-        if self.TangoHost is None:
-            self.db = PyTango.Database()
-        else:
+        if self.TangoHost is not None:
             #
             # TangoHost can be hasgksspp07eh3:10000
             #
@@ -85,9 +84,9 @@ class HasyMotorCtrl(MotorController):
                 lst = self.TangoHost.split(':')
                 self.node = lst[0]
                 self.port = int(lst[1])
-            self.db = PyTango.Database(self.node, self.port)
         name_dev_ask = self.RootDeviceName + "*"
-        self.devices = self.db.get_device_exported(name_dev_ask)
+        self.devices = getDeviceExported(
+            name_dev_ask, tangoHost=self.TangoHost)
         self.max_device = 0
         self.tango_device = []
         self.proxy = []
@@ -113,8 +112,16 @@ class HasyMotorCtrl(MotorController):
         self.poolmotor_proxy = []
         self.set_for_memorized_min = []
         self.set_for_memorized_max = []
-
-        for name in self.devices.value_string:
+        #
+        # axes collected by PreReadOne/PreStateOne, the values
+        # fetched by ReadAll/StateAll are served by ReadOne/StateOne
+        #
+        self.read_axes = []
+        self.read_values = {}
+        self.state_axes = []
+        self.state_values = {}
+
+        for name in self.devices:
             self.tango_device.append(name)
             self.proxy.append(None)
             self.device_available.append(0)
@@ -152,7 +159,7 @@ class HasyMotorCtrl(MotorController):
                 str(self.tango_device[ind - 1])
         if self.debugFlag:
             print("HasyMotorCtrl.AddDevice %s index %d" % (proxy_name, ind))
-        self.proxy[ind - 1] = PyTango.DeviceProxy(proxy_name)
+        self.proxy[ind - 1] = getProxy(proxy_name, owner=self)
         self.device_available[ind - 1] = 1
 
         attrs = self.proxy[ind - 1].get_attribute_list()
@@ -198,34 +205,92 @@ class HasyMotorCtrl(MotorController):
         self.proxy[ind - 1] = None
         self.device_available[ind - 1] = 0
 
-    def StateOne(self, ind):
+    def _stateAttrNames(self, ind):
+        attrNames = ["State"]
+        if self.attrName_CwLimit[ind - 1] is not None:
+            attrNames.append(self.attrName_CwLimit[ind - 1])
+        if self.attrName_CcwLimit[ind - 1] is not None:
+            attrNames.append(self.attrName_CcwLimit[ind - 1])
+        return attrNames
+
+    def _stateTuple(self, ind, values):
         status_template = "STATE(%s) LIM+(%s) LIM-(%s)"
+        sta = values["State"]
+        lower = 0
+        upper = 0
+        if self.attrName_CwLimit[ind - 1] is not None:
+            lower = values[self.attrName_CwLimit[ind - 1]]
+        if self.attrName_CcwLimit[ind - 1] is not None:
+            upper = values[self.attrName_CcwLimit[ind - 1]]
+        switchstate = lower * 4 + upper * 2
+        status_string = status_template % (sta, upper, lower)
+        return (sta, status_string, switchstate)
+
+    def _readAsynch(self, axes, attrNames):
+        """
+        sends read_attributes_asynch() to all axes before collecting
+        the replies, so the devices are served concurrently.
+        Returns {ind: {attrName: value}}, failed axes are missing
+        and are read again by ReadOne/StateOne
+        """
+        requests = []
+        for ind in axes:
+            if self.device_available[ind - 1] != 1:
+                continue
+            names = attrNames(ind)
+            try:
+                requests.append((ind, names, self.proxy[ind - 1].
+                                 read_attributes_asynch(names)))
+            except Exception:
+                pass
+        result = {}
+        for ind, names, req_id in requests:
+            try:
+                attrs = self.proxy[ind - 1].read_attributes_reply(req_id, 0)
+                result[ind] = dict(
+                    (name, attr.value) for name, attr in zip(names, attrs))
+            except Exception:
+                pass
+        return result
+
+    def PreStateAll(self):
+        self.state_axes = []
+        self.state_values = {}
+
+    def PreStateOne(self, ind):
+        self.state_axes.append(ind)
+        return True
+
+    def StateAll(self):
+        self.state_values = self._readAsynch(
+            self.state_axes, self._stateAttrNames)
+
+    def StateOne(self, ind):
         if self.device_available[ind - 1] == 1:
-            sta = self.proxy[ind - 1].command_inout("State")
-            lower = 0
-            upper = 0
-            if self.attrName_CwLimit[ind - 1] is not None:
-                lower = self.proxy[ind - 1].read_attribute(
-                    self.attrName_CwLimit[ind - 1]).value
-            if self.attrName_CcwLimit[ind - 1] is not None:
-                upper = self.proxy[ind - 1].read_attribute(
-                    self.attrName_CcwLimit[ind - 1]).value
-            switchstate = lower * 4 + upper * 2
-            status_string = status_template % (sta, upper, lower)
-            tup = (sta, status_string, switchstate)
-            return tup
+            values = self.state_values.pop(ind, None)
+            if values is None:
+                values = {"State": self.proxy[ind - 1].command_inout("State")}
+                for attrName in self._stateAttrNames(ind)[1:]:
+                    values[attrName] = self.proxy[ind - 1].read_attribute(
+                        attrName).value
+            return self._stateTuple(ind, values)
 
     def PreReadAll(self):
-        pass
+        self.read_axes = []
+        self.read_values = {}
 
     def PreReadOne(self, ind):
-        pass
+        self.read_axes.append(ind)
 
     def ReadAll(self):
-        pass
+        self.read_values = self._readAsynch(
+            self.read_axes, lambda ind: ["Position"])
 
     def ReadOne(self, ind):
         if self.device_available[ind - 1] == 1:
+            values = self.read_values.pop(ind, None)
+            if values is not None:
+                return values["Position"]
             return self.proxy[ind - 1].read_attribute("Position").value
 
     def PreStartAll(self):
@@ -243,8 +308,8 @@ class HasyMotorCtrl(MotorController):
         if self.device_available[ind - 1]:
             if name == "UnitLimitMax":
                 if self.poolmotor_proxy[ind - 1] is None:
-                    self.poolmotor_proxy[ind - 1] = PyTango.DeviceProxy(
-                        self.GetAxisName(ind))
+                    self.poolmotor_proxy[ind - 1] = getProxy(
+                        self.GetAxisName(ind), owner=self)
                 value = float(self.proxy[ind - 1].read_attribute(
                     self.attrName_UnitLimitMax[ind - 1]).value)
                 cfg = []
@@ -256,8 +321,8 @@ class HasyMotorCtrl(MotorController):
 
             elif name == "UnitLimitMin":
                 if self.poolmotor_proxy[ind - 1] is None:
-                    self.poolmotor_proxy[ind - 1] = PyTango.DeviceProxy(
-                        self.GetAxisName(ind))
+                    self.poolmotor_proxy[ind - 1] = getProxy(
+                        self.GetAxisName(ind), owner=self)
                 value = float(self.proxy[ind - 1].read_attribute(
                     self.attrName_UnitLimitMin[ind - 1]).value)
 
@@ -289,8 +354,8 @@ class HasyMotorCtrl(MotorController):
         if self.device_available[ind - 1]:
             if name == "UnitLimitMax":
                 if self.poolmotor_proxy[ind - 1] is None:
-                    self.poolmotor_proxy[ind - 1] = PyTango.DeviceProxy(
-                        self.GetAxisName(ind))
+                    self.poolmotor_proxy[ind - 1] = getProxy(
+                        self.GetAxisName(ind), owner=self)
                 self.proxy[ind - 1].write_attribute(
                     self.attrName_UnitLimitMax[ind - 1], value)
                 if not self.set_for_memorized_max[ind - 1]:
@@ -303,8 +368,8 @@ class HasyMotorCtrl(MotorController):
                 self.set_for_memorized_max[ind - 1] = 0
             elif name == "UnitLimitMin":
                 if self.poolmotor_proxy[ind - 1] is None:
-                    self.poolmotor_proxy[ind - 1] = PyTango.DeviceProxy(
-                        self.GetAxisName(ind))
+                    self.poolmotor_proxy[ind - 1] = getProxy(
+                        self.GetAxisName(ind), owner=self)
                 self.proxy[ind - 1].write_attribute(
                     self.attrName_UnitLimitMin[ind - 1], value)
                 if not self.set_for_memorized_min[ind - 1]:
@@ -406,6 +471,7 @@ class HasyMotorCtrl(MotorController):
     def StartAll(self):
         pass
 
+    @CallStatsLib.statsCommands
     def SendToCtrl(self, in_data):
         return "Nothing sent"
 
@@ -1,6 +1,6 @@
-from PyTango import DevState
+from PyTango import DevState, DevFailed
 from sardana.pool.controller import MotorController
-from sardana.pool import PoolUtil
+from sardana.PoolController.common import ProxyPoolLib
 import time
 from threading import Timer
 
@@ -37,7 +37,10 @@ class OxfordCryostream700Ctrl(MotorController):
         if not proxy:
             devName = self.extra_attributes[axis][TANGO_DEV]
             if devName is not None:
-                proxy = PoolUtil().get_device(self.GetName(), devName)
+                try:
+                    proxy = ProxyPoolLib.getProxy(devName, owner=self)
+                except DevFailed:
+                    proxy = None
                 self.proxy[axis] = proxy
                 if proxy is None and raiseOnConnError:
                     raise Exception(
@@ -5,6 +5,8 @@ import PyTango
 from sardana import State, DataAccess
 from sardana.pool.controller import OneDController
 from sardana.pool.controller import Type, Access, Description
+from sardana.PoolController.common.ProxyPoolLib import getProxy
+from sardana.PoolController.common import CallStatsLib
 # from sardana.pool.controller import Type, Access, Description, DefaultValue
 # from sardana.pool import PoolUtil
 
@@ -54,7 +56,7 @@ class AmptekOneDCtrl(OneDController):
             print("AmptekOneDCtrl: False index %d max %d"
                   % (ind, self.max_device))
             return
-        self.proxy = PyTango.DeviceProxy(self.amptek_device_name)
+        self.proxy = getProxy(self.amptek_device_name, owner=self)
         self.device_available[ind - 1] = True
 
     def DeleteDevice(self, ind):
@@ -120,5 +122,6 @@ class AmptekOneDCtrl(OneDController):
     def SetAxisExtraPar(self, ind, name, value):
         pass
 
+    @CallStatsLib.statsCommands
     def SendToCtrl(self, in_data):
         return "Nothing sent"
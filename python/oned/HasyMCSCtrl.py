@@ -2,10 +2,15 @@
 # import os
 
 import PyTango
+import numpy
 from sardana import DataAccess
 # from sardana import State, DataAccess
 from sardana.pool.controller import OneDController
 from sardana.pool.controller import Type, Access, Description
+from sardana.PoolController.common.DeviceDiscoveryLib import \
+    getDeviceExported
+from sardana.PoolController.common.ProxyPoolLib import getProxy
+from sardana.PoolController.common import CallStatsLib
 # from sardana.pool.controller import Type, Access, Description, DefaultValue
 # from sardana.pool import PoolUtil
 
@@ -37,24 +42,22 @@ class HasyMCSCtrl(OneDController):
     def __init__(self, inst, props, *args, **kwargs):
         self.TangoHost = None
         OneDController.__init__(self, inst, props, *args, **kwargs)
-        if self.TangoHost is None:
-            self.db = PyTango.Database()
-        else:
+        if self.TangoHost is not None:
             self.node = self.TangoHost
             self.port = 10000
             if self.TangoHost.find(':'):
                 lst = self.TangoHost.split(':')
                 self.node = lst[0]
                 self.port = int(lst[1])
-            self.db = PyTango.Database(self.node, self.port)
         name_dev_ask = self.RootDeviceName + "*"
-        self.devices = self.db.get_device_exported(name_dev_ask)
+        self.devices = getDeviceExported(
+            name_dev_ask, tangoHost=self.TangoHost)
         self.max_device = 0
         self.tango_device = []
         self.proxy = []
         self.flagIsMCS = []
         self.device_available = []
-        for name in self.devices.value_string:
+        for name in self.devices:
             self.tango_device.append(name)
             self.proxy.append(None)
             self.flagIsMCS.append(False)
@@ -62,11 +65,11 @@ class HasyMCSCtrl(OneDController):
             self.max_device = self.max_device + 1
         self.started = False
         self.dft_NbChannels = 0
-        self.NbChannels = []
+        self.NbChannels = [self.dft_NbChannels] * self.max_device
         self.dft_NbAcquisitions = 0
-        self.NbAcquisitions = []
+        self.NbAcquisitions = [self.dft_NbAcquisitions] * self.max_device
         self.dft_Preset = 0
-        self.Preset = []
+        self.Preset = [self.dft_Preset] * self.max_device
 
     def AddDevice(self, ind):
         OneDController.AddDevice(self, ind)
@@ -78,11 +81,25 @@ class HasyMCSCtrl(OneDController):
         else:
             proxy_name = str(self.node) + (":%s/" % self.port) + \
                 str(self.tango_device[ind - 1])
-        self.proxy[ind - 1] = PyTango.DeviceProxy(proxy_name)
+        self.proxy[ind - 1] = getProxy(proxy_name, owner=self)
         self.device_available[ind - 1] = True
-        self.NbChannels.append(self.dft_NbChannels)
-        self.NbAcquisitions.append(self.dft_NbAcquisitions)
-        self.Preset.append(self.dft_Preset)
+        self.NbChannels[ind - 1] = self.dft_NbChannels
+        self.NbAcquisitions[ind - 1] = self.dft_NbAcquisitions
+        self.Preset[ind - 1] = self.dft_Preset
+        try:
+            self._readDimensions(ind)
+        except PyTango.DevFailed:
+            # ReadOne returns the unsliced array until LoadOne
+            pass
+
+    def _readDimensions(self, ind):
+        '''
+        caches the array dimensions for ReadOne
+        '''
+        attrs = self.proxy[ind - 1].read_attributes(
+            ["NbAcquisitions", "NbChannels"])
+        self.NbAcquisitions[ind - 1] = int(attrs[0].value)
+        self.NbChannels[ind - 1] = int(attrs[1].value)
 
     def DeleteDevice(self, ind):
         OneDController.DeleteDevice(self, ind)
@@ -108,6 +125,8 @@ class HasyMCSCtrl(OneDController):
         else:
             self.integ_time = None
             self.monitor_count = -value
+        if self.device_available[axis - 1]:
+            self._readDimensions(axis)
 
     def PreReadAll(self):
         pass
@@ -119,11 +138,16 @@ class HasyMCSCtrl(OneDController):
         pass
 
     def ReadOne(self, ind):
-        data = []
-        for i in range(0, self.proxy[ind - 1].NbAcquisitions):
-            for j in range(0, self.proxy[ind - 1].NbChannels):
-                data.append(self.proxy[ind - 1].CountsArray[i][j])
-        return data
+        counts = numpy.asarray(
+            self.proxy[ind - 1].read_attribute("CountsArray").value)
+        nb_acq = self.NbAcquisitions[ind - 1]
+        nb_ch = self.NbChannels[ind - 1]
+        # the dimensions are unknown (0) if they could not be read
+        if counts.ndim == 2 and nb_acq > 0 and nb_ch > 0 and \
+           counts.shape != (nb_acq, nb_ch):
+            counts = counts[:nb_acq, :nb_ch]
+        # ravel() copies only if the array is not contiguous
+        return counts.ravel()
 
     def PreStartAll(self):
         pass
@@ -140,12 +164,16 @@ class HasyMCSCtrl(OneDController):
     def GetAxisExtraPar(self, ind, name):
         if name == "NbChannels":
             if self.device_available[ind - 1]:
-                return int(self.proxy[ind - 1].read_attribute(
+                value = int(self.proxy[ind - 1].read_attribute(
                     "NbChannels").value)
+                self.NbChannels[ind - 1] = value
+                return value
         elif name == "NbAcquisitions":
             if self.device_available[ind - 1]:
-                return int(self.proxy[ind - 1].read_attribute(
+                value = int(self.proxy[ind - 1].read_attribute(
                     "NbAcquisitions").value)
+                self.NbAcquisitions[ind - 1] = value
+                return value
         elif name == "Preset":
             if self.device_available[ind - 1]:
                 return int(self.proxy[ind - 1].read_attribute(
@@ -156,17 +184,20 @@ class HasyMCSCtrl(OneDController):
                     "/" + self.proxy[ind - 1].name()
                 return tango_device
 
-    def SetAxisExtraar(self, ind, name, value):
+    def SetAxisExtraPar(self, ind, name, value):
         if name == "NbChannels":
             if self.device_available[ind - 1]:
                 self.proxy[ind - 1].write_attribute("NbChannels", value)
+                self.NbChannels[ind - 1] = int(value)
         if name == "NbAcquisitions":
             if self.device_available[ind - 1]:
                 self.proxy[ind - 1].write_attribute("NbAcquisitions", value)
+                self.NbAcquisitions[ind - 1] = int(value)
         if name == "Preset":
             if self.device_available[ind - 1]:
                 self.proxy[ind - 1].write_attribute("Preset", value)
 
+    @CallStatsLib.statsCommands
     def SendToCtrl(self, in_data):
         return "Nothing sent"
 
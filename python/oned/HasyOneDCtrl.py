@@ -1,4 +1,3 @@
-import time
 # import time, os
 
 import PyTango
@@ -6,7 +5,16 @@ from sardana import DataAccess
 # from sardana import State, DataAccess
 from sardana.pool.controller import OneDController
 # from sardana.pool.controller import Type, Access, Description, DefaultValue
-from sardana.pool.controller import Type, Access, Description
+from sardana.pool.controller import Type, Access, Description, DefaultValue
+from sardana.PoolController.common.DeviceDiscoveryLib import \
+    getDeviceExported
+from sardana.PoolController.common.ProxyPoolLib import getProxy
+from sardana.PoolController.common.CapabilityProbeLib import \
+    probeDevice, invalidateCapabilities
+from sardana.PoolController.common.AcqTimerLib import AcqTimer
+from sardana.PoolController.common import CallStatsLib
+from sardana.PoolController.common.RoIEngineLib import RoITable
+from sardana.PoolController.common import SpectrumExchangeLib
 # from sardana.pool import PoolUtil
 
 ReadOnly = DataAccess.ReadOnly
@@ -31,6 +39,9 @@ class HasyOneDCtrl(OneDController):
         'RoI4Start': {Type: 'PyTango.DevLong', Access: ReadWrite},
         'RoI4End': {Type: 'PyTango.DevLong', Access: ReadWrite},
         'CountsRoI4': {Type: 'PyTango.DevDouble', Access: ReadOnly},
+        # any number of RoIs: [start1, end1, start2, end2, ...]
+        'RoIs': {Type: (int,), Access: ReadWrite},
+        'CountsRoIs': {Type: (float,), Access: ReadOnly},
     }
 
     ctrl_properties = {
@@ -40,16 +51,39 @@ class HasyOneDCtrl(OneDController):
         'TangoHost': {
             Type: str,
             Description: 'The tango host where searching the devices'},
+        'SettleMargin': {
+            Type: float,
+            Description: 'seconds after the acquisition time before '
+            'the acquisition is stopped',
+            DefaultValue: 0.2},
     }
 
     MaxDevice = 97
+    #
+    # the RoIs a channel starts with, RoI1 - RoI4
+    #
+    NbRoIsDefault = 4
+
+    #
+    # dispatch tables by hardware flavour, see CapabilityProbeLib,
+    # flavours which are not listed use the 'Generic' entry
+    #
+    dataAttrNames = {
+        "XIA": "Spectrum", "Avantes": "spectrum", "Generic": "Data"}
+    stopCmds = {
+        "Kromo": [], "Avantes": [], "XIA": ["Stop"],
+        "Generic": ["Stop", "Read"]}
+    startCmds = {
+        "Kromo": ["StartAcquisition"], "Avantes": [],
+        "Generic": ["Stop", "Clear", "Start"]}
+    abortCmds = {
+        "Kromo": ["StopAcquisition"], "Avantes": [], "XIA": ["Stop"],
+        "Generic": ["Stop", "Read"]}
 
     def __init__(self, inst, props, *args, **kwargs):
         self.TangoHost = None
         OneDController.__init__(self, inst, props, *args, **kwargs)
-        if self.TangoHost is None:
-            self.db = PyTango.Database()
-        else:
+        if self.TangoHost is not None:
             #
             # TangoHost can be hasgksspp07eh3:10000
             #
@@ -59,55 +93,37 @@ class HasyOneDCtrl(OneDController):
                 lst = self.TangoHost.split(':')
                 self.node = lst[0]
                 self.port = int(lst[1])
-            self.db = PyTango.Database(self.node, self.port)
         name_dev_ask = self.RootDeviceName + "*"
-        self.devices = self.db.get_device_exported(name_dev_ask)
+        self.devices = getDeviceExported(
+            name_dev_ask, tangoHost=self.TangoHost)
         self.max_device = 0
         self.tango_device = []
         self.proxy = []
+        self.proxy_name = []
         self.flagIsMCA8715 = []
         self.flagIsXIA = []
         self.flagIsSIS3302 = []
         self.flagIsKromo = []
         self.flagIsAvantes = []
+        self.flavour = []
         self.device_available = []
-        self.RoI1_start = []
-        self.RoI1_end = []
-        self.Counts_RoI1 = []
-        self.RoI2_start = []
-        self.RoI2_end = []
-        self.Counts_RoI2 = []
-        self.RoI3_start = []
-        self.RoI3_end = []
-        self.Counts_RoI3 = []
-        self.RoI4_start = []
-        self.RoI4_end = []
-        self.Counts_RoI4 = []
-        for name in self.devices.value_string:
+        self.roi_table = []
+        for name in self.devices:
             self.tango_device.append(name)
             self.proxy.append(None)
+            self.proxy_name.append(None)
             self.flagIsMCA8715.append(False)
             self.flagIsXIA.append(False)
             self.flagIsSIS3302.append(False)
             self.flagIsKromo.append(False)
             self.flagIsAvantes.append(False)
+            self.flavour.append("Generic")
             self.device_available.append(False)
-            self.RoI1_start.append(0)
-            self.RoI1_end.append(0)
-            self.Counts_RoI1.append(0)
-            self.RoI2_start.append(0)
-            self.RoI2_end.append(0)
-            self.Counts_RoI2.append(0)
-            self.RoI3_start.append(0)
-            self.RoI3_end.append(0)
-            self.Counts_RoI3.append(0)
-            self.RoI4_start.append(0)
-            self.RoI4_end.append(0)
-            self.Counts_RoI4.append(0)
+            self.roi_table.append(RoITable(HasyOneDCtrl.NbRoIsDefault))
             self.max_device = self.max_device + 1
         self.started = False
-        self.acqTime = 0
-        self.acqStartTime = None
+        self.timer = AcqTimer(margin=self.SettleMargin)
+        self.timer.load(0)
         self.debugFlag = 0
 
     def AddDevice(self, ind):
@@ -120,23 +136,29 @@ class HasyOneDCtrl(OneDController):
         else:
             proxy_name = str(self.node) + (":%s/" % self.port) + \
                 str(self.tango_device[ind - 1])
-        self.proxy[ind - 1] = PyTango.DeviceProxy(proxy_name)
+        self.proxy[ind - 1] = getProxy(proxy_name, owner=self)
         self.device_available[ind - 1] = True
-        if hasattr(self.proxy[ind - 1], 'BankId'):
-            self.flagIsMCA8715[ind - 1] = True
-        if hasattr(self.proxy[ind - 1], 'Spectrum') and \
-           hasattr(self.proxy[ind - 1], 'McaLength'):
-            self.flagIsXIA[ind - 1] = True
-        if hasattr(self.proxy[ind - 1], 'ADCxInputInvert'):
-            print("ADCxInputInvert")
-        if hasattr(self.proxy[ind - 1], 'TriggerPeakingTime'):
-            print('TriggerPeakingTime')
-        if hasattr(self.proxy[ind - 1], 'ADCxInputInvert'):
-            self.flagIsSIS3302[ind - 1] = True
-        if hasattr(self.proxy[ind - 1], 'HighSpeedMode'):
-            self.flagIsKromo[ind - 1] = True
-        if hasattr(self.proxy[ind - 1], 'intTime'):
-            self.flagIsAvantes[ind - 1] = True
+        self.proxy_name[ind - 1] = proxy_name
+        self._probe(ind)
+
+    def _probe(self, ind):
+        caps = probeDevice(self.proxy[ind - 1], self.proxy_name[ind - 1])
+        self.flagIsMCA8715[ind - 1] = caps["isMCA8715"]
+        self.flagIsXIA[ind - 1] = caps["isXIA"]
+        self.flagIsSIS3302[ind - 1] = caps["isSIS3302"]
+        self.flagIsKromo[ind - 1] = caps["isKromo"]
+        self.flagIsAvantes[ind - 1] = caps["isAvantes"]
+        self.flavour[ind - 1] = caps["flavour"]
+        if self.debugFlag:
+            print("HasyOneDCtrl.AddDevice %s is %s" %
+                  (self.proxy_name[ind - 1], caps["flavour"]))
+
+    def _dispatch(self, table, ind):
+        return table.get(self.flavour[ind - 1], table["Generic"])
+
+    def _sendCmds(self, table, ind):
+        for cmd in self._dispatch(table, ind):
+            self.proxy[ind - 1].command_inout(cmd)
 
     def DeleteDevice(self, ind):
         if self.debugFlag:
@@ -148,21 +170,20 @@ class HasyOneDCtrl(OneDController):
 
     def StateOne(self, ind):
         if self.device_available[ind - 1] == 1:
-            if self.acqStartTime is not None:  # acquisition was started
-                now = time.time()
-                elapsedTime = now - self.acqStartTime - 0.2
+            if self.timer.isStarted():  # acquisition was started
                 # acquisition has probably not finished yet
-                if elapsedTime < self.acqTime:
+                if not self.timer.mayBeDone():
                     self.sta = PyTango.DevState.MOVING
-                    self.status = "Acqusition time has not elapsed yet."
+                    self.status = "Acqusition time has not elapsed yet, " \
+                        "%.3fs left." % self.timer.wakeupHint()
                 else:
-                    if self.flagIsKromo[ind - 1] is False and \
-                       self.flagIsAvantes[ind - 1] is False:
-                        self.proxy[ind - 1].command_inout("Stop")
-                        if self.flagIsXIA[ind - 1] == 0:
-                            self.proxy[ind - 1].command_inout("Read")
+                    # a RoI controller may have stopped the MCA already
+                    name = self.tango_device[ind - 1]
+                    if not SpectrumExchangeLib.isStopped(name):
+                        self._sendCmds(HasyOneDCtrl.stopCmds, ind)
+                        SpectrumExchangeLib.acquisitionStopped(name)
                     self.started = False
-                    self.acqStartTime = None
+                    self.timer.stop()
                     self.sta = PyTango.DevState.ON
                     self.status = "Device is ON"
             else:
@@ -186,7 +207,7 @@ class HasyOneDCtrl(OneDController):
         else:
             self.integ_time = None
             self.monitor_count = -value
-        self.acqTime = value
+        self.timer.load(value)
 
     def PreReadAll(self):
         pass
@@ -201,20 +222,13 @@ class HasyOneDCtrl(OneDController):
             print("HasyOneDCtrl.ReadAll %s" % self.inst_name)
 
     def ReadOne(self, ind):
-        if self.flagIsXIA[ind - 1]:
-            data = self.proxy[ind - 1].Spectrum
-        elif self.flagIsAvantes[ind - 1]:
-            data = self.proxy[ind - 1].spectrum
-        else:
-            data = self.proxy[ind - 1].Data
-        self.Counts_RoI1[ind - 1] = data[
-            self.RoI1_start[ind - 1]:self.RoI1_end[ind - 1]].sum()
-        self.Counts_RoI2[ind - 1] = data[
-            self.RoI2_start[ind - 1]:self.RoI2_end[ind - 1]].sum()
-        self.Counts_RoI3[ind - 1] = data[
-            self.RoI3_start[ind - 1]:self.RoI3_end[ind - 1]].sum()
-        self.Counts_RoI4[ind - 1] = data[
-            self.RoI4_start[ind - 1]:self.RoI4_end[ind - 1]].sum()
+        name = self.tango_device[ind - 1]
+        data = SpectrumExchangeLib.lookup(name)
+        if data is None:
+            data = SpectrumExchangeLib.publish(
+                name, self.proxy[ind - 1].read_attribute(
+                    self._dispatch(HasyOneDCtrl.dataAttrNames, ind)).value)
+        self.roi_table[ind - 1].update(data)
         return data
 
     def PreStartAll(self):
@@ -226,30 +240,18 @@ class HasyOneDCtrl(OneDController):
     def StartOne(self, ind, value):
         if self.flagIsMCA8715[ind - 1]:
             self.proxy[ind - 1].BankId = 0
+        # a new point, even if the MCA is not started here
+        SpectrumExchangeLib.acquisitionStarted(self.tango_device[ind - 1])
         # the state may be ON but one bank can be active
         sta = self.proxy[ind - 1].command_inout("State")
         if sta == PyTango.DevState.ON:
-            if self.flagIsKromo[ind - 1] is False and \
-               self.flagIsAvantes[ind - 1] is False:
-                self.proxy[ind - 1].command_inout("Stop")
-                self.proxy[ind - 1].command_inout("Clear")
-                self.proxy[ind - 1].command_inout("Start")
-            elif self.flagIsAvantes[ind - 1] is True:
-                pass
-                # self.proxy[ind - 1].command_inout("startMeasure")
-            else:
-                self.proxy[ind - 1].command_inout("StartAcquisition")
+            # Avantes: no command, was startMeasure
+            self._sendCmds(HasyOneDCtrl.startCmds, ind)
             self.started = True
-            self.acqStartTime = time.time()
+            self.timer.start()
 
     def AbortOne(self, ind):
-        if self.flagIsKromo[ind - 1] is False and \
-           self.flagIsAvantes[ind - 1] is False:
-            self.proxy[ind - 1].command_inout("Stop")
-            if self.flagIsXIA[ind - 1] == 0:
-                self.proxy[ind - 1].command_inout("Read")
-        elif self.flagIsAvantes[ind - 1] is False:
-            self.proxy[ind - 1].command_inout("StopAcquisition")
+        self._sendCmds(HasyOneDCtrl.abortCmds, ind)
 
     def GetAxisExtraPar(self, ind, name):
         if name == "TangoDevice":
@@ -272,30 +274,8 @@ class HasyOneDCtrl(OneDController):
                 else:
                     datalength = 255
                 return datalength
-        elif name == "RoI1Start":
-            return self.RoI1_start[ind - 1]
-        elif name == "RoI1End":
-            return self.RoI1_end[ind - 1]
-        elif name == "CountsRoI1":
-            return self.Counts_RoI1[ind - 1]
-        elif name == "RoI2Start":
-            return self.RoI2_start[ind - 1]
-        elif name == "RoI2End":
-            return self.RoI2_end[ind - 1]
-        elif name == "CountsRoI2":
-            return self.Counts_RoI2[ind - 1]
-        elif name == "RoI3Start":
-            return self.RoI3_start[ind - 1]
-        elif name == "RoI3End":
-            return self.RoI3_end[ind - 1]
-        elif name == "CountsRoI3":
-            return self.Counts_RoI3[ind - 1]
-        elif name == "RoI4Start":
-            return self.RoI4_start[ind - 1]
-        elif name == "RoI4End":
-            return self.RoI4_end[ind - 1]
-        elif name == "CountsRoI4":
-            return self.Counts_RoI4[ind - 1]
+        elif self.roi_table[ind - 1].isPar(name):
+            return self.roi_table[ind - 1].getPar(name)
 
     def SetAxisExtraPar(self, ind, name, value):
         if self.device_available[ind - 1]:
@@ -307,25 +287,18 @@ class HasyOneDCtrl(OneDController):
                     elif self.flagIsKromo[ind - 1] is True:
                         self.proxy[ind - 1].write_attribute(
                             "DataLength", value)
-            elif name == "RoI1Start":
-                self.RoI1_start[ind - 1] = value
-            elif name == "RoI1End":
-                self.RoI1_end[ind - 1] = value
-            elif name == "RoI2Start":
-                self.RoI2_start[ind - 1] = value
-            elif name == "RoI2End":
-                self.RoI2_end[ind - 1] = value
-            elif name == "RoI3Start":
-                self.RoI3_start[ind - 1] = value
-            elif name == "RoI3End":
-                self.RoI3_end[ind - 1] = value
-            elif name == "RoI4Start":
-                self.RoI4_start[ind - 1] = value
-            elif name == "RoI4End":
-                self.RoI4_end[ind - 1] = value
+            elif self.roi_table[ind - 1].isPar(name):
+                self.roi_table[ind - 1].setPar(name, value)
 
+    @CallStatsLib.statsCommands
     def SendToCtrl(self, in_data):
         #        if self.debugFlag: print "Received value =", in_data
+        if in_data.strip().lower() == "capabilities reset":
+            for ind in range(1, self.max_device + 1):
+                if self.device_available[ind - 1]:
+                    invalidateCapabilities(self.proxy_name[ind - 1])
+                    self._probe(ind)
+            return "capabilities reset"
         return "Nothing sent"
 
     def __del__(self):
@@ -1,4 +1,4 @@
-import PyTango
+import numpy
 from sardana.pool.controller import OneDController
 # import time, os
 
@@ -7,6 +7,9 @@ from sardana import DataAccess
 # from sardana.pool.controller import MotorController
 # from sardana.pool.controller import Type, Access, Description, DefaultValue
 from sardana.pool.controller import Type, Access, Description
+from sardana.PoolController.common.ProxyPoolLib import getProxy, \
+    commandInoutAll
+from sardana.PoolController.common import CallStatsLib
 # from sardana.pool import PoolUtil
 
 ReadOnly = DataAccess.ReadOnly
@@ -33,8 +36,15 @@ class LimaRoi2SpectrumCtrl(OneDController):
 
     def __init__(self, inst, props, *args, **kwargs):
         OneDController.__init__(self, inst, props, *args, **kwargs)
-        self.proxy = PyTango.DeviceProxy(self.Roi2SpectrumDeviceName)
+        self.proxy = getProxy(self.Roi2SpectrumDeviceName, owner=self)
         self.started = False
+        #
+        # the axes of the current read, their spectra and the
+        # spectrum lengths of the RoIs, read once per acquisition
+        #
+        self.read_axes = []
+        self.spectra = {}
+        self.datalength = None
 
     def AddDevice(self, ind):
         OneDController.AddDevice(self, ind)
@@ -52,35 +62,70 @@ class LimaRoi2SpectrumCtrl(OneDController):
     def LoadOne(self, axis, value, repetitions, latency_time):
         pass
 
+    def _dataLengths(self):
+        '''
+        the spectrum lengths of all RoIs, -1 for unknown modes
+        '''
+        rois_names = self.proxy.getNames()
+        roi_modes = self.proxy.getRoiModes(rois_names)
+        # getRois: roi id, x, y, width, height for each RoI
+        roi_values = self.proxy.getRois(rois_names)
+        datalength = []
+        for i, roi_mode in enumerate(roi_modes):
+            if roi_mode == "LINES_SUM":
+                datalength.append(roi_values[5 * i + 3])
+            elif roi_mode == "COLUMN_SUM":
+                datalength.append(roi_values[5 * i + 4])
+            else:
+                datalength.append(-1)
+        return datalength
+
+    def PreReadAll(self):
+        self.read_axes = []
+        self.spectra = {}
+
+    def PreReadOne(self, ind):
+        self.read_axes.append(ind)
+
     def ReadAll(self):
-        pass
+        if not self.read_axes:
+            return
+        frame_id = self.proxy.CounterStatus
+        # the RoIs are read concurrently, readImage takes one RoI
+        raw_spectra = commandInoutAll([
+            (self.proxy, "readImage", [ind - 1, frame_id])
+            for ind in self.read_axes])
+        for ind, raw_spectrum in zip(self.read_axes, raw_spectra):
+            self.spectra[ind] = self._lastSpectrum(
+                ind, frame_id, raw_spectrum)
+
+    def _lastSpectrum(self, ind, frame_id, raw_spectrum):
+        '''
+        the spectrum of the last frame, a view of raw_spectrum
+        '''
+        raw_spectrum = numpy.asarray(raw_spectrum)
+        if frame_id == 0:
+            # frame_id should be always 0 because we take only one image
+            return raw_spectrum
+        # more than one spectrum is read
+        if self.datalength is None:
+            self.datalength = self._dataLengths()
+        datalength = self.datalength[ind - 1]
+        if datalength < 0:
+            return raw_spectrum
+        return raw_spectrum[max(len(raw_spectrum) - datalength, 0):]
 
     def ReadOne(self, ind):
-        im = []
-        im.append(ind - 1)
+        if ind in self.spectra:
+            return self.spectra.pop(ind)
         frame_id = self.proxy.CounterStatus
-        # frame_id should be always 0 because we take only one image
-        im.append(frame_id)
-        raw_spectrum = self.proxy.command_inout("readImage", im)
-        if frame_id != 0:  # more than one spectrum is read
-            rois_names = self.proxy.getNames()
-            cmd = []
-            cmd.append(rois_names[ind - 1])
-            roi_mode = self.proxy.getRoiModes(cmd)
-            roi_values = self.proxy.getRois(cmd)
-            if roi_mode[0] == "LINES_SUM":
-                datalength = roi_values[3]
-            elif roi_mode[0] == "COLUMN_SUM":
-                datalength = roi_values[4]
-            data = []
-            for i in range(len(raw_spectrum) - datalength, len(raw_spectrum)):
-                data.append(raw_spectrum[i])
-        else:
-            data = raw_spectrum
-        return data
+        raw_spectrum = self.proxy.command_inout(
+            "readImage", [ind - 1, frame_id])
+        return self._lastSpectrum(ind, frame_id, raw_spectrum)
 
     def PreStartAll(self):
-        pass
+        # the RoIs may have been changed between acquisitions
+        self.datalength = None
 
     def PreStartOne(self, ind, value):
         return True
@@ -93,22 +138,12 @@ class LimaRoi2SpectrumCtrl(OneDController):
 
     def GetAxisExtraPar(self, ind, name):
         if name == "DataLength":
-            rois_names = self.proxy.getNames()
-            cmd = []
-            cmd.append(rois_names[ind - 1])
-            roi_mode = self.proxy.getRoiModes(cmd)
-            roi_values = self.proxy.getRois(cmd)
-            if roi_mode[0] == "LINES_SUM":
-                datalength = roi_values[3]
-            elif roi_mode[0] == "COLUMN_SUM":
-                datalength = roi_values[4]
-            else:
-                datalength = -1
-            return datalength
+            return self._dataLengths()[ind - 1]
 
     def SetAxisExtraPar(self, ind, name, value):
         pass
 
+    @CallStatsLib.statsCommands
     def SendToCtrl(self, in_data):
         return "Nothing sent"
 
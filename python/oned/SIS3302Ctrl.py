@@ -5,6 +5,8 @@ import PyTango
 from sardana import State, DataAccess
 from sardana.pool.controller import OneDController
 from sardana.pool.controller import Type, Access, Description
+from sardana.PoolController.common.ProxyPoolLib import getProxy
+from sardana.PoolController.common import CallStatsLib
 # from sardana.pool.controller import Type, Access, Description, DefaultValue
 # from sardana.pool import PoolUtil
 
@@ -47,7 +49,7 @@ class SIS3302Ctrl(OneDController):
         if self.TangoHost is not None:
             self.proxy_name = str(self.node) + (":%s/" % self.port) + \
                 str(self.proxy_name)
-        self.proxy = PyTango.DeviceProxy(self.proxy_name)
+        self.proxy = getProxy(self.proxy_name, owner=self)
         self.started = False
         self.acqTime = 0
         self.acqStartTime = None
@@ -158,6 +160,7 @@ class SIS3302Ctrl(OneDController):
         elif name == "FlagReadSpectrum":
             self.flagreadspectrum = value
 
+    @CallStatsLib.statsCommands
     def SendToCtrl(self, in_data):
         # print "Received value =", in_data
         return "Nothing sent"
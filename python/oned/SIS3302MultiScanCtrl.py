@@ -6,6 +6,8 @@ from sardana import DataAccess
 # from sardana import State, DataAccess
 from sardana.pool.controller import OneDController
 from sardana.pool.controller import Type, Access, Description
+from sardana.PoolController.common.ProxyPoolLib import getProxy
+from sardana.PoolController.common import CallStatsLib
 # from sardana.pool.controller import Type, Access, Description, DefaultValue
 # from sardana.pool import PoolUtil
 
@@ -49,7 +51,7 @@ class SIS3302MultiScanCtrl(OneDController):
         if self.TangoHost is not None:
             self.proxy_name = str(self.node) + (":%s/" % self.port) + \
                 str(self.proxy_name)
-        self.proxy = PyTango.DeviceProxy(self.proxy_name)
+        self.proxy = getProxy(self.proxy_name, owner=self)
         self.started = False
 
     def AddDevice(self, ind):
@@ -138,6 +140,7 @@ class SIS3302MultiScanCtrl(OneDController):
             if ind == 1:
                 self.proxy.write_attribute("DataLength", value)
 
+    @CallStatsLib.statsCommands
     def SendToCtrl(self, in_data):
         return "Nothing sent"
 
@@ -7,6 +7,11 @@ from sardana import DataAccess
 from sardana.pool.controller import OneDController
 # from sardana.pool.controller import Type, Access, Description, DefaultValue
 from sardana.pool.controller import Type, Access, Description
+from sardana.PoolController.common.DeviceDiscoveryLib import \
+    getDeviceExported
+from sardana.PoolController.common.ProxyPoolLib import getProxy
+from sardana.PoolController.common import CallStatsLib
+from sardana.PoolController.common.RoIEngineLib import RoITable
 # from sardana.pool import PoolUtil
 
 ReadOnly = DataAccess.ReadOnly
@@ -31,6 +36,12 @@ class SPADQOneDCtrl(OneDController):
         'RoI4Start': {Type: 'PyTango.DevLong', Access: ReadWrite},
         'RoI4End': {Type: 'PyTango.DevLong', Access: ReadWrite},
         'CountsRoI4': {Type: 'PyTango.DevDouble', Access: ReadOnly},
+        #
+        # any number of RoIs: [start1, end1, start2, end2, ...],
+        # RoI<n>Start/End/CountsRoI<n> refer to the same RoIs
+        #
+        'RoIs': {Type: (int,), Access: ReadWrite},
+        'CountsRoIs': {Type: (float,), Access: ReadOnly},
     }
 
     ctrl_properties = {
@@ -44,12 +55,13 @@ class SPADQOneDCtrl(OneDController):
 
     MaxDevice = 97
 
+    # RoIs an axis has before RoIs is written
+    NbRoIsDefault = 4
+
     def __init__(self, inst, props, *args, **kwargs):
         self.TangoHost = None
         OneDController.__init__(self, inst, props, *args, **kwargs)
-        if self.TangoHost is None:
-            self.db = PyTango.Database()
-        else:
+        if self.TangoHost is not None:
             #
             # TangoHost can be hasgksspp07eh3:10000
             #
@@ -59,42 +71,20 @@ class SPADQOneDCtrl(OneDController):
                 lst = self.TangoHost.split(':')
                 self.node = lst[0]
                 self.port = int(lst[1])
-            self.db = PyTango.Database(self.node, self.port)
         name_dev_ask = self.RootDeviceName + "*"
-        self.devices = self.db.get_device_exported(name_dev_ask)
+        self.devices = getDeviceExported(
+            name_dev_ask, tangoHost=self.TangoHost)
         self.max_device = 0
         self.tango_device = []
         self.proxy = []
         self.device_available = []
-        self.RoI1_start = []
-        self.RoI1_end = []
-        self.Counts_RoI1 = []
-        self.RoI2_start = []
-        self.RoI2_end = []
-        self.Counts_RoI2 = []
-        self.RoI3_start = []
-        self.RoI3_end = []
-        self.Counts_RoI3 = []
-        self.RoI4_start = []
-        self.RoI4_end = []
-        self.Counts_RoI4 = []
+        self.roi_table = []
         self.SpectrumName = []
-        for name in self.devices.value_string:
+        for name in self.devices:
             self.tango_device.append(name)
             self.proxy.append(None)
             self.device_available.append(False)
-            self.RoI1_start.append(0)
-            self.RoI1_end.append(0)
-            self.Counts_RoI1.append(0)
-            self.RoI2_start.append(0)
-            self.RoI2_end.append(0)
-            self.Counts_RoI2.append(0)
-            self.RoI3_start.append(0)
-            self.RoI3_end.append(0)
-            self.Counts_RoI3.append(0)
-            self.RoI4_start.append(0)
-            self.RoI4_end.append(0)
-            self.Counts_RoI4.append(0)
+            self.roi_table.append(RoITable(self.NbRoIsDefault))
             self.SpectrumName.append("")
             self.max_device = self.max_device + 1
         self.started = False
@@ -111,7 +101,7 @@ class SPADQOneDCtrl(OneDController):
         else:
             proxy_name = str(self.node) + (":%s/" % self.port) + \
                 str(self.tango_device[ind - 1])
-        self.proxy[ind - 1] = PyTango.DeviceProxy(proxy_name)
+        self.proxy[ind - 1] = getProxy(proxy_name, owner=self)
         self.device_available[ind - 1] = True
 
     def DeleteDevice(self, ind):
@@ -151,14 +141,7 @@ class SPADQOneDCtrl(OneDController):
     def ReadOne(self, ind):
         data = self.proxy[ind - 1].read_attribute(
             self.SpectrumName[ind - 1]).value
-        self.Counts_RoI1[ind - 1] = data[
-            self.RoI1_start[ind - 1]:self.RoI1_end[ind - 1]].sum()
-        self.Counts_RoI2[ind - 1] = data[
-            self.RoI2_start[ind - 1]:self.RoI2_end[ind - 1]].sum()
-        self.Counts_RoI3[ind - 1] = data[
-            self.RoI3_start[ind - 1]:self.RoI3_end[ind - 1]].sum()
-        self.Counts_RoI4[ind - 1] = data[
-            self.RoI4_start[ind - 1]:self.RoI4_end[ind - 1]].sum()
+        self.roi_table[ind - 1].update(data)
         return data
 
     def PreStartAll(self):
@@ -183,53 +166,17 @@ class SPADQOneDCtrl(OneDController):
                 tango_device = self.node + ":" + str(self.port) + \
                     "/" + self.proxy[ind - 1].name()
                 return tango_device
-        elif name == "RoI1Start":
-            return self.RoI1_start[ind - 1]
-        elif name == "RoI1End":
-            return self.RoI1_end[ind - 1]
-        elif name == "CountsRoI1":
-            return self.Counts_RoI1[ind - 1]
-        elif name == "RoI2Start":
-            return self.RoI2_start[ind - 1]
-        elif name == "RoI2End":
-            return self.RoI2_end[ind - 1]
-        elif name == "CountsRoI2":
-            return self.Counts_RoI2[ind - 1]
-        elif name == "RoI3Start":
-            return self.RoI3_start[ind - 1]
-        elif name == "RoI3End":
-            return self.RoI3_end[ind - 1]
-        elif name == "CountsRoI3":
-            return self.Counts_RoI3[ind - 1]
-        elif name == "RoI4Start":
-            return self.RoI4_start[ind - 1]
-        elif name == "RoI4End":
-            return self.RoI4_end[ind - 1]
-        elif name == "CountsRoI4":
-            return self.Counts_RoI4[ind - 1]
         elif name == "SpectrumName":
             return self.SpectrumName[ind - 1]
+        elif self.roi_table[ind - 1].isPar(name):
+            return self.roi_table[ind - 1].getPar(name)
 
     def SetAxisExtraPar(self, ind, name, value):
         if self.device_available[ind - 1]:
-            if name == "RoI1Start":
-                self.RoI1_start[ind - 1] = value
-            elif name == "RoI1End":
-                self.RoI1_end[ind - 1] = value
-            elif name == "RoI2Start":
-                self.RoI2_start[ind - 1] = value
-            elif name == "RoI2End":
-                self.RoI2_end[ind - 1] = value
-            elif name == "RoI3Start":
-                self.RoI3_start[ind - 1] = value
-            elif name == "RoI3End":
-                self.RoI3_end[ind - 1] = value
-            elif name == "RoI4Start":
-                self.RoI4_start[ind - 1] = value
-            elif name == "RoI4End":
-                self.RoI4_end[ind - 1] = value
-            elif name == "SpectrumName":
+            if name == "SpectrumName":
                 self.SpectrumName[ind - 1] = value
+            elif self.roi_table[ind - 1].isPar(name):
+                self.roi_table[ind - 1].setPar(name, value)
 
     def GetAxisPar(self, ind, par):
         if par == "shape":
@@ -237,6 +184,7 @@ class SPADQOneDCtrl(OneDController):
                 "samples_per_record").value
             return [value]
 
+    @CallStatsLib.statsCommands
     def SendToCtrl(self, in_data):
         return "Nothing sent"
 
@@ -2,7 +2,10 @@
 
 # from sardana import pool
 # from sardana.pool import PoolUtil
+import numpy
+
 from sardana.pool.controller import PseudoCounterController
+from sardana.PoolController.common.RoIEngineLib import RoIEngine
 
 # from math import *
 
@@ -18,7 +21,8 @@ from sardana.pool.controller import PseudoCounterController
 # in their counter roles.
 class MCA2SCACtrl(PseudoCounterController):
     """ A counter controller which receives an MCA Spectrum
-        and return a single value"""
+        and return a single value, MCA2SCA4Ctrl, MCA2SCA8Ctrl and
+        MCA2SCA16Ctrl return several, each sca role has its RoI"""
 
     # NO COUNTERS NEEDED
     counter_roles = 'mca',
@@ -44,19 +48,48 @@ class MCA2SCACtrl(PseudoCounterController):
 
         PseudoCounterController.__init__(self, inst, props, *args, **kwargs)
 
-        self.counterExtraAttributes = {}
-        self.counterExtraAttributes[1] = {"RoI1": 0,
-                                          "RoI2": 0}
+        # RoI1, RoI2 of each sca role, [RoI1, RoI2)
+        nb = len(self.pseudo_counter_roles)
+        self.roi_start = numpy.zeros(nb, dtype=numpy.intp)
+        self.roi_end = numpy.zeros(nb, dtype=numpy.intp)
+        # the prefix sums of the spectrum are shared by the sca roles
+        self.engine = RoIEngine()
 
     def GetAxisExtraPar(self, index, name):
-        return self.counterExtraAttributes[1][name]
+        if name == "RoI1":
+            return int(self.roi_start[index - 1])
+        return int(self.roi_end[index - 1])
 
     def SetAxisExtraPar(self, counter, name, value):
-        self.counterExtraAttributes[1][name] = value
+        if name == "RoI1":
+            self.roi_start[counter - 1] = value
+        else:
+            self.roi_end[counter - 1] = value
 
     def Calc(self, index, counter_values):
-        sum = 0
-        for i in range(self.counterExtraAttributes[1]['RoI1'],
-                       self.counterExtraAttributes[1]['RoI2']):
-            sum = sum + counter_values[0][i]
-        return float(sum)
+        self.engine.useSpectrum(counter_values[0])
+        return float(self.engine.roiSum(self.roi_start[index - 1],
+                                        self.roi_end[index - 1]))
+
+    def CalcAll(self, counter_values):
+        self.engine.useSpectrum(counter_values[0])
+        return self.engine.roiSums(
+            self.roi_start, self.roi_end).astype(float).tolist()
+
+
+class MCA2SCA4Ctrl(MCA2SCACtrl):
+    """ 4 RoIs of an MCA Spectrum"""
+
+    pseudo_counter_roles = tuple("sca%d" % i for i in range(1, 5))
+
+
+class MCA2SCA8Ctrl(MCA2SCACtrl):
+    """ 8 RoIs of an MCA Spectrum"""
+
+    pseudo_counter_roles = tuple("sca%d" % i for i in range(1, 9))
+
+
+class MCA2SCA16Ctrl(MCA2SCACtrl):
+    """ 16 RoIs of an MCA Spectrum"""
+
+    pseudo_counter_roles = tuple("sca%d" % i for i in range(1, 17))
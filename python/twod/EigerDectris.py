@@ -26,7 +26,14 @@ because we don't know how many stops a scan will have.
 from sardana import DataAccess
 from sardana.pool.controller import TwoDController
 # from sardana.pool.controller import Type, Access, Description, DefaultValue
-from sardana.pool.controller import Type, Access, Description
+from sardana.pool.controller import Type, Access, Description, DefaultValue
+from sardana.PoolController.common import DeviceDiscoveryLib
+from sardana.PoolController.common.DeviceDiscoveryLib import \
+    getDeviceExported
+from sardana.PoolController.common.StateTrackerLib import \
+    AttributeTracker
+from sardana.PoolController.common.ProxyPoolLib import getProxy
+from sardana.PoolController.common import CallStatsLib
 # from sardana.pool import PoolUtil
 
 import time
@@ -37,6 +44,10 @@ ReadOnly = DataAccess.ReadOnly
 ReadWrite = DataAccess.ReadWrite
 
 TIME_SLEEP = 0.01
+#
+# seconds to wait for the detector and the filewriter
+#
+TIME_MAX = 2.
 
 
 class EigerDectrisCtrl(TwoDController):
@@ -57,6 +68,11 @@ class EigerDectrisCtrl(TwoDController):
         'TangoHost': {
             Type: str,
             Description: 'The tango host where searching the devices'},
+        'UseEvents': {
+            Type: 'PyTango.DevLong',
+            Description:
+            '1 -> wait for the states with change events, 0 -> polling',
+            DefaultValue: 0},
     }
 
     MaxDevice = 97
@@ -65,31 +81,40 @@ class EigerDectrisCtrl(TwoDController):
         self.TangoHost = None
         TwoDController.__init__(self, inst, props, *args, **kwargs)
 
-        if self.TangoHost is None:
-            self.db = PyTango.Database()
-        else:
+        if self.TangoHost is not None:
             self.node = self.TangoHost
             self.port = 10000
             if self.TangoHost.find(':'):
                 lst = self.TangoHost.split(':')
                 self.node = lst[0]
                 self.port = int(lst[1])
-            self.db = PyTango.Database(self.node, self.port)
         name_dev_ask = self.RootDeviceName + "*"
-        self.devices = self.db.get_device_exported(name_dev_ask)
+        self.devices = getDeviceExported(
+            name_dev_ask, tangoHost=self.TangoHost)
         self.max_device = 0
         self.tango_device = []
         self.tango_device_fw = []  # file writer
         self.proxy = []
         self.proxy_fw = []
+        #
+        # trackers for the detector status and the filewriter state/status,
+        # used by the waits after Arm/Disarm. The decisions to arm or to
+        # disarm read the device, the event cache may lag behind.
+        #
+        self.status_tr = []
+        self.state_fw_tr = []
+        self.status_fw_tr = []
         self.device_available = []
         self.APIVersion = []
-        for name in self.devices.value_string:
+        for name in self.devices:
             self.tango_device.append(name)
             self.tango_device_fw.append(self.getFwName(name))
 
             self.proxy.append(None)
             self.proxy_fw.append(None)
+            self.status_tr.append(None)
+            self.state_fw_tr.append(None)
+            self.status_fw_tr.append(None)
             self.device_available.append(0)
             self.max_device = self.max_device + 1
             if len(self.APIVersion) == 0:
@@ -141,8 +166,15 @@ class EigerDectrisCtrl(TwoDController):
                 str(self.tango_device[ind - 1])
             proxy_name_fw = str(self.node) + (":%s/" % self.port) + \
                 str(self.tango_device_fw[ind - 1])
-        self.proxy[ind - 1] = PyTango.DeviceProxy(proxy_name)
-        self.proxy_fw[ind - 1] = PyTango.DeviceProxy(proxy_name_fw)
+        self.proxy[ind - 1] = getProxy(proxy_name, owner=self)
+        self.proxy_fw[ind - 1] = getProxy(proxy_name_fw, owner=self)
+        useEvents = bool(self.UseEvents)
+        self.status_tr[ind - 1] = AttributeTracker(
+            self.proxy[ind - 1], "Status", useEvents=useEvents)
+        self.state_fw_tr[ind - 1] = AttributeTracker(
+            self.proxy_fw[ind - 1], "State", useEvents=useEvents)
+        self.status_fw_tr[ind - 1] = AttributeTracker(
+            self.proxy_fw[ind - 1], "Status", useEvents=useEvents)
         self.device_available[ind - 1] = 1
         self.CountTime.append(self.dft_CountTime)
         self.CountTimeInte.append(self.dft_CountTimeInte)
@@ -154,6 +186,10 @@ class EigerDectrisCtrl(TwoDController):
             print("EigerDectris.deleteDevice %s" %
                   self.tango_device[ind - 1])
         TwoDController.DeleteDevice(self, ind)
+        for trackers in (self.status_tr, self.state_fw_tr, self.status_fw_tr):
+            if trackers[ind - 1] is not None:
+                trackers[ind - 1].unsubscribe()
+                trackers[ind - 1] = None
         self.proxy[ind - 1] = None
         self.proxy_fw[ind - 1] = None
         self.device_available[ind - 1] = 0
@@ -192,32 +228,33 @@ class EigerDectrisCtrl(TwoDController):
         pass
 
     def ReadOne(self, ind):
+        status = self.proxy[ind - 1].read_attribute("Status").value
         if self.isatty:
             print("EigerDectris.ReadOne, %s, status %s " %
-                  (self.tango_device[ind - 1],
-                   repr(self.proxy[ind - 1].status())))
+                  (self.tango_device[ind - 1], repr(status)))
         #
         #
         #
-        if self.proxy[ind - 1].status() == 'idle' and \
-           self.proxy_fw[ind - 1].state() == PyTango.DevState.MOVING:
+        if status == 'idle' and \
+           self.proxy_fw[ind - 1].read_attribute("State").value == \
+           PyTango.DevState.MOVING:
             if self.isatty:
                 print("EigerDectris.ReadOne, disarm, %s" %
                       self.tango_device[ind - 1])
             self.proxy[ind - 1].command_inout("Disarm")
-            startTime = time.time()
-            while self.proxy_fw[ind - 1].state() != PyTango.DevState.ON:
-                time.sleep(TIME_SLEEP)
-                if (time.time() - startTime) > 2:
-                    print("EigerDectris.ReadOne: "
-                          "filewriter does not become ON")
-                    return
-            while self.proxy_fw[ind - 1].status() != 'ready':
-                time.sleep(TIME_SLEEP)
-                if (time.time() - startTime) > 2:
-                    print("EigerDectris.ReadOne: "
-                          "filewriter does not become ready")
-                    return
+            deadline = time.monotonic() + TIME_MAX
+            if not self.state_fw_tr[ind - 1].waitFor(
+                    lambda sta: sta == PyTango.DevState.ON,
+                    deadline - time.monotonic(), pollMin=TIME_SLEEP):
+                print("EigerDectris.ReadOne: "
+                      "filewriter does not become ON")
+                return
+            if not self.status_fw_tr[ind - 1].waitFor(
+                    lambda sts: sts == 'ready',
+                    deadline - time.monotonic(), pollMin=TIME_SLEEP):
+                print("EigerDectris.ReadOne: "
+                      "filewriter does not become ready")
+                return
 
         # The EigerDectris return an Image in type encoded
         tmp_value = [(-1,), (-1,)]
@@ -239,7 +276,8 @@ class EigerDectrisCtrl(TwoDController):
         #
         # after the detector has been armed, the filewrite has to be MOVING
         #
-        if self.proxy_fw[ind - 1].state() != PyTango.DevState.MOVING:
+        if self.proxy_fw[ind - 1].read_attribute("State").value != \
+           PyTango.DevState.MOVING:
             if self.isatty:
                 print("EigerDectris.StartOne, "
                       "filewriter not MOVING, sending arm()")
@@ -247,7 +285,7 @@ class EigerDectrisCtrl(TwoDController):
                 print("EigerDectris.StartOne: "
                       "FW != MOVING -> detector state should be ON, return")
                 return
-            if self.proxy[ind - 1].status() != 'idle':
+            if self.proxy[ind - 1].read_attribute("Status").value != 'idle':
                 print("EigerDectris.StartOne: "
                       "FW != MOVING -> detector status should be 'idle',"
                       " return")
@@ -255,22 +293,20 @@ class EigerDectrisCtrl(TwoDController):
             if self.isatty:
                 print("EigerDectris.StartOne, arm()")
             self.proxy[ind - 1].command_inout("Arm")
-            startTime = time.time()
-            while self.proxy[ind - 1].status() != 'ready':
-                time.sleep(TIME_SLEEP)
-                if (time.time() - startTime) > 2:
-                    print("EigerDectris.StartOne: "
-                          "detector does not become 'ready'")
-                    return
+            if not self.status_tr[ind - 1].waitFor(
+                    lambda sts: sts == 'ready', TIME_MAX,
+                    pollMin=TIME_SLEEP):
+                print("EigerDectris.StartOne: "
+                      "detector does not become 'ready'")
+                return
             if self.isatty:
                 print("EigerDectris.StartOne, status is 'ready', OK")
-            startTime = time.time()
-            while self.proxy_fw[ind - 1].state() != PyTango.DevState.MOVING:
-                time.sleep(TIME_SLEEP)
-                if (time.time() - startTime) > 2:
-                    print("EigerDectris.StartOne: "
-                          "filewrite does not become MOVING")
-                    return
+            if not self.state_fw_tr[ind - 1].waitFor(
+                    lambda sta: sta == PyTango.DevState.MOVING, TIME_MAX,
+                    pollMin=TIME_SLEEP):
+                print("EigerDectris.StartOne: "
+                      "filewrite does not become MOVING")
+                return
             if self.isatty:
                 print("EigerDectris.StartOne, state_fw is MOVING, OK")
 
@@ -347,6 +383,7 @@ class EigerDectrisCtrl(TwoDController):
             elif name == "TriggerMode":
                 self.proxy[ind - 1].write_attribute("TriggerMode", value)
 
+    @CallStatsLib.statsCommands
     def SendToCtrl(self, in_data):
         #        print "Received value =", in_data
         return "Nothing sent"
@@ -356,9 +393,6 @@ class EigerDectrisCtrl(TwoDController):
 
 
 #
-db = None
-
-
 def findDB(tangoHost=None):
     '''
     handle these cases:
@@ -366,68 +400,32 @@ def findDB(tangoHost=None):
       - tangoHost == "haspp99:10000" return db link
       - tangoHost == "haspp99" insert 100000 and return db link
     '''
-    if tangoHost is None:
-        global db
-        if db is None:
-            db = PyTango.Database()
-        return db
-
     #
     # unexpeccted: tango://haspe212oh.desy.de:10000/motor/dummy_mot_ctrl/1
     #
-    if tangoHost.find('tango://') == 0:
+    if tangoHost is not None and tangoHost.find('tango://') == 0:
         PyTango.Except.throw_exception(
             "n.n.", "bad TANGO_HOST syntax %s" % tangoHost,
             "EigerDectris.findDB")
-    #
-    # tangHost "haspp99:10000"
-    #
-    lst = tangoHost.split(':')
-    if len(lst) == 2:
-        return PyTango.Database(lst[0], lst[1])
-    #
-    # tangHost "haspp99"
-    #
-    elif len(lst) == 1:
-        return PyTango.Database(lst[0], "10000")
-    else:
+    if tangoHost is not None and len(tangoHost.split(':')) > 2:
         return None
+    return DeviceDiscoveryLib.findDB(tangoHost)
 
 
 def getDeviceNamesByClass(className, tangoHost=None):
     '''Return a list of all devices of a specified class,
         'DGG2' -> ['p09/dgg2/exp.01', 'p09/dgg2/exp.02']
+    the result is memoized by DeviceDiscoveryLib
     '''
-    srvs = getServerNameByClass(className, tangoHost)
-    argout = []
-
-    db = findDB(tangoHost)
-    if not db:
+    if not findDB(tangoHost):
         return None
-
-    for srv in srvs:
-        lst = db.get_device_name(srv, className).value_string
-        for i in range(0, len(lst)):
-            argout.append(lst[i])
-    return argout
+    return DeviceDiscoveryLib.getDeviceNamesByClass(className, tangoHost)
 
 
 def getServerNameByClass(argin, tangoHost=None):
     '''Return a list of servers containing the specified class '''
-
-    db = findDB(tangoHost)
-
-    srvs = db.get_server_list("*").value_string
-
-    argout = []
-
-    for srv in srvs:
-        classList = db.get_server_class_list(srv).value_string
-        for clss in classList:
-            if clss == argin:
-                argout.append(srv)
-                break
-    return argout
+    findDB(tangoHost)
+    return DeviceDiscoveryLib.getServerNamesByClass(argin, tangoHost)
 
 
 #
@@ -435,15 +433,12 @@ def getDeviceProperty(devName, propName, tangoHost=None):
     '''
     devName: p10/eigerfilewriter/lab.01, propName: EigerDevice
     return: ['p10/eigerdectris/lab.01']
+    the result is memoized by DeviceDiscoveryLib
     '''
-
-    db = findDB(tangoHost)
-    if not db:
+    if not findDB(tangoHost):
         return None
-
-    dct = db.get_device_property(devName, [propName])
-
-    return list(dct[propName])
+    return DeviceDiscoveryLib.getDeviceProperty(
+        devName, propName, tangoHost)
 
 
 if __name__ == "__main__":
@@ -5,6 +5,11 @@ from sardana import DataAccess
 # from sardana import State, DataAccess
 from sardana.pool.controller import TwoDController
 from sardana.pool.controller import Type, Access, Description
+from sardana.PoolController.common.DeviceDiscoveryLib import \
+    getDeviceExported
+from sardana.PoolController.common.ProxyPoolLib import getProxy
+from sardana.PoolController.common import CallStatsLib
+from sardana.PoolController.common.AttrSnapshotLib import AttrSnapshot
 # from sardana.pool.controller import Type, Access, Description, DefaultValue
 # from sardana.pool import PoolUtil
 
@@ -36,30 +41,36 @@ class LCXCameraCtrl(TwoDController):
     }
 
     MaxDevice = 97
+    #
+    # extra parameters read together by AttrSnapshot, FileStartNum
+    # changes during acquisitions and is read directly
+    #
+    snapshotAttrs = dict((name, name) for name in (
+        "DelayTime", "ExposureTime", "FilePrefix", "FileDir", "NbFrames"))
 
     def __init__(self, inst, props, *args, **kwargs):
         self.TangoHost = None
         TwoDController.__init__(self, inst, props, *args, **kwargs)
 
-        if self.TangoHost is None:
-            self.db = PyTango.Database()
-        else:
+        if self.TangoHost is not None:
             self.node = self.TangoHost
             self.port = 10000
             if self.TangoHost.find(':'):
                 lst = self.TangoHost.split(':')
                 self.node = lst[0]
                 self.port = int(lst[1])
-            self.db = PyTango.Database(self.node, self.port)
         name_dev_ask = self.RootDeviceName + "*"
-        self.devices = self.db.get_device_exported(name_dev_ask)
+        self.devices = getDeviceExported(
+            name_dev_ask, tangoHost=self.TangoHost)
         self.max_device = 0
         self.tango_device = []
         self.proxy = []
+        self.snapshot = []
         self.device_available = []
-        for name in self.devices.value_string:
+        for name in self.devices:
             self.tango_device.append(name)
             self.proxy.append(None)
+            self.snapshot.append(None)
             self.device_available.append(0)
             self.max_device = self.max_device + 1
         self.started = False
@@ -91,7 +102,9 @@ class LCXCameraCtrl(TwoDController):
         else:
             proxy_name = str(self.node) + (":%s/" % self.port) + \
                 str(self.tango_device[ind - 1])
-        self.proxy[ind - 1] = PyTango.DeviceProxy(proxy_name)
+        self.proxy[ind - 1] = getProxy(proxy_name, owner=self)
+        self.snapshot[ind - 1] = AttrSnapshot(
+            self.proxy[ind - 1], LCXCameraCtrl.snapshotAttrs)
         self.device_available[ind - 1] = 1
         self.DelayTime.append(self.dft_DelayTime)
         self.ExposureTime.append(self.dft_ExposureTime)
@@ -103,6 +116,7 @@ class LCXCameraCtrl(TwoDController):
 
     def DeleteDevice(self, ind):
         TwoDController.DeleteDevice(self, ind)
+        self.snapshot[ind - 1] = None
         self.proxy[ind - 1] = None
         self.device_available[ind - 1] = 0
 
@@ -145,22 +159,14 @@ class LCXCameraCtrl(TwoDController):
         pass
 
     def LoadOne(self, ind, value, repetitions, latency_time):
-        self.proxy[ind - 1].write_attribute("ExposureTime", value)
+        self.snapshot[ind - 1].set("ExposureTime", value)
 
     def GetAxisExtraPar(self, ind, name):
         if self.device_available[ind - 1]:
-            if name == "DelayTime":
-                return self.proxy[ind - 1].read_attribute("DelayTime").value
-            elif name == "ExposureTime":
-                return self.proxy[ind - 1].read_attribute("ExposureTime").value
+            if self.snapshot[ind - 1].has(name):
+                return self.snapshot[ind - 1].get(name)
             elif name == "FileStartNum":
                 return self.proxy[ind - 1].read_attribute("FileStartNum").value
-            elif name == "FilePrefix":
-                return self.proxy[ind - 1].read_attribute("FilePrefix").value
-            elif name == "FileDir":
-                return self.proxy[ind - 1].read_attribute("FileDir").value
-            elif name == "NbFrames":
-                return self.proxy[ind - 1].read_attribute("NbFrames").value
             elif name == "Reset":
                 if self.device_available[ind - 1]:
                     return 0
@@ -171,22 +177,16 @@ class LCXCameraCtrl(TwoDController):
 
     def SetAxisExtraPar(self, ind, name, value):
         if self.device_available[ind - 1]:
-            if name == "DelayTime":
-                self.proxy[ind - 1].write_attribute("DelayTime", value)
-            elif name == "ExposureTime":
-                self.proxy[ind - 1].write_attribute("ExposureTime", value)
+            if self.snapshot[ind - 1].isWritable(name):
+                self.snapshot[ind - 1].set(name, value)
             elif name == "FileStartNum":
                 self.proxy[ind - 1].write_attribute("FileStartNum", value)
-            elif name == "FilePrefix":
-                self.proxy[ind - 1].write_attribute("FilePrefix", value)
-            elif name == "FileDir":
-                self.proxy[ind - 1].write_attribute("FileDir", value)
-            elif name == "NbFrames":
-                self.proxy[ind - 1].write_attribute("NbFrames", value)
             elif name == "Reset":
                 if self.device_available[ind - 1]:
                     self.proxy[ind - 1].command_inout("Reset")
+                    self.snapshot[ind - 1].invalidate()
 
+    @CallStatsLib.statsCommands
     def SendToCtrl(self, in_data):
         return "Nothing sent"
 
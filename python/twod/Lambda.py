@@ -5,7 +5,13 @@ from sardana import DataAccess
 # from sardana import State, DataAccess
 from sardana.pool.controller import TwoDController
 # from sardana.pool.controller import Type, Access, Description, DefaultValue
-from sardana.pool.controller import Type, Access, Description
+from sardana.pool.controller import Type, Access, Description, DefaultValue
+from sardana.PoolController.common.DeviceDiscoveryLib import \
+    getDeviceExported
+from sardana.PoolController.common.ProxyPoolLib import getProxy
+from sardana.PoolController.common.StateTrackerLib import \
+    AttributeTracker
+from sardana.PoolController.common import CallStatsLib
 # from sardana.pool import PoolUtil
 
 ReadOnly = DataAccess.ReadOnly
@@ -33,6 +39,11 @@ class LambdaCtrl(TwoDController):
         'TangoHost': {
             Type: str,
             Description: 'The tango host where searching the devices'},
+        'UseEvents': {
+            Type: 'PyTango.DevLong',
+            Description:
+            '1 -> State from change events, 0 -> polling',
+            DefaultValue: 0},
     }
 
     MaxDevice = 97
@@ -41,25 +52,25 @@ class LambdaCtrl(TwoDController):
         self.TangoHost = None
         TwoDController.__init__(self, inst, props, *args, **kwargs)
 
-        if self.TangoHost is None:
-            self.db = PyTango.Database()
-        else:
+        if self.TangoHost is not None:
             self.node = self.TangoHost
             self.port = 10000
             if self.TangoHost.find(':'):
                 lst = self.TangoHost.split(':')
                 self.node = lst[0]
                 self.port = int(lst[1])
-            self.db = PyTango.Database(self.node, self.port)
         name_dev_ask = self.RootDeviceName + "*"
-        self.devices = self.db.get_device_exported(name_dev_ask)
+        self.devices = getDeviceExported(
+            name_dev_ask, tangoHost=self.TangoHost)
         self.max_device = 0
         self.tango_device = []
         self.proxy = []
+        self.state_tr = []
         self.device_available = []
-        for name in self.devices.value_string:
+        for name in self.devices:
             self.tango_device.append(name)
             self.proxy.append(None)
+            self.state_tr.append(None)
             self.device_available.append(0)
             self.max_device = self.max_device + 1
         self.started = False
@@ -89,7 +100,9 @@ class LambdaCtrl(TwoDController):
         else:
             proxy_name = str(self.node) + (":%s/" % self.port) \
                 + str(self.tango_device[ind - 1])
-        self.proxy[ind - 1] = PyTango.DeviceProxy(proxy_name)
+        self.proxy[ind - 1] = getProxy(proxy_name, owner=self)
+        self.state_tr[ind - 1] = AttributeTracker(
+            self.proxy[ind - 1], "State", useEvents=bool(self.UseEvents))
         self.device_available[ind - 1] = 1
         self.DelayTime.append(self.dft_DelayTime)
         self.ShutterTime.append(self.dft_ShutterTime)
@@ -101,12 +114,15 @@ class LambdaCtrl(TwoDController):
 
     def DeleteDevice(self, ind):
         TwoDController.DeleteDevice(self, ind)
+        if self.state_tr[ind - 1] is not None:
+            self.state_tr[ind - 1].unsubscribe()
+            self.state_tr[ind - 1] = None
         self.proxy[ind - 1] = None
         self.device_available[ind - 1] = 0
 
     def StateOne(self, ind):
         if self.device_available[ind - 1] == 1:
-            sta = self.proxy[ind - 1].command_inout("State")
+            sta = self.state_tr[ind - 1].read()
             if sta == PyTango.DevState.ON:
                 tup = (sta, "Camera ready")
             elif sta == PyTango.DevState.RUNNING:
@@ -145,6 +161,8 @@ class LambdaCtrl(TwoDController):
 
     def StartOne(self, ind, position=None):
         self.proxy[ind - 1].command_inout("StartAcq")
+        # the last event may still be the ON before the start
+        self.state_tr[ind - 1].markStale()
 
     def AbortOne(self, ind):
         try:
@@ -197,6 +215,7 @@ class LambdaCtrl(TwoDController):
             elif name == "ThresholdEnergy":
                 self.proxy[ind - 1].write_attribute("ThresholdEnergy", value)
 
+    @CallStatsLib.statsCommands
     def SendToCtrl(self, in_data):
         #        print "Received value =", in_data
         return "Nothing sent"
@@ -5,6 +5,13 @@ from sardana import DataAccess
 # from sardana import State, DataAccess
 from sardana.pool.controller import TwoDController
 from sardana.pool.controller import Type, Access, Description, DefaultValue
+from sardana.PoolController.common.DeviceDiscoveryLib import \
+    getDeviceExported
+from sardana.PoolController.common.ProxyPoolLib import getProxy
+from sardana.PoolController.common.StateTrackerLib import \
+    AttributeTracker
+from sardana.PoolController.common import CallStatsLib
+from sardana.PoolController.common.AttrSnapshotLib import AttrSnapshot
 # from sardana.pool.controller import Type, Access, Description, DefaultValue
 # from sardana.pool import PoolUtil
 
@@ -41,6 +48,11 @@ class LimaCCDCtrl(TwoDController):
         'TangoHost': {
             Type: str,
             Description: 'The tango host where searching the devices'},
+        'UseEvents': {
+            Type: 'PyTango.DevLong',
+            Description:
+            '1 -> acq_status from change events, 0 -> polling',
+            DefaultValue: 0},
         'FlagMode': {
             Type: 'PyTango.DevLong',
             Description:
@@ -49,30 +61,51 @@ class LimaCCDCtrl(TwoDController):
     }
 
     MaxDevice = 97
+    #
+    # extra parameters read together by AttrSnapshot,
+    # LastImageReady and SavingNextNumber change during
+    # acquisitions and are read directly
+    #
+    snapshotAttrs = {
+        "LatencyTime": "latency_time",
+        "ExposureTime": "acq_expo_time",
+        "FilePrefix": "saving_prefix",
+        "FileSuffix": "saving_suffix",
+        "FileDir": "saving_directory",
+        "SavingMode": "saving_mode",
+        "SavingCommonHeader": "saving_common_header",
+        "SavingHeaderDelimiter": "saving_header_delimiter",
+        "NbFrames": "acq_nb_frames",
+        "TriggerMode": "acq_trigger_mode",
+        "CameraType": "camera_type",
+    }
+    snapshotReadOnly = ("CameraType",)
 
     def __init__(self, inst, props, *args, **kwargs):
         self.TangoHost = None
         TwoDController.__init__(self, inst, props, *args, **kwargs)
 
-        if self.TangoHost is None:
-            self.db = PyTango.Database()
-        else:
+        if self.TangoHost is not None:
             self.node = self.TangoHost
             self.port = 10000
             if self.TangoHost.find(':'):
                 lst = self.TangoHost.split(':')
                 self.node = lst[0]
                 self.port = int(lst[1])
-            self.db = PyTango.Database(self.node, self.port)
         name_dev_ask = self.RootDeviceName + "*"
-        self.devices = self.db.get_device_exported(name_dev_ask)
+        self.devices = getDeviceExported(
+            name_dev_ask, tangoHost=self.TangoHost)
         self.max_device = 0
         self.tango_device = []
         self.proxy = []
+        self.state_tr = []
+        self.snapshot = []
         self.device_available = []
-        for name in self.devices.value_string:
+        for name in self.devices:
             self.tango_device.append(name)
             self.proxy.append(None)
+            self.state_tr.append(None)
+            self.snapshot.append(None)
             self.device_available.append(0)
             self.max_device = self.max_device + 1
         self.started = False
@@ -114,7 +147,12 @@ class LimaCCDCtrl(TwoDController):
         else:
             proxy_name = str(self.node) + (":%s/" % self.port) + \
                 str(self.tango_device[ind - 1])
-        self.proxy[ind - 1] = PyTango.DeviceProxy(proxy_name)
+        self.proxy[ind - 1] = getProxy(proxy_name, owner=self)
+        self.state_tr[ind - 1] = AttributeTracker(
+            self.proxy[ind - 1], "acq_status", useEvents=bool(self.UseEvents))
+        self.snapshot[ind - 1] = AttrSnapshot(
+            self.proxy[ind - 1], LimaCCDCtrl.snapshotAttrs,
+            readOnly=LimaCCDCtrl.snapshotReadOnly)
         self.device_available[ind - 1] = 1
         self.LatencyTime.append(self.dft_LatencyTime)
         self.ExposureTime.append(self.dft_ExposureTime)
@@ -132,6 +170,10 @@ class LimaCCDCtrl(TwoDController):
 
     def DeleteDevice(self, ind):
         TwoDController.DeleteDevice(self, ind)
+        if self.state_tr[ind - 1] is not None:
+            self.state_tr[ind - 1].unsubscribe()
+            self.state_tr[ind - 1] = None
+        self.snapshot[ind - 1] = None
         self.proxy[ind - 1] = None
         self.device_available[ind - 1] = 0
 
@@ -140,7 +182,7 @@ class LimaCCDCtrl(TwoDController):
             if self.FlagMode == 1:
                 tup = (PyTango.DevState.ON, "Camera ready")
             else:
-                sta = self.proxy[ind - 1].read_attribute("acq_status").value
+                sta = self.state_tr[ind - 1].read()
                 if sta == "Ready":
                     tup = (PyTango.DevState.ON, "Camera ready")
                 elif sta == "Running":
@@ -172,14 +214,17 @@ class LimaCCDCtrl(TwoDController):
         # +++ 5.7.2021
         if self.FlagMode != 1:
             self.proxy[ind - 1].write_attribute("acq_nb_frames", 1)
+            self.snapshot[ind - 1].invalidate()
             self.proxy[ind - 1].command_inout("prepareAcq")
         self.proxy[ind - 1].command_inout("startAcq")
+        # the last event may still be the Ready before the start
+        self.state_tr[ind - 1].markStale()
 
     def AbortOne(self, ind):
         self.proxy[ind - 1].command_inout("stopAcq")
 
     def LoadOne(self, ind, value, repetitions, latency_time):
-        self.proxy[ind - 1].write_attribute('acq_expo_time', value)
+        self.snapshot[ind - 1].set("ExposureTime", value)
 
     def GetAxisPar(self, ind, par_name):
         if par_name == "XDim":
@@ -195,38 +240,9 @@ class LimaCCDCtrl(TwoDController):
             return 3
 
     def GetAxisExtraPar(self, ind, name):
-        if name == "LatencyTime":
-            if self.device_available[ind - 1]:
-                return self.proxy[ind - 1].read_attribute(
-                    "latency_time").value
-        if name == "ExposureTime":
-            if self.device_available[ind - 1]:
-                return self.proxy[ind - 1].read_attribute(
-                    "acq_expo_time").value
-        if name == "FilePrefix":
-            if self.device_available[ind - 1]:
-                return self.proxy[ind - 1].read_attribute(
-                    "saving_prefix").value
-        if name == "FileSuffix":
-            if self.device_available[ind - 1]:
-                return self.proxy[ind - 1].read_attribute(
-                    "saving_suffix").value
-        if name == "FileDir":
-            if self.device_available[ind - 1]:
-                return self.proxy[ind - 1].read_attribute(
-                    "saving_directory").value
-        if name == "SavingMode":
-            if self.device_available[ind - 1]:
-                return self.proxy[ind - 1].read_attribute(
-                    "saving_mode").value
-        if name == "SavingCommonHeader":
-            if self.device_available[ind - 1]:
-                return self.proxy[ind - 1].read_attribute(
-                    "saving_common_header").value
-        if name == "SavingHeaderDelimiter":
-            if self.device_available[ind - 1]:
-                return self.proxy[ind - 1].read_attribute(
-                    "saving_header_delimiter").value
+        if self.device_available[ind - 1] and \
+           self.snapshot[ind - 1].has(name):
+            return self.snapshot[ind - 1].get(name)
         if name == "SavingNextNumber":
             if self.device_available[ind - 1]:
                 return self.proxy[ind - 1].read_attribute(
@@ -235,18 +251,6 @@ class LimaCCDCtrl(TwoDController):
             if self.device_available[ind - 1]:
                 return self.proxy[ind - 1].read_attribute(
                     "last_image_ready").value
-        if name == "NbFrames":
-            if self.device_available[ind - 1]:
-                return self.proxy[ind - 1].read_attribute(
-                    "acq_nb_frames").value
-        if name == "TriggerMode":
-            if self.device_available[ind - 1]:
-                return self.proxy[ind - 1].read_attribute(
-                    "acq_trigger_mode").value
-        if name == "CameraType":
-            if self.device_available[ind - 1]:
-                return self.proxy[ind - 1].read_attribute(
-                    "camera_type").value
         if name == "Reset":
             if self.device_available[ind - 1]:
                 return 0
@@ -256,46 +260,19 @@ class LimaCCDCtrl(TwoDController):
             return tango_device
 
     def SetAxisExtraPar(self, ind, name, value):
-        if name == "LatencyTime":
-            if self.device_available[ind - 1]:
-                self.proxy[ind - 1].write_attribute("latency_time", value)
-        if name == "ExposureTime":
-            if self.device_available[ind - 1]:
-                self.proxy[ind - 1].write_attribute("acq_expo_time", value)
-        if name == "FilePrefix":
-            if self.device_available[ind - 1]:
-                self.proxy[ind - 1].write_attribute("saving_prefix", value)
-        if name == "FileSuffix":
-            if self.device_available[ind - 1]:
-                self.proxy[ind - 1].write_attribute("saving_suffix", value)
-        if name == "FileDir":
-            if self.device_available[ind - 1]:
-                self.proxy[ind - 1].write_attribute("saving_directory", value)
-        if name == "SavingMode":
-            if self.device_available[ind - 1]:
-                self.proxy[ind - 1].write_attribute("saving_mode", value)
-        if name == "SavingCommonHeader":
-            if self.device_available[ind - 1]:
-                self.proxy[ind - 1].write_attribute(
-                    "saving_common_header", value)
-        if name == "SavingHeaderDelimiter":
-            if self.device_available[ind - 1]:
-                self.proxy[ind - 1].write_attribute(
-                    "saving_header_delimiter", value)
+        if self.device_available[ind - 1] and \
+           self.snapshot[ind - 1].isWritable(name):
+            self.snapshot[ind - 1].set(name, value)
         if name == "SavingNextNumber":
             if self.device_available[ind - 1]:
                 self.proxy[ind - 1].write_attribute(
                     "saving_next_number", value)
-        if name == "NbFrames":
-            if self.device_available[ind - 1]:
-                self.proxy[ind - 1].write_attribute("acq_nb_frames", value)
-        if name == "TriggerMode":
-            if self.device_available[ind - 1]:
-                self.proxy[ind - 1].write_attribute("acq_trigger_mode", value)
         if name == "Reset":
             if self.device_available[ind - 1]:
                 self.proxy[ind - 1].command_inout("Reset")
+                self.snapshot[ind - 1].invalidate()
 
+    @CallStatsLib.statsCommands
     def SendToCtrl(self, in_data):
         #        print "Received value =", in_data
         return "Nothing sent"
@@ -1,11 +1,16 @@
 import PyTango
 # import os
-import time
 
 from sardana import DataAccess
 # from sardana import State, DataAccess
 from sardana.pool.controller import TwoDController
-from sardana.pool.controller import Type, Access, Description
+from sardana.pool.controller import Type, Access, Description, DefaultValue
+from sardana.PoolController.common.DeviceDiscoveryLib import \
+    getDeviceExported
+from sardana.PoolController.common.ProxyPoolLib import getProxy
+from sardana.PoolController.common.StateTrackerLib import \
+    AttributeTracker, waitForState
+from sardana.PoolController.common import CallStatsLib
 # from sardana.pool.controller import Type, Access, Description, DefaultValue
 # from sardana.pool import PoolUtil
 
@@ -33,6 +38,17 @@ class PCOCtrl(TwoDController):
         'TangoHost': {
             Type: str,
             Description: 'The tango host where searching the devices'},
+        'UseEvents': {
+            Type: 'PyTango.DevLong',
+            Description:
+            '1 -> State from change events, 0 -> polling',
+            DefaultValue: 0},
+        'StateTimeout': {
+            Type: 'PyTango.DevDouble',
+            Description:
+            'seconds to wait for the camera to become ON, '
+            'ReadOne adds the exposure time',
+            DefaultValue: 10.},
     }
 
     MaxDevice = 97
@@ -41,25 +57,30 @@ class PCOCtrl(TwoDController):
         self.TangoHost = None
         TwoDController.__init__(self, inst, props, *args, **kwargs)
 
-        if self.TangoHost is None:
-            self.db = PyTango.Database()
-        else:
+        if self.TangoHost is not None:
             self.node = self.TangoHost
             self.port = 10000
             if self.TangoHost.find(':'):
                 lst = self.TangoHost.split(':')
                 self.node = lst[0]
                 self.port = int(lst[1])
-            self.db = PyTango.Database(self.node, self.port)
         name_dev_ask = self.RootDeviceName + "*"
-        self.devices = self.db.get_device_exported(name_dev_ask)
+        self.devices = getDeviceExported(
+            name_dev_ask, tangoHost=self.TangoHost)
         self.max_device = 0
         self.tango_device = []
         self.proxy = []
+        self.state_tr = []
+        #
+        # the exposure time per axis, None: not known yet
+        #
+        self.exposure_time = []
         self.device_available = []
-        for name in self.devices.value_string:
+        for name in self.devices:
             self.tango_device.append(name)
             self.proxy.append(None)
+            self.state_tr.append(None)
+            self.exposure_time.append(None)
             self.device_available.append(0)
             self.max_device = self.max_device + 1
         self.started = False
@@ -87,7 +108,9 @@ class PCOCtrl(TwoDController):
         else:
             proxy_name = str(self.node) + (":%s/" % self.port) + \
                 str(self.tango_device[ind - 1])
-        self.proxy[ind - 1] = PyTango.DeviceProxy(proxy_name)
+        self.proxy[ind - 1] = getProxy(proxy_name, owner=self)
+        self.state_tr[ind - 1] = AttributeTracker(
+            self.proxy[ind - 1], "State", useEvents=bool(self.UseEvents))
         self.device_available[ind - 1] = 1
         self.DelayTime.append(self.dft_DelayTime)
         self.ExposureTime.append(self.dft_ExposureTime)
@@ -98,12 +121,15 @@ class PCOCtrl(TwoDController):
 
     def DeleteDevice(self, ind):
         TwoDController.DeleteDevice(self, ind)
+        if self.state_tr[ind - 1] is not None:
+            self.state_tr[ind - 1].unsubscribe()
+            self.state_tr[ind - 1] = None
         self.proxy[ind - 1] = None
         self.device_available[ind - 1] = 0
 
     def StateOne(self, ind):
         if self.device_available[ind - 1] == 1:
-            sta = self.proxy[ind - 1].command_inout("State")
+            sta = self.state_tr[ind - 1].read()
             if sta == PyTango.DevState.ON:
                 tup = (sta, "Camera ready")
             elif sta == PyTango.DevState.RUNNING:
@@ -127,23 +153,36 @@ class PCOCtrl(TwoDController):
 
     def ReadOne(self, ind):
         # The PCO return an Image in type encoded
-        while self.proxy[ind - 1].state() != PyTango.DevState.ON:
-            time.sleep(0.001)
+        waitForState(self.state_tr[ind - 1], (PyTango.DevState.ON, ),
+                     self._readTimeout(ind), "PCOCtrl.ReadOne")
         tmp_value = [(-1,), (-1,)]
         if self.device_available[ind - 1] == 1:
             return tmp_value
 
+    def _readTimeout(self, ind):
+        '''
+        ReadOne waits for the end of the exposure, StateTimeout
+        is the margin
+        '''
+        if self.exposure_time[ind - 1] is None:
+            self.exposure_time[ind - 1] = float(
+                self.proxy[ind - 1].read_attribute("ExposureTime").value)
+        return self.exposure_time[ind - 1] + self.StateTimeout
+
     def PreStartAll(self):
         pass
 
     def StartOne(self, ind, position=None):
         # Need it because the PCO goes to DISABLE after MOVING
-        while self.proxy[ind - 1].state() != PyTango.DevState.ON:
-            time.sleep(0.001)
+        waitForState(self.state_tr[ind - 1], (PyTango.DevState.ON, ),
+                     self.StateTimeout, "PCOCtrl.StartOne")
         self.proxy[ind - 1].command_inout("StartStandardAcq")
+        # the last event may still be the ON before the start
+        self.state_tr[ind - 1].markStale()
 
     def LoadOne(self, ind, value, repetitions, latency_time):
         self.proxy[ind - 1].write_attribute("ExposureTime", value)
+        self.exposure_time[ind - 1] = float(value)
 
     def GetAxisPar(self, ind, par_name):
         if par_name == "XDim":
@@ -193,6 +232,7 @@ class PCOCtrl(TwoDController):
         if name == "ExposureTime":
             if self.device_available[ind - 1]:
                 self.proxy[ind - 1].write_attribute("ExposureTime", value)
+                self.exposure_time[ind - 1] = float(value)
         if name == "ADCs":
             if self.device_available[ind - 1]:
                 self.proxy[ind - 1].write_attribute("ADCs", value)
@@ -206,6 +246,7 @@ class PCOCtrl(TwoDController):
             if self.device_available[ind - 1]:
                 self.proxy[ind - 1].write_attribute("FileDir", value)
 
+    @CallStatsLib.statsCommands
     def SendToCtrl(self, in_data):
         # print "Received value =", in_data
         return "Nothing sent"
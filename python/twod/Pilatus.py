@@ -5,7 +5,14 @@ import time
 from sardana import DataAccess
 # from sardana import State, DataAccess
 from sardana.pool.controller import TwoDController
-from sardana.pool.controller import Type, Access, Description
+from sardana.pool.controller import Type, Access, Description, DefaultValue
+from sardana.PoolController.common.DeviceDiscoveryLib import \
+    getDeviceExported
+from sardana.PoolController.common.ProxyPoolLib import getProxy
+from sardana.PoolController.common.StateTrackerLib import \
+    AttributeTracker
+from sardana.PoolController.common import CallStatsLib
+from sardana.PoolController.common.AttrSnapshotLib import AttrSnapshot
 # from sardana.pool.controller import Type, Access, Description, DefaultValue
 # from sardana.pool import PoolUtil
 
@@ -43,32 +50,48 @@ class PilatusCtrl(TwoDController):
         'TangoHost': {
             Type: str,
             Description: 'The tango host where searching the devices'},
+        'UseEvents': {
+            Type: 'PyTango.DevLong',
+            Description:
+            '1 -> State from change events, 0 -> polling',
+            DefaultValue: 0},
     }
 
     MaxDevice = 97
+    #
+    # extra parameters read together by AttrSnapshot, FileStartNum
+    # and LastImageTaken change during acquisitions and are read
+    # directly
+    #
+    snapshotAttrs = dict((name, name) for name in (
+        "DelayTime", "ExposureTime", "ExposurePeriod", "FilePrefix",
+        "FilePostfix", "FileDir", "NbFrames", "NbExposures",
+        "TriggerMode", "Threshold", "Gain"))
 
     def __init__(self, inst, props, *args, **kwargs):
         self.TangoHost = None
         TwoDController.__init__(self, inst, props, *args, **kwargs)
-        if self.TangoHost is None:
-            self.db = PyTango.Database()
-        else:
+        if self.TangoHost is not None:
             self.node = self.TangoHost
             self.port = 10000
             if self.TangoHost.find(':'):
                 lst = self.TangoHost.split(':')
                 self.node = lst[0]
                 self.port = int(lst[1])
-            self.db = PyTango.Database(self.node, self.port)
         name_dev_ask = self.RootDeviceName + "*"
-        self.devices = self.db.get_device_exported(name_dev_ask)
+        self.devices = getDeviceExported(
+            name_dev_ask, tangoHost=self.TangoHost)
         self.max_device = 0
         self.tango_device = []
         self.proxy = []
+        self.state_tr = []
+        self.snapshot = []
         self.device_available = []
-        for name in self.devices.value_string:
+        for name in self.devices:
             self.tango_device.append(name)
             self.proxy.append(None)
+            self.state_tr.append(None)
+            self.snapshot.append(None)
             self.device_available.append(0)
             self.max_device = self.max_device + 1
         self.started = False
@@ -116,7 +139,11 @@ class PilatusCtrl(TwoDController):
         else:
             proxy_name = str(self.node) + (":%s/" % self.port) + \
                 str(self.tango_device[ind - 1])
-        self.proxy[ind - 1] = PyTango.DeviceProxy(proxy_name)
+        self.proxy[ind - 1] = getProxy(proxy_name, owner=self)
+        self.state_tr[ind - 1] = AttributeTracker(
+            self.proxy[ind - 1], "State", useEvents=bool(self.UseEvents))
+        self.snapshot[ind - 1] = AttrSnapshot(
+            self.proxy[ind - 1], PilatusCtrl.snapshotAttrs)
         self.device_available[ind - 1] = 1
         self.DelayTime.append(self.dft_DelayTime)
         self.ExposureTime.append(self.dft_ExposureTime)
@@ -137,12 +164,16 @@ class PilatusCtrl(TwoDController):
 
     def DeleteDevice(self, ind):
         TwoDController.DeleteDevice(self, ind)
+        if self.state_tr[ind - 1] is not None:
+            self.state_tr[ind - 1].unsubscribe()
+            self.state_tr[ind - 1] = None
+        self.snapshot[ind - 1] = None
         self.proxy[ind - 1] = None
         self.device_available[ind - 1] = 0
 
     def StateOne(self, ind):
         if self.device_available[ind - 1] == 1:
-            sta = self.proxy[ind - 1].command_inout("State")
+            sta = self.state_tr[ind - 1].read()
             if sta == PyTango.DevState.ON:
                 tup = (sta, "Camera ready")
             elif sta == PyTango.DevState.RUNNING:
@@ -176,18 +207,21 @@ class PilatusCtrl(TwoDController):
     def PreStartOne(self, ind, value):
         if self.proxy[ind - 1].read_attribute("TriggerMode").value > 0:
             self.proxy[ind - 1].command_inout("StartStandardAcq")
+            self.state_tr[ind - 1].markStale()
             time.sleep(self.SettleTime[ind - 1])
         return True
 
     def StartOne(self, ind, position=None):
         if self.proxy[ind - 1].read_attribute("TriggerMode").value == 0:
             self.proxy[ind - 1].command_inout("StartStandardAcq")
+            # the last event may still be the ON before the start
+            self.state_tr[ind - 1].markStale()
 
     def AbortOne(self, ind):
         self.proxy[ind - 1].command_inout("StopAcq")
 
     def LoadOne(self, ind, value, repetitions, latency_time):
-        self.proxy[ind - 1].write_attribute("ExposureTime", value)
+        self.snapshot[ind - 1].set("ExposureTime", value)
 
     def GetAxisPar(self, ind, par_name):
         if par_name == "data_source":
@@ -196,34 +230,13 @@ class PilatusCtrl(TwoDController):
 
     def GetAxisExtraPar(self, ind, name):
         if self.device_available[ind - 1]:
-            if name == "DelayTime":
-                return self.proxy[ind - 1].read_attribute("DelayTime").value
-            elif name == "ExposureTime":
-                return self.proxy[ind - 1].read_attribute("ExposureTime").value
-            elif name == "ExposurePeriod":
-                return self.proxy[ind - 1].read_attribute(
-                    "ExposurePeriod").value
+            if self.snapshot[ind - 1].has(name):
+                return self.snapshot[ind - 1].get(name)
             elif name == "FileStartNum":
                 return self.proxy[ind - 1].read_attribute("FileStartNum").value
-            elif name == "FilePrefix":
-                return self.proxy[ind - 1].read_attribute("FilePrefix").value
-            elif name == "FilePostfix":
-                return self.proxy[ind - 1].read_attribute("FilePostfix").value
-            elif name == "FileDir":
-                return self.proxy[ind - 1].read_attribute("FileDir").value
             elif name == "LastImageTaken":
                 return self.proxy[ind - 1].read_attribute(
                     "LastImageTaken").value
-            elif name == "NbFrames":
-                return self.proxy[ind - 1].read_attribute("NbFrames").value
-            elif name == "NbExposures":
-                return self.proxy[ind - 1].read_attribute("NbExposures").value
-            elif name == "TriggerMode":
-                return self.proxy[ind - 1].read_attribute("TriggerMode").value
-            elif name == "Threshold":
-                return self.proxy[ind - 1].read_attribute("Threshold").value
-            elif name == "Gain":
-                return self.proxy[ind - 1].read_attribute("Gain").value
             elif name == "Reset":
                 if self.device_available[ind - 1]:
                     return 0
@@ -236,41 +249,23 @@ class PilatusCtrl(TwoDController):
 
     def SetAxisExtraPar(self, ind, name, value):
         if self.device_available[ind - 1]:
-            if name == "DelayTime":
-                self.proxy[ind - 1].write_attribute("DelayTime", value)
-            elif name == "ExposureTime":
-                self.proxy[ind - 1].write_attribute("ExposureTime", value)
-            elif name == "ExposurePeriod":
-                self.proxy[ind - 1].write_attribute("ExposurePeriod", value)
+            if self.snapshot[ind - 1].isWritable(name):
+                self.snapshot[ind - 1].set(name, value)
             elif name == "FileStartNum":
                 self.proxy[ind - 1].write_attribute("FileStartNum", value)
-            elif name == "FilePrefix":
-                self.proxy[ind - 1].write_attribute("FilePrefix", value)
-            elif name == "FilePostfix":
-                self.proxy[ind - 1].write_attribute("FilePostfix", value)
-            elif name == "FileDir":
-                self.proxy[ind - 1].write_attribute("FileDir", value)
             elif name == "LastImageTaken":
                 self.proxy[ind - 1].write_attribute("LastImageTaken", value)
-            elif name == "NbFrames":
-                self.proxy[ind - 1].write_attribute("NbFrames", value)
-            elif name == "NbExposures":
-                self.proxy[ind - 1].write_attribute("NbExposures", value)
             elif name == "ShutterEnable":
                 self.proxy[ind - 1].write_attribute("ShutterEnable", value)
-            elif name == "TriggerMode":
-                self.proxy[ind - 1].write_attribute("TriggerMode", value)
-            elif name == "Threshold":
-                self.proxy[ind - 1].write_attribute("Threshold", value)
-            elif name == "Gain":
-                self.proxy[ind - 1].write_attribute("Gain", value)
             elif name == "Reset":
                 if self.device_available[ind - 1]:
                     self.proxy[ind - 1].command_inout("Reset")
+                    self.snapshot[ind - 1].invalidate()
             elif name == "SettleTime":
                 if self.device_available[ind - 1]:
                     self.SettleTime[ind - 1] = value
 
+    @CallStatsLib.statsCommands
     def SendToCtrl(self, in_data):
         #        print "Received value =", in_data
         return "Nothing sent"
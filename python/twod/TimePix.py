@@ -1,11 +1,15 @@
 import PyTango
-import time
 # import os
 
 # from sardana import State
 from sardana import DataAccess
 from sardana.pool.controller import TwoDController
 from sardana.pool.controller import Type, Access, Description
+from sardana.PoolController.common.DeviceDiscoveryLib import \
+    getDeviceExported
+from sardana.PoolController.common.ProxyPoolLib import getProxy
+from sardana.PoolController.common.AcqTimerLib import AcqTimer
+from sardana.PoolController.common import CallStatsLib
 # from sardana.pool.controller import DefaultValue
 # from sardana.pool import PoolUtil
 
@@ -41,30 +45,28 @@ class TimePixCtrl(TwoDController):
         self.TangoHost = None
         TwoDController.__init__(self, inst, props, *args, **kwargs)
         print("PYTHON -> TwoDController ctor for instance", inst)
-        if self.TangoHost is None:
-            self.db = PyTango.Database()
-        else:
+        if self.TangoHost is not None:
             self.node = self.TangoHost
             self.port = 10000
             if self.TangoHost.find(':'):
                 lst = self.TangoHost.split(':')
                 self.node = lst[0]
                 self.port = int(lst[1])
-            self.db = PyTango.Database(self.node, self.port)
         name_dev_ask = self.RootDeviceName + "*"
-        self.devices = self.db.get_device_exported(name_dev_ask)
+        self.devices = getDeviceExported(
+            name_dev_ask, tangoHost=self.TangoHost)
         self.max_device = 0
         self.tango_device = []
         self.proxy = []
         self.device_available = []
-        self.start_time = []
+        self.timer = []
         self.acq_type = []
         self.exp_time = 0
-        for name in self.devices.value_string:
+        for name in self.devices:
             self.tango_device.append(name)
             self.proxy.append(None)
             self.device_available.append(0)
-            self.start_time.append(time.time())
+            self.timer.append(AcqTimer())
             self.acq_type.append(0)
             self.max_device = self.max_device + 1
         self.started = False
@@ -82,7 +84,7 @@ class TimePixCtrl(TwoDController):
         else:
             proxy_name = str(self.node) + (":%s/" % self.port) + \
                 str(self.tango_device[ind - 1])
-        self.proxy[ind - 1] = PyTango.DeviceProxy(proxy_name)
+        self.proxy[ind - 1] = getProxy(proxy_name, owner=self)
         self.device_available[ind - 1] = 1
 
     def DeleteDevice(self, ind):
@@ -96,8 +98,7 @@ class TimePixCtrl(TwoDController):
         #        print "PYTHON -> TimePixCtrl/", self.inst_name, \
         #     ": In StateOne method for index", ind
         if self.device_available[ind - 1] == 1:
-            if time.time() - self.start_time[ind - 1] > \
-               self.exp_time and self.started is True:
+            if self.timer[ind - 1].mayBeDone() and self.started is True:
                 try:
                     sta_tmp = self.proxy[ind - 1].command_inout("State")
                     if sta_tmp == PyTango.DevState.MOVING:
@@ -154,7 +155,8 @@ class TimePixCtrl(TwoDController):
         self.proxy[ind - 1].command_inout("start_acquisition")
 
         self.started = True
-        self.start_time[ind - 1] = time.time()
+        self.timer[ind - 1].load(self.exp_time)
+        self.timer[ind - 1].start()
 
     def AbortOne(self, ind):
         #        print "PYTHON -> TimePixCtrl/", self.inst_name, \
@@ -180,6 +182,7 @@ class TimePixCtrl(TwoDController):
         # " value=", value
         pass
 
+    @CallStatsLib.statsCommands
     def SendToCtrl(self, in_data):
         #        print "Received value =", in_data
         return "Nothing sent"